@@ -1,263 +1,671 @@
-from flask import Flask, render_template, request, jsonify
-import json
 import os
+import threading
+import time
+import weakref
+
+import scoring
+from contextlib import contextmanager
+
+from flask import Flask, Response, g, render_template, request, jsonify
+
+from assets import CACHE_CONTROL as ASSET_CACHE_CONTROL, AssetBundle
+from boards import BoardExists, BoardNotFound, BoardRegistry
+from events import Broadcaster, changed_names
+from export import DEFAULT_MAX_LENGTH, MAX_LENGTH, render
+from history import BoardHistory, now_ms, parse_time
+from importer import BatchImporter, iter_text_lines, read_rows
+from journal import BoardJournal
+from locks import RWLock, reader, writer
+from metrics import (BOARD_PLAYERS, BOARD_VERSION, CACHE_HIT_RATIO, IMPORT_ROWS, OPERATION_SECONDS, REGISTRY, REQUEST_BYTES,
+                     REQUEST_SECONDS, RESPONSE_BYTES, STREAM_SUBSCRIBERS, RequestProfiler, timed)
+from pagination import get_page, int_arg, is_page_request
+from player import PLAYER_TYPES
+from responses import FastJSONProvider, ResponseCache, brotli, negotiate_format, send_cached
+from search import DEFAULT_LIMIT as SEARCH_LIMIT, MAX_LIMIT as MAX_SEARCH_LIMIT, NameIndex
+from serialization import dumps, loads
+from sqlstore import SQLiteDatabase, SQLiteJournal, SQLitePlayerStore, migrate
+from store import PlayerStore
+from textimport import parse_text
+from views import OverallView
 
 app = Flask(__name__)
-DATA_FILES = {
-    'ffa': 'leaderboard_ffa.json',
-    'classic': 'leaderboard_classic.json'
+app.json = FastJSONProvider(app)
+# Boards that always exist, by name, with the kind of board each one is.
+# Others are created through the API and listed in the board catalog.
+BUILTIN_BOARDS = {
+    'ffa': 'ffa',
+    'classic': 'classic',
+    'overall': 'overall',
 }
+STORAGE = os.environ.get('LEADERBOARD_STORAGE', 'json')
+DATABASE_FILE = os.environ.get('LEADERBOARD_DATABASE', 'leaderboard.db')
+ASSET_DIR = os.environ.get('LEADERBOARD_ASSETS', os.path.join(app.static_folder, 'dist'))
+database = None
+assets = AssetBundle(app.static_folder, ASSET_DIR).load()
+app.add_template_global(assets.url, 'asset_url')
+
+def open_database():
+    global database
+    if database is None:
+        database = SQLiteDatabase(DATABASE_FILE)
+    return database
+
+def data_file(name):
+    return f'leaderboard_{name}.json'
+
+def open_storage(name, leaderboard_type, points_key):
+    if STORAGE == 'sqlite':
+        db = open_database()
+        return SQLitePlayerStore(db, name, points_key, PLAYER_TYPES[leaderboard_type]), SQLiteJournal(db, name)
+    if STORAGE != 'json':
+        raise ValueError(f"Unknown storage backend: {STORAGE}")
+    return PlayerStore(points_key), BoardJournal(data_file(name))
 
 class Leaderboard:
-    RANK_POINTS = {
-        "B+ Low": 1,
-        "B+ Mid": 2,
-        "B+ High": 3,
-        "A- Low": 4,
-        "A- Mid": 5,
-        "A- High": 6,
-        "A Low": 7,
-        "A Mid": 8,
-        "A High": 9,
-        "A+ Low": 10,
-        "A+ Mid": 11,
-        "A+ High": 12,
-        "S Low": 13,
-        "S Mid": 14,
-        "S High": 15,
-    }
+    read_only = False
     
-    STAR_POINTS = {
-        0.5: 1.5,
-        1.0: 3.0,
-        1.5: 4.5,
-        2.0: 6.0,
-        2.5: 7.5,
-        3.0: 9.0,
-        3.5: 10.5,
-        4.0: 12.0,
-        4.5: 13.5,
-        5.0: 15.0,
+    POINTS_KEYS = {
+        'classic': 'rank_points',
+        'ffa': 'star_points',
     }
     
-    MAX_RANK_POINTS = 15
-    MAX_STAR_POINTS = 15
-    
-    def __init__(self, leaderboard_type='classic'):
+    def __init__(self, leaderboard_type='classic', name=None):
         self.leaderboard_type = leaderboard_type
-        self.data_file = DATA_FILES[leaderboard_type]
-        self.players = []
-        self.load_data()
+        self.name = name or leaderboard_type
+        self.data_file = data_file(self.name)
+        self.points_key = self.POINTS_KEYS[leaderboard_type]
+        self.player_type = PLAYER_TYPES[leaderboard_type]
+        self.players, self.journal = open_storage(self.name, leaderboard_type, self.points_key)
+        self.listeners = []
+        self.lock = RWLock(self.name)
+        self._batch = None
+        # The points tables the board was last ranked under.
+        self.scoring_file = os.path.splitext(self.data_file)[0] + '.scoring'
+        with self.journal.locked():
+            self.load_data()
+            self.scoring_version, _ = self._read_scoring()
     
-    def add_player(self, name, position=None, rank=None, stars=None, roblox_link=""):
+    def make_player(self, name, rank=None, stars=None, roblox_link=""):
+        tables = scoring.current
         if self.leaderboard_type == 'classic':
-            if rank not in self.RANK_POINTS:
+            if rank not in tables.rank_points:
                 raise ValueError(f"Invalid rank: {rank}")
-            
-            rank_points = self.RANK_POINTS[rank]
-            rank_percentage = (rank_points / self.MAX_RANK_POINTS) * 100
-            
-            player = {
-                "name": name,
-                "rank": rank,
-                "rank_points": rank_points,
-                "rank_percentage": rank_percentage,
-                "roblox_link": roblox_link,
-            }
-            
-            if position is not None:
-                player["position"] = position
-                for p in self.players:
-                    if p.get("position") is not None and p.get("position") > position:
-                        p["position"] = p.get("position") + 1
-                self.players.insert(position - 1, player)
-            else:
-                self.players.append(player)
+            return self.player_type(name, rank, roblox_link)
         
-        elif self.leaderboard_type == 'ffa':
-            if stars not in self.STAR_POINTS:
-                raise ValueError(f"Invalid star rating: {stars}")
-            
-            star_points = self.STAR_POINTS[stars]
-            star_percentage = (star_points / self.MAX_STAR_POINTS) * 100
-            
-            player = {
-                "name": name,
-                "stars": stars,
-                "star_points": star_points,
-                "star_percentage": star_percentage,
-                "roblox_link": roblox_link,
-            }
-            
-            if position is not None:
-                player["position"] = position
-                for p in self.players:
-                    if p.get("position") is not None and p.get("position") > position:
-                        p["position"] = p.get("position") + 1
-                self.players.insert(position - 1, player)
-            else:
-                self.players.append(player)
+        if stars not in tables.star_points:
+            raise ValueError(f"Invalid star rating: {stars}")
+        return self.player_type(name, stars, roblox_link)
+    
+    @timed('add')
+    @writer
+    def add_player(self, name, position=None, rank=None, stars=None, roblox_link=""):
+        player = self.make_player(name, rank, stars, roblox_link)
+        if name in self.players:
+            raise ValueError(f"Player already exists: {name}")
+        self._commit({"op": "add", "player": player, "index": None if position is None else position - 1})
     
+    @timed('remove')
+    @writer
     def remove_player(self, name):
-        removed_position = None
-        for i, p in enumerate(self.players):
-            if p["name"] == name:
-                removed_position = p.get("position")
-                self.players.pop(i)
-                break
-        
-        if removed_position is not None:
-            for p in self.players:
-                if p.get("position") is not None and p.get("position") > removed_position:
-                    p["position"] = p.get("position") - 1
+        if name in self.players:
+            self._commit({"op": "remove", "name": name})
     
+    @timed('swap')
+    @writer
     def swap_positions(self, name1, name2):
-        player1 = None
-        player2 = None
-        
-        for p in self.players:
-            if p["name"] == name1:
-                player1 = p
-            elif p["name"] == name2:
-                player2 = p
-        
-        if not player1 or not player2:
+        if name1 not in self.players or name2 not in self.players:
             raise ValueError("One or both players not found")
+        self._commit({"op": "swap", "names": [name1, name2]})
+    
+    @timed('move')
+    @writer
+    def move_player(self, name, position):
+        if name not in self.players:
+            raise ValueError(f"Player not found: {name}")
+        if position != self.players.index_of(name) + 1:
+            self._commit({"op": "move", "name": name, "index": position - 1})
+    
+    @timed('update')
+    @writer
+    def update_player(self, old_name, new_name, rank=None, stars=None, roblox_link="", position=None):
+        old_player = self.players.get(old_name)
+        if old_player is None:
+            raise ValueError(f"Player not found: {old_name}")
         
-        pos1 = player1.get("position")
-        pos2 = player2.get("position")
+        player = self.make_player(new_name, rank, stars, roblox_link)
+        if new_name != old_name and new_name in self.players:
+            raise ValueError(f"Player already exists: {new_name}")
         
-        player1["position"] = pos2
-        player2["position"] = pos1
+        record = {"op": "update", "name": old_name, "player": player}
+        if position is not None:
+            if position != self.players.index_of(old_name) + 1:
+                record["index"] = position - 1
+        elif player[self.points_key] != old_player[self.points_key]:
+            record["index"] = None
+        self._commit(record)
     
-    def update_player(self, old_name, new_name, rank=None, stars=None, roblox_link="", position=None):
-        for i, player in enumerate(self.players):
-            if player["name"] == old_name:
-                old_position = player.get("position")
-                
-                if self.leaderboard_type == 'classic':
-                    if rank not in self.RANK_POINTS:
-                        raise ValueError(f"Invalid rank: {rank}")
-                    
-                    rank_points = self.RANK_POINTS[rank]
-                    rank_percentage = (rank_points / self.MAX_RANK_POINTS) * 100
-                    
-                    player["name"] = new_name
-                    player["rank"] = rank
-                    player["rank_points"] = rank_points
-                    player["rank_percentage"] = rank_percentage
-                    player["roblox_link"] = roblox_link
-                    
-                    if position is not None and position != old_position:
-                        self.players.pop(i)
-                        if old_position is not None:
-                            for p in self.players:
-                                if p.get("position") is not None and p.get("position") > old_position:
-                                    p["position"] = p.get("position") - 1
-                        
-                        for p in self.players:
-                            if p.get("position") is not None and p.get("position") > position:
-                                p["position"] = p.get("position") + 1
-                        
-                        player["position"] = position
-                        self.players.insert(position - 1, player)
-                
-                elif self.leaderboard_type == 'ffa':
-                    if stars not in self.STAR_POINTS:
-                        raise ValueError(f"Invalid star rating: {stars}")
-                    
-                    star_points = self.STAR_POINTS[stars]
-                    star_percentage = (star_points / self.MAX_STAR_POINTS) * 100
-                    
-                    player["name"] = new_name
-                    player["stars"] = stars
-                    player["star_points"] = star_points
-                    player["star_percentage"] = star_percentage
-                    player["roblox_link"] = roblox_link
-                    
-                    if position is not None and position != old_position:
-                        self.players.pop(i)
-                        if old_position is not None:
-                            for p in self.players:
-                                if p.get("position") is not None and p.get("position") > old_position:
-                                    p["position"] = p.get("position") - 1
-                        
-                        for p in self.players:
-                            if p.get("position") is not None and p.get("position") > position:
-                                p["position"] = p.get("position") + 1
-                        
-                        player["position"] = position
-                        self.players.insert(position - 1, player)
-                
-                return
+    @timed('batch')
+    @writer
+    def apply_batch(self, operations):
+        # Operations run through the normal methods; _commit collects their
+        # records with an inverse for each, so a failure part way through
+        # can be undone and a success is logged as a single record.
+        self._batch = []
+        try:
+            for number, operation in enumerate(operations, 1):
+                try:
+                    self.apply_operation(operation)
+                except (ValueError, KeyError, TypeError) as e:
+                    message = f"Missing field: {e.args[0]}" if isinstance(e, KeyError) else str(e)
+                    raise ValueError(f"Operation {number}: {message}")
+        except Exception:
+            for _, undo in reversed(self._batch):
+                self._apply(undo)
+            raise
+        finally:
+            batch, self._batch = self._batch, None
+        
+        record = {"op": "batch", "records": [r for r, _ in batch]}
+        if batch:
+            self._commit(record, {"op": "batch", "records": [undo for _, undo in reversed(batch)]})
+        return record
+    
+    def apply_operation(self, operation):
+        op = operation.get('op')
+        position = operation.get('position')
+        if position is not None:
+            position = int(position)
         
-        raise ValueError(f"Player not found: {old_name}")
+        if op == 'add':
+            if self.leaderboard_type == 'classic':
+                self.add_player(operation['name'], position, operation['rank'], None, operation.get('roblox_link', ''))
+            else:
+                self.add_player(operation['name'], position, None, float(operation['stars']), operation.get('roblox_link', ''))
+        elif op == 'update':
+            name = operation['name']
+            new_name = operation.get('new_name', name)
+            if self.leaderboard_type == 'classic':
+                self.update_player(name, new_name, operation['rank'], None, operation.get('roblox_link', ''), position)
+            else:
+                self.update_player(name, new_name, None, float(operation['stars']), operation.get('roblox_link', ''), position)
+        elif op == 'remove':
+            self.remove_player(operation['name'])
+        elif op == 'swap':
+            self.swap_positions(operation['name1'], operation['name2'])
+        elif op == 'move':
+            if position is None:
+                raise ValueError("position required")
+            self.move_player(operation['name'], position)
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+    
+    @timed('replace')
+    @writer
+    def replace_players(self, players):
+        self._commit({"op": "replace", "players": players})
+    
+    @timed('rescore')
+    @writer
+    def rescore(self):
+        """Re-rank the whole board by points under the current tables.
+
+        Players whose points tie keep their relative order, so hand-placed
+        orderings within a tier survive. The board is committed as a
+        replacement even if nobody moved, so every view sees a new version.
+        """
+        tables = scoring.current
+        players = list(self.players)
+        order = tables.order(players, self.leaderboard_type)
+        self.replace_players([players[i] for i in order])
+        self._write_scoring(tables)
+    
+    def ensure_scored(self):
+        """Re-place players whose points changed since the board was ranked.
+
+        Only tiers whose points differ from the tables in the board's
+        .scoring file move; their players are taken out and put back by
+        points in one batch, in the order they had. Everyone else, including
+        hand-placed players, stays where they are.
+        """
+        if self.scoring_version >= scoring.current.points_version:
+            return False
+        with self.writing():
+            # Another worker may have re-ranked it already.
+            self.scoring_version, ranked = self._read_scoring()
+            tables = scoring.current
+            if self.scoring_version >= tables.points_version:
+                return False
+            points = tables.tier_points(self.leaderboard_type)
+            changed = {tier for tier, value in points.items() if ranked.get(tier, value) != value}
+            moved = [p for p in self.players if self._tier(p) in changed] if changed else []
+            if moved:
+                self.apply_batch([{"op": "remove", "name": p.name} for p in moved] + list(map(self._add_operation, moved)))
+            self._write_scoring(tables)
+        self.save_data()
+        return True
+    
+    def order_players(self, players):
+        # Boards saved before positions were derived from order may mix
+        # positioned and unpositioned rows; keep the order they displayed in.
+        return sorted(players, key=lambda p: (p.get("position") is not None, p.get("position") or float('inf'), -p.get(self.points_key, 0)))
+    
+    def clear(self):
+        self.replace_players([])
     
+    @property
+    def version(self):
+        return self.journal.seq
+    
+    @timed('get_players')
+    @reader
     def get_players(self):
-        if self.leaderboard_type == 'ffa':
-            self.players.sort(key=lambda p: (p.get("position") is not None, p.get("position", float('inf')), -p.get("star_points", 0)))
-        elif self.leaderboard_type == 'classic':
-            self.players.sort(key=lambda p: (p.get("position") is not None, p.get("position", float('inf')), -p.get("rank_points", 0)))
-        return self.players
+        return [p.to_dict(i) for i, p in enumerate(self.players, 1)]
+    
+    @timed('get_page')
+    @reader
+    def get_page(self, offset, limit, after=None):
+        players = self.players.after(after, limit) if after is not None else self.players.slice(offset, offset + limit)
+        return [p.to_dict(i) for i, p in enumerate(players, offset + 1)]
     
+    @contextmanager
+    def writing(self):
+        # Other workers may have written since we last looked; replay their
+        # records before validating anything against the store.
+        with self.lock.write(), self.journal.locked():
+            self._catch_up()
+            yield
+    
+    def catch_up(self):
+        if self.journal.changed():
+            with self.writing():
+                pass
+    
+    @timed('save_data')
     def save_data(self):
-        with open(self.data_file, 'w') as f:
-            json.dump(self.players, f, indent=2)
+        self.journal.sync()
     
+    @timed('load_data')
     def load_data(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                self.players = json.load(f)
+        players, records = self.journal.load()
+        if not self.journal.replay:
+            # The store reads the board straight from the database.
+            return
+        if not self.journal.ordered:
+            players = self.order_players(players)
+        self.players.load(list(map(self.player_type.from_dict, players)))
+        for record in records:
+            self._apply(record)
+    
+    def _commit(self, record, undo=None):
+        # Records are applied first because placement by points depends on
+        # the store; if the log write then fails, the change is taken back
+        # out before anyone outside this lock can see it.
+        if record["op"] != "batch":
+            undo = self._undo(record)
+            self._apply(record)
+        if "index" in record and record["index"] is None:
+            # Placement by points depends on tree shape; log where it
+            # landed so replay is exact.
+            record["index"] = self.players.index_of(record["player"]["name"])
+        if self._batch is not None:
+            self._batch.append((record, undo))
+            return
+        
+        try:
+            if record["op"] == "replace":
+                # A whole new board is cheaper to snapshot than to log.
+                self.journal.checkpoint(record["players"])
+            else:
+                self.journal.append(record)
+        except BaseException:
+            self._apply(undo)
+            raise
+        if record["op"] != "replace" and self.journal.should_compact(len(self.players)):
+            self.journal.compact(list(self.players))
+        self._notify(record)
+    
+    def _catch_up(self):
+        if not self.journal.changed():
+            return
+        records = self.journal.tail()
+        if records is None:
+            # Another worker compacted or replaced the board.
+            self.load_data()
+            self._notify({"op": "replace"})
+            return
+        for record in records:
+            if self.journal.replay:
+                self._apply(record)
+            self._notify(record)
+    
+    def _notify(self, record):
+        for listener in self.listeners:
+            listener(self, record)
+    
+    def _apply(self, record):
+        op = record["op"]
+        if op == "add":
+            self.players.insert(self._player(record["player"]), record["index"])
+        elif op == "remove":
+            self.players.remove(record["name"])
+        elif op == "update":
+            self.players.replace(record["name"], self._player(record["player"]))
+            if "index" in record:
+                self.players.move(record["player"]["name"], record["index"])
+        elif op == "swap":
+            self.players.swap(*record["names"])
+        elif op == "move":
+            self.players.move(record["name"], record["index"])
+        elif op == "batch":
+            for sub_record in record["records"]:
+                self._apply(sub_record)
+        elif op == "replace":
+            record["players"] = self.players.load(record["players"])
+    
+    def _tier(self, player):
+        return player.rank if self.leaderboard_type == 'classic' else str(player.stars)
+    
+    def _add_operation(self, player):
+        operation = {"op": "add", "name": player.name, "roblox_link": player.roblox_link}
+        if self.leaderboard_type == 'classic':
+            operation["rank"] = player.rank
+        else:
+            operation["stars"] = player.stars
+        return operation
+    
+    def _read_scoring(self):
+        try:
+            with open(self.scoring_file, 'rb') as f:
+                ranked = loads(f.read())
+        except FileNotFoundError:
+            ranked = None
+        if not isinstance(ranked, dict):
+            # Boards older than the file were ranked by every rescore so far.
+            self._write_scoring(scoring.current)
+            return self._read_scoring()
+        return ranked["points_version"], ranked["points"]
+    
+    def _write_scoring(self, tables):
+        tmp_file = self.scoring_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(dumps({"points_version": tables.points_version, "points": tables.tier_points(self.leaderboard_type)}))
+        os.replace(tmp_file, self.scoring_file)
+        self.scoring_version = tables.points_version
+    
+    def _player(self, data):
+        # Records replayed from the log carry plain dicts.
+        return data if isinstance(data, self.player_type) else self.player_type.from_dict(data)
+    
+    def _undo(self, record):
+        op = record["op"]
+        if op == "add":
+            return {"op": "remove", "name": record["player"]["name"]}
+        if op == "remove":
+            name = record["name"]
+            return {"op": "add", "player": self.players.get(name), "index": self.players.index_of(name)}
+        if op == "update":
+            name = record["name"]
+            return {"op": "update", "name": record["player"]["name"], "player": self.players.get(name), "index": self.players.index_of(name)}
+        if op == "move":
+            return {"op": "move", "name": record["name"], "index": self.players.index_of(record["name"])}
+        if op == "swap":
+            return record
+        if op == "replace":
+            if self._batch is not None:
+                raise ValueError(f"{op} cannot be batched")
+            return {"op": "replace", "players": list(self.players)}
+        raise ValueError(f"{op} cannot be batched")
 
-leaderboards = {
-    'ffa': Leaderboard('ffa'),
-    'classic': Leaderboard('classic')
-}
+broadcasters = {}
+histories = {}
+name_indexes = {}
+# The board instance the entries above belong to, by name. A board can be
+# reloaded while its evicted instance is still being flushed, so closing
+# one must not take the new instance's entries with it.
+board_owners = {}
+board_owners_lock = threading.Lock()
+
+def open_board(name, leaderboard_type):
+    if leaderboard_type == 'overall':
+        # The view listens to its source boards, so they have to stay the
+        # same objects for as long as it lives.
+        leaderboards.pin('classic')
+        leaderboards.pin('ffa')
+        leaderboards.pin(name)
+        lb = OverallView(leaderboards['classic'], leaderboards['ffa'])
+    else:
+        lb = Leaderboard(leaderboard_type, name)
+        # An evicted board may still be in use by a request; release its
+        # files once nothing refers to it.
+        weakref.finalize(lb, lb.journal.close)
+    broadcaster = Broadcaster(lb.version)
+    broadcaster.attach(lb)
+    name_index = NameIndex(lb)
+    history = None
+    if leaderboard_type != 'overall':
+        history = BoardHistory(os.path.splitext(lb.data_file)[0] + '.history', lb)
+    with board_owners_lock:
+        board_owners[name] = lb
+        broadcasters[name] = broadcaster
+        name_indexes[name] = name_index
+        if history is not None:
+            histories[name] = history
+    return lb
+
+def close_board(lb):
+    with board_owners_lock:
+        if board_owners.get(lb.name) is not lb:
+            return
+        del board_owners[lb.name]
+        broadcasters.pop(lb.name, None)
+        histories.pop(lb.name, None)
+        name_indexes.pop(lb.name, None)
+    response_cache.evict(lb.name)
+    for gauge in (BOARD_PLAYERS, BOARD_VERSION, STREAM_SUBSCRIBERS):
+        gauge.remove(board=lb.name)
+
+def board_busy(lb):
+    broadcaster = broadcasters.get(lb.name)
+    return broadcaster is not None and broadcaster.subscribers > 0
+
+leaderboards = BoardRegistry(BUILTIN_BOARDS, PLAYER_TYPES, open_board, close_board, board_busy)
+response_cache = ResponseCache()
+pages = ResponseCache()
+profiler = RequestProfiler()
+
+@REGISTRY.collector
+def collect_board_metrics():
+    for lb in leaderboards.resident():
+        broadcaster = broadcasters.get(lb.name)
+        BOARD_PLAYERS.set(len(lb.players), board=lb.name)
+        BOARD_VERSION.set(lb.version, board=lb.name)
+        STREAM_SUBSCRIBERS.set(broadcaster.subscribers if broadcaster is not None else 0, board=lb.name)
+    lookups = response_cache.hits + response_cache.misses
+    CACHE_HIT_RATIO.set(response_cache.hits / lookups if lookups else 0.0)
 
 def get_current_leaderboard(lb_type):
-    return leaderboards.get(lb_type, leaderboards['classic'])
+    lb = leaderboards[lb_type]
+    # Boards that were cold when the tables changed are ranked on first use.
+    lb.ensure_scored()
+    return lb
+
+def reading(lb):
+    lb.catch_up()
+    return lb.lock.read()
+
+@app.before_request
+def start_request_metrics():
+    g.started = time.perf_counter()
+    g.profile = profiler.start()
+
+def request_route():
+    # Label by route pattern, not path, so player names don't become series.
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.after_request
+def record_request_metrics(response):
+    g.status = response.status_code
+    if request.content_length:
+        REQUEST_BYTES.observe(request.content_length, route=request_route(), method=request.method)
+    if response.content_length is not None:
+        RESPONSE_BYTES.observe(response.content_length, route=request_route(), method=request.method)
+    return response
+
+@app.teardown_request
+def record_request_seconds(exc):
+    # Teardown runs even when a view raises and no response was finished,
+    # so those requests are counted as the 500s they became.
+    started = g.pop('started', None)
+    if started is not None:
+        status = g.pop('status', 500)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route=request_route(), method=request.method, status=status)
+
+@app.before_request
+def refresh_scoring():
+    # Another worker may have saved new tables.
+    scoring.refresh()
+
+@app.teardown_request
+def stop_request_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.stop(profile, f"{request.method}-{request.endpoint}")
+
+@app.before_request
+def reject_read_only_writes():
+    lb_type = (request.view_args or {}).get('lb_type')
+    if request.method != 'GET' and lb_type in leaderboards and leaderboards[lb_type].read_only:
+        return jsonify({"success": False, "error": f"The {lb_type} leaderboard is read-only"}), 405
+
+@app.errorhandler(BoardNotFound)
+def board_not_found(e):
+    return jsonify({"success": False, "error": str(e)}), 404
+
+def render_page(leaderboard_type):
+    return render_template('index.html',
+                           leaderboard_type=leaderboard_type,
+                           ranks=list(scoring.current.rank_points),
+                           stars=list(scoring.current.star_points)).encode()
+
+def page_entry(leaderboard_type):
+    # A page only changes with the scoring tables, so it is rendered and
+    # compressed once per scoring version rather than once per request.
+    return pages.get(('page', leaderboard_type), scoring.current.version,
+                     lambda: render_page(leaderboard_type), 'text/html')
+
+def prerender_pages():
+    with app.app_context():
+        for leaderboard_type in ('classic', 'ffa', 'overall'):
+            entry = page_entry(leaderboard_type)
+            entry.encoded('gzip')
+            if brotli is not None:
+                entry.encoded('br')
 
 @app.route('/')
 def index():
-    lb = get_current_leaderboard('classic')
-    return render_template('index.html', 
-                         leaderboard_type='classic',
-                         ranks=list(lb.RANK_POINTS.keys()),
-                         stars=sorted(lb.STAR_POINTS.keys()))
+    return send_cached(page_entry('classic'))
 
 @app.route('/ffa')
 def ffa():
-    lb = get_current_leaderboard('ffa')
-    return render_template('index.html', 
-                         leaderboard_type='ffa',
-                         ranks=list(lb.RANK_POINTS.keys()),
-                         stars=sorted(lb.STAR_POINTS.keys()))
+    return send_cached(page_entry('ffa'))
 
 @app.route('/classic')
 def classic():
-    lb = get_current_leaderboard('classic')
-    return render_template('index.html', 
-                         leaderboard_type='classic',
-                         ranks=list(lb.RANK_POINTS.keys()),
-                         stars=sorted(lb.STAR_POINTS.keys()))
+    return send_cached(page_entry('classic'))
+
+@app.route('/overall')
+def overall():
+    return send_cached(page_entry('overall'))
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    entry = assets.get(filename)
+    if entry is None:
+        return jsonify({"success": False, "error": f"Asset not found: {filename}"}), 404
+    return send_cached(entry, cache_control=ASSET_CACHE_CONTROL)
+
+prerender_pages()
+
+@app.route('/api/leaderboards', methods=['GET'])
+def list_leaderboards():
+    return jsonify({"leaderboards": [
+        {"name": name, "type": leaderboards.kind_of(name), "resident": leaderboards.peek(name) is not None}
+        for name in leaderboards.names()
+    ]})
+
+@app.route('/api/leaderboards', methods=['POST'])
+def create_leaderboard():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "name and type required"}), 400
+    
+    try:
+        lb = leaderboards.create(data.get('name'), data.get('type'))
+    except BoardExists as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    return jsonify({"success": True, "name": lb.name, "type": lb.leaderboard_type, "version": lb.version}), 201
 
 @app.route('/api/players/<lb_type>', methods=['GET'])
 def get_players(lb_type):
     lb = get_current_leaderboard(lb_type)
-    return jsonify(lb.get_players())
+    if not is_page_request(request.args):
+        with reading(lb):
+            entry = response_cache.get_encoded(('players', lb.name), lb.version, lb.get_players, negotiate_format())
+        return send_cached(entry)
+    
+    try:
+        with reading(lb):
+            page = get_page(lb, request.args)
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except KeyError as e:
+        return jsonify({"success": False, "error": f"Player not found: {e.args[0]}"}), 404
+
+@app.route('/api/players/<lb_type>/search', methods=['GET'])
+def search_players(lb_type):
+    lb = get_current_leaderboard(lb_type)
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"success": False, "error": "q is required"}), 400
+    
+    try:
+        limit = int_arg(request.args, 'limit', SEARCH_LIMIT, 1, MAX_SEARCH_LIMIT)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    with reading(lb):
+        results = [dict(lb.players.get(name), position=lb.players.index_of(name) + 1, match=match, score=score)
+                   for name, match, score in name_indexes[lb.name].search(query, limit)]
+        return jsonify({"query": query, "results": results, "version": lb.version})
+
+def changes_response(lb, names):
+    """Just the named players, so a one-row edit doesn't ship the whole board."""
+    names = list(dict.fromkeys(names))
+    with lb.lock.read():
+        changed = sorted((lb.players.index_of(name) + 1, name) for name in names if name in lb.players)
+        return jsonify({
+            "success": True,
+            "players": [dict(lb.players.get(name), position=position) for position, name in changed],
+            "removed": [name for name in names if name not in lb.players],
+            "version": lb.version,
+        })
 
 @app.route('/api/players/<lb_type>', methods=['POST'])
 def add_player(lb_type):
     lb = get_current_leaderboard(lb_type)
     data = request.json
     try:
-        if lb_type == 'classic':
+        if lb.leaderboard_type == 'classic':
             lb.add_player(data['name'], None, data['rank'], None, data.get('roblox_link', ''))
-        elif lb_type == 'ffa':
+        elif lb.leaderboard_type == 'ffa':
             lb.add_player(data['name'], None, None, float(data['stars']), data.get('roblox_link', ''))
         
         lb.save_data()
-        return jsonify({"success": True, "players": lb.get_players()})
+        return changes_response(lb, [data['name']])
     except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
@@ -269,13 +677,13 @@ def update_player(lb_type, old_name):
         new_name = data.get('new_name', old_name)
         position = data.get('position')
         
-        if lb_type == 'classic':
+        if lb.leaderboard_type == 'classic':
             lb.update_player(old_name, new_name, data['rank'], None, data.get('roblox_link', ''), position)
-        elif lb_type == 'ffa':
+        elif lb.leaderboard_type == 'ffa':
             lb.update_player(old_name, new_name, None, float(data['stars']), data.get('roblox_link', ''), position)
         
         lb.save_data()
-        return jsonify({"success": True, "players": lb.get_players()})
+        return changes_response(lb, [old_name, new_name])
     except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
@@ -284,14 +692,14 @@ def remove_player(lb_type, name):
     lb = get_current_leaderboard(lb_type)
     lb.remove_player(name)
     lb.save_data()
-    return jsonify({"success": True, "players": lb.get_players()})
+    return changes_response(lb, [name])
 
 @app.route('/api/players/<lb_type>/delete-all', methods=['DELETE'])
 def delete_all_players(lb_type):
     lb = get_current_leaderboard(lb_type)
-    lb.players = []
+    lb.clear()
     lb.save_data()
-    return jsonify({"success": True, "players": lb.get_players()})
+    return jsonify({"success": True, "players": [], "version": lb.version})
 
 @app.route('/api/players/<lb_type>/swap', methods=['POST'])
 def swap_positions(lb_type):
@@ -306,70 +714,198 @@ def swap_positions(lb_type):
     try:
         lb.swap_positions(name1, name2)
         lb.save_data()
-        return jsonify({"success": True, "players": lb.get_players()})
+        return changes_response(lb, [name1, name2])
     except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
-@app.route('/api/leaderboards/<lb_type>/import', methods=['POST'])
-def import_leaderboard(lb_type):
+@app.route('/api/leaderboards/<lb_type>/batch', methods=['POST'])
+def apply_batch(lb_type):
     lb = get_current_leaderboard(lb_type)
-    data = request.json
-    players_data = data.get('players', [])
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else data
     
-    if not players_data:
-        return jsonify({"success": False, "error": "No players provided"}), 400
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"success": False, "error": "No operations provided"}), 400
+    if not all(isinstance(operation, dict) for operation in operations):
+        return jsonify({"success": False, "error": "Each operation must be an object"}), 400
     
     try:
-        lb.players = []
+        record = lb.apply_batch(operations)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    lb.save_data()
+    return changes_response(lb, changed_names(record))
+
+@app.route('/api/leaderboards/<lb_type>/rescore', methods=['POST'])
+def rescore_leaderboard(lb_type):
+    lb = leaderboards[lb_type]
+    lb.rescore()
+    lb.save_data()
+    return jsonify({"success": True, "version": lb.version, "scoring_version": scoring.current.version})
+
+@app.route('/api/scoring', methods=['GET'])
+def get_scoring():
+    return jsonify(scoring.current.to_config())
+
+@app.route('/api/scoring', methods=['PUT'])
+def update_scoring():
+    previous = scoring.current
+    try:
+        tables = scoring.update(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    # Derived fields follow the new tables on their own. When points changed,
+    # players on the changed tiers have to be re-placed: boards already in
+    # memory are done here, the rest when next used (see ensure_scored).
+    rescored = {}
+    pending = []
+    if tables.points_version != previous.points_version:
+        for lb in leaderboards.resident():
+            if lb.leaderboard_type in PLAYER_TYPES and lb.ensure_scored():
+                rescored[lb.name] = lb.version
+        pending = [name for name in leaderboards.names()
+                   if leaderboards.kind_of(name) in PLAYER_TYPES and leaderboards.peek(name) is None]
+    return jsonify({"success": True, "scoring": tables.to_config(), "rescored": rescored, "pending": pending})
+
+@app.route('/api/leaderboards/<lb_type>/export', methods=['GET'])
+def export_leaderboard(lb_type):
+    lb = get_current_leaderboard(lb_type)
+    export_format = request.args.get('format', lb.leaderboard_type)
+    
+    try:
+        max_length = int_arg(request.args, 'max_length', DEFAULT_MAX_LENGTH, 100, MAX_LENGTH)
         
-        for player in players_data:
-            if lb_type == 'classic':
-                if not player.get('rank'):
-                    continue
-                rank = player['rank']
-                if rank not in lb.RANK_POINTS:
-                    continue
-                    
-                rank_points = lb.RANK_POINTS[rank]
-                rank_percentage = (rank_points / lb.MAX_RANK_POINTS) * 100
-                
-                player_obj = {
-                    "name": player['name'],
-                    "rank": rank,
-                    "rank_points": rank_points,
-                    "rank_percentage": rank_percentage,
-                    "roblox_link": player.get('roblox_link', ''),
-                }
-                if player.get('position'):
-                    player_obj["position"] = player['position']
-                    
-                lb.players.append(player_obj)
-            elif lb_type == 'ffa':
-                if player.get('stars') is None:
-                    continue
-                stars = float(player['stars'])
-                if stars not in lb.STAR_POINTS:
-                    continue
-                    
-                star_points = lb.STAR_POINTS[stars]
-                star_percentage = (star_points / lb.MAX_STAR_POINTS) * 100
-                
-                player_obj = {
-                    "name": player['name'],
-                    "stars": stars,
-                    "star_points": star_points,
-                    "star_percentage": star_percentage,
-                    "roblox_link": player.get('roblox_link', ''),
-                }
-                if player.get('position'):
-                    player_obj["position"] = player['position']
-                    
-                lb.players.append(player_obj)
+        def build():
+            messages = render(lb.get_players(), export_format, max_length)
+            return {"format": export_format, "messages": messages, "version": lb.version}
         
-        lb.save_data()
-        return jsonify({"success": True, "players": lb.get_players()})
-    except Exception as e:
+        with reading(lb):
+            entry = response_cache.get_encoded(('export', lb.name, export_format, max_length), lb.version, build, negotiate_format())
+    except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 400
+    
+    return send_cached(entry)
+
+@app.route('/api/leaderboards/<lb_type>/events', methods=['GET'])
+def stream_events(lb_type):
+    lb = get_current_leaderboard(lb_type)
+    broadcaster = broadcasters[lb.name]
+    
+    try:
+        since = request.headers.get('Last-Event-ID') or request.args.get('since')
+        version = int(since) if since is not None else None
+    except ValueError:
+        return jsonify({"success": False, "error": "since must be an integer"}), 400
+    
+    return Response(broadcaster.stream(version, poll=lb.catch_up), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def get_history(lb):
+    history = histories.get(lb.name)
+    if history is None:
+        raise LookupError(f"No history is kept for the {lb.name} leaderboard")
+    return history
+
+@app.route('/api/leaderboards/<lb_type>/history', methods=['GET'])
+def board_history(lb_type):
+    lb = get_current_leaderboard(lb_type)
+    try:
+        history = get_history(lb)
+        at = parse_time(request.args['at']) if 'at' in request.args else now_ms()
+        board = history.as_of(at)
+        if is_page_request(request.args):
+            data = get_page(board, request.args)
+        else:
+            data = {"players": board.get_players(), "total": len(board.players), "version": board.version}
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except KeyError as e:
+        return jsonify({"success": False, "error": f"Player not found: {e.args[0]}"}), 404
+    except LookupError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    
+    data["at"] = at / 1000
+    return jsonify(data)
+
+@app.route('/api/leaderboards/<lb_type>/history/<name>', methods=['GET'])
+def player_history(lb_type, name):
+    lb = get_current_leaderboard(lb_type)
+    try:
+        history = get_history(lb)
+        since = parse_time(request.args['since']) if 'since' in request.args else 0
+        until = parse_time(request.args['until']) if 'until' in request.args else None
+        points = history.trajectory(name, since, until)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    
+    if not points:
+        return jsonify({"success": False, "error": f"No history for player: {name}"}), 404
+    return jsonify({"name": name, "points": points})
+
+def run_import(lb, rows, empty_error):
+    importer = BatchImporter(lb)
+    
+    try:
+        with OPERATION_SECONDS.time(board=lb.name, operation='import'):
+            total = importer.run(rows)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    if not total:
+        return jsonify({"success": False, "error": empty_error}), 400
+    
+    players = importer.players()
+    IMPORT_ROWS.inc(len(players), board=lb.name, result='accepted')
+    IMPORT_ROWS.inc(importer.rejected, board=lb.name, result='rejected')
+    if not players:
+        return jsonify({"success": False, "error": "No valid players provided", "rejected": importer.rejected, "rejections": importer.report()}), 400
+    
+    lb.replace_players(players)
+    lb.save_data()
+    return jsonify({
+        "success": True,
+        "imported": len(players),
+        "rejected": importer.rejected,
+        "rejections": importer.report(),
+        "version": lb.version,
+    })
+
+@app.route('/api/leaderboards/<lb_type>/import', methods=['POST'])
+def import_leaderboard(lb_type):
+    lb = get_current_leaderboard(lb_type)
+    return run_import(lb, read_rows(request.stream, request.mimetype), "No players provided")
+
+@app.route('/api/leaderboards/<lb_type>/import-text', methods=['POST'])
+def import_leaderboard_text(lb_type):
+    lb = get_current_leaderboard(lb_type)
+    rows = parse_text(iter_text_lines(request.stream), lb.leaderboard_type)
+    return run_import(lb, rows, "Could not parse any players from the provided text")
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.cli.command('migrate-sqlite')
+def migrate_sqlite():
+    """Copy the JSON boards into the SQLite database."""
+    if STORAGE == 'sqlite':
+        raise SystemExit("Run the migration with LEADERBOARD_STORAGE=json so the JSON boards are loaded")
+    boards = [leaderboards[name] for name in leaderboards.names() if leaderboards.kind_of(name) in PLAYER_TYPES]
+    migrate(open_database(), boards)
+    for lb in boards:
+        print(f"{lb.name}: {len(lb.players)} players at version {lb.version}")
+
+@app.cli.command('build-assets')
+def build_assets():
+    """Write the fingerprinted, precompressed static files."""
+    # Running workers keep the bundle they loaded; restart them to serve this one.
+    bundle = AssetBundle(app.static_folder, ASSET_DIR).build()
+    for name, item in sorted(bundle.by_name.items()):
+        print(f"{name} -> {os.path.join(ASSET_DIR, item.hashed_name)} ({', '.join(sorted(item.bodies))})")
 
 if __name__ == '__main__':
     app.run(debug=True)
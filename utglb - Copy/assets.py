@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from serialization import dumps, loads
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+URL_PREFIX = '/assets/'
+# Where files are served as they are when no bundle has been built.
+STATIC_PREFIX = '/static/'
+# Hashed names change with their content, so browsers may keep them forever.
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MANIFEST = 'manifest.json'
+
+
+class Asset:
+    """One static file under its content-hashed name, compressed up front.
+
+    Shaped like the response cache's entries so send_cached() can serve it.
+    """
+
+    def __init__(self, name, body):
+        self.name = name
+        self.digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        stem, ext = os.path.splitext(name)
+        self.hashed_name = f"{stem}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.bodies = {'identity': body}
+
+    def encoded(self, encoding):
+        return self.bodies.get(encoding, self.bodies['identity'])
+
+    def etag(self, encoding):
+        return self.digest if encoding == 'identity' else f"{self.digest}-{encoding}"
+
+    def compress(self, output_dir=None):
+        # Compressed once per content, so spend the time on the best ratio,
+        # and reuse what an earlier build left on disk.
+        encoders = {'gzip': ('.gz', lambda body: gzip.compress(body, compresslevel=9, mtime=0))}
+        if brotli is not None:
+            encoders['br'] = ('.br', lambda body: brotli.compress(body, quality=11))
+        for encoding, (suffix, compress) in encoders.items():
+            path = output_dir and os.path.join(output_dir, self.hashed_name + suffix)
+            if path and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    self.bodies[encoding] = f.read()
+            else:
+                self.bodies[encoding] = compress(self.bodies['identity'])
+
+
+class AssetBundle:
+    """The static folder, fingerprinted and precompressed.
+
+    build() hashes every file, compresses it with gzip (and brotli, if
+    installed) and, given an output directory, writes name.<hash>.ext with
+    its .gz/.br siblings plus a manifest, so a front-end server can serve
+    them straight from disk. Files are content-addressed, so builds running
+    at the same time write identical bytes and never clobber each other.
+
+    Building is a deploy step (flask build-assets); the app only load()s
+    what the last build wrote, and without a build url() points at the
+    plain static files.
+    """
+
+    def __init__(self, source_dir, output_dir=None):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.by_name = {}
+        self.by_hashed_name = {}
+
+    def build(self):
+        by_name = {}
+        # The output usually lives inside the static folder; skip it.
+        skip = self.output_dir and os.path.abspath(self.output_dir)
+        for root, dirs, files in os.walk(self.source_dir):
+            dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != skip)
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.source_dir).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    by_name[name] = Asset(name, f.read())
+
+        for asset in by_name.values():
+            asset.compress(self.output_dir)
+        if self.output_dir is not None:
+            self.write(by_name)
+        self._index(by_name)
+        return self
+
+    def load(self):
+        """Read the bundle the last build wrote; empty if there is none."""
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST), 'rb') as f:
+                manifest = loads(f.read())
+        except FileNotFoundError:
+            manifest = {}
+        by_name = {}
+        for name, hashed_name in manifest.items():
+            path = os.path.join(self.output_dir, hashed_name)
+            try:
+                with open(path, 'rb') as f:
+                    asset = Asset(name, f.read())
+            except FileNotFoundError:
+                continue
+            for encoding, suffix in (('gzip', '.gz'), ('br', '.br')):
+                if os.path.exists(path + suffix):
+                    with open(path + suffix, 'rb') as f:
+                        asset.bodies[encoding] = f.read()
+            by_name[name] = asset
+        self._index(by_name)
+        return self
+
+    def _index(self, by_name):
+        self.by_name = by_name
+        self.by_hashed_name = {asset.hashed_name: asset for asset in by_name.values()}
+
+    def write(self, by_name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        for asset in by_name.values():
+            for encoding, suffix in (('identity', ''), ('gzip', '.gz'), ('br', '.br')):
+                if encoding not in asset.bodies:
+                    continue
+                path = os.path.join(self.output_dir, asset.hashed_name + suffix)
+                if os.path.exists(path):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_file = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(asset.bodies[encoding])
+                os.replace(tmp_file, path)
+        manifest = dumps({name: asset.hashed_name for name, asset in sorted(by_name.items())})
+        tmp_file = os.path.join(self.output_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(manifest)
+        os.replace(tmp_file, os.path.join(self.output_dir, MANIFEST))
+
+    def url(self, name):
+        asset = self.by_name.get(name)
+        if asset is None:
+            return STATIC_PREFIX + name
+        return URL_PREFIX + asset.hashed_name
+
+    def get(self, hashed_name):
+        return self.by_hashed_name.get(hashed_name)
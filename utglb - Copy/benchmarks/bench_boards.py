@@ -0,0 +1,92 @@
+"""Measure start-up time and memory as the number of hosted boards grows.
+
+Run from the app directory:
+
+    python benchmarks/bench_boards.py [--boards N] [--players N] [--reads N]
+
+A set of named boards is created and filled in one process. Fresh
+processes then start the app with different resident-board limits and
+serve a skewed read workload (most reads go to a few hot boards). Each
+reports its start-up time, latency for reads that had to load a cold board
+and reads that found it resident, and its peak RSS. Results are printed as
+JSON.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import harness
+
+HOT_BOARDS = 4
+HOT_SHARE = 0.8
+
+
+def populate(boards, players):
+    import app
+    import serialization
+
+    rng = harness.seeded()
+    client = app.app.test_client()
+    for i in range(boards):
+        kind = ('classic', 'ffa')[i % 2]
+        assert client.post('/api/leaderboards', json={"name": f"board{i}", "type": kind}).status_code == 201
+        body = serialization.dumps({"players": harness.synthetic_rows(kind, players, rng)})
+        assert client.post(f'/api/leaderboards/board{i}/import', data=body, content_type='application/json').status_code == 200
+
+
+def serve(boards, reads):
+    """Runs in a fresh process, so start-up and peak RSS are its own."""
+    started = time.perf_counter()
+    import app
+    startup = time.perf_counter() - started
+
+    rng = harness.seeded()
+    client = app.app.test_client()
+    cold = harness.Timer()
+    warm = harness.Timer()
+    for _ in range(reads):
+        board = rng.randrange(HOT_BOARDS) if rng.random() < HOT_SHARE else rng.randrange(boards)
+        name = f"board{board}"
+        timer = warm if app.leaderboards.peek(name) is not None else cold
+        response = timer.time(client.get, f'/api/players/{name}?offset=0&limit=50')
+        assert response.status_code == 200, response.json
+    return {
+        "max_boards": app.leaderboards.max_boards,
+        "startup_ms": round(startup * 1000, 1),
+        "cold_read": cold.summary(),
+        "warm_read": warm.summary(),
+        "resident_boards": len(app.leaderboards.resident()),
+        # ru_maxrss is KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--boards', type=int, default=64)
+    parser.add_argument('--players', type=int, default=5000)
+    parser.add_argument('--reads', type=int, default=2000)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        os.environ['LEADERBOARD_MAX_BOARDS'] = str(args.serve)
+        json.dump(serve(args.boards, args.reads), sys.stdout)
+        return
+
+    workdir = harness.use_workdir()
+    populate(args.boards, args.players)
+    results = []
+    for limit in (HOT_BOARDS, 2 * HOT_BOARDS, args.boards):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--serve', str(limit), '--boards', str(args.boards),
+                                 '--reads', str(args.reads)], cwd=workdir, check=True, capture_output=True).stdout
+        results.append(dict(boards=args.boards, players_per_board=args.players, **json.loads(output)))
+    harness.emit("boards", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Micro-benchmark the Leaderboard operations and the import route.
+
+Run from the app directory:
+
+    python benchmarks/bench_core.py [players ...]
+
+Each board size is loaded through the import route, then every mutation is
+timed call by call together with the save_data() a route would follow it
+with. Set LEADERBOARD_STORAGE=sqlite to measure the SQLite backend.
+Results are printed as JSON with latency percentiles.
+"""
+import harness
+
+MUTATIONS = 1000
+
+
+def read_repeats(count):
+    return max(3, min(50, 300000 // count))
+
+
+def bench_board(client, lb, count, rng):
+    import serialization
+
+    board = lb.leaderboard_type
+    timers = {op: harness.Timer() for op in ('import', 'add_player', 'update_player', 'swap_positions', 'remove_player', 'save_data', 'get_players', 'load_data')}
+
+    body = serialization.dumps({"players": harness.synthetic_rows(board, count, rng)})
+    for _ in range(1 if count >= 100000 else 3):
+        response = timers['import'].time(client.post, f'/api/leaderboards/{board}/import', data=body, content_type='application/json')
+        assert response.json["imported"] == count, response.json
+
+    names = [f"Player{i}" for i in range(count)]
+    value = lambda: harness.random_value(board, rng)
+    rank_stars = lambda: (value(), None) if board == 'classic' else (None, value())
+
+    added = [f"Bench{i}" for i in range(MUTATIONS)]
+    for name in added:
+        rank, stars = rank_stars()
+        timers['add_player'].time(lb.add_player, name, None, rank, stars, '')
+        timers['save_data'].time(lb.save_data)
+    for name in rng.sample(names, min(MUTATIONS, count)):
+        rank, stars = rank_stars()
+        timers['update_player'].time(lb.update_player, name, name, rank, stars, '')
+        timers['save_data'].time(lb.save_data)
+    for _ in range(MUTATIONS):
+        name1, name2 = rng.sample(names, 2)
+        timers['swap_positions'].time(lb.swap_positions, name1, name2)
+        timers['save_data'].time(lb.save_data)
+    for name in added:
+        timers['remove_player'].time(lb.remove_player, name)
+        timers['save_data'].time(lb.save_data)
+
+    for _ in range(read_repeats(count)):
+        players = timers['get_players'].time(lb.get_players)
+    assert len(players) == count
+    for _ in range(3):
+        with lb.writing():
+            timers['load_data'].time(lb.load_data)
+
+    return [dict(board=board, players=count, operation=op, **timer.summary()) for op, timer in timers.items()]
+
+
+def main(sizes):
+    harness.use_workdir()
+    import app
+
+    client = app.app.test_client()
+    rng = harness.seeded()
+    results = []
+    for count in sizes:
+        for board in ('classic', 'ffa'):
+            results.extend(bench_board(client, app.leaderboards[board], count, rng))
+    harness.emit("core", results)
+
+
+if __name__ == '__main__':
+    main(harness.sizes_from_argv([1000, 10000, 100000]))
@@ -0,0 +1,74 @@
+"""Measure the desktop viewer's board model (overall.py) on large boards.
+
+Run from the app directory:
+
+    python benchmarks/bench_desktop.py [players ...]
+
+legacy_refresh is what the viewer used to do after every add or remove:
+re-sort the whole list and concatenate one string for the text widget.
+The rest time the sorted model and what a redraw now formats, one window
+of VISIBLE_ROWS rows; Tk itself then rewrites at most that many items, so
+no timing here grows with the board past the list insert. sync_1pct feeds
+the web app's rows back with one in a hundred players changed. Needs
+tkinter importable, though no display. Results are printed as JSON.
+"""
+import harness
+
+REPEATS = 200
+
+
+def legacy_refresh(players):
+    players.sort(key=lambda p: p["final_score"], reverse=True)
+    output = "\n" + "=" * 100 + "\n"
+    for position, player in enumerate(players, 1):
+        output += f"{position:<6} {player['name']:<20} {player['rank']:<15} {player['stars']:<8.1f} {player['rank_percentage']:<12.2f} {player['star_percentage']:<12.2f} {player['final_score']:<12.2f}\n"
+    return output
+
+
+def bench_board(count, rng):
+    import overall
+    from scoring import current
+
+    ranks = list(current.rank_points)
+    stars = list(current.star_points)
+    rows = [{"name": f"Player{i}", "rank": rng.choice(ranks), "stars": rng.choice(stars)} for i in range(count)]
+    lb = overall.Leaderboard()
+    result = {"players": count}
+
+    timer = harness.Timer()
+    timer.time(lb.load, rows)
+    result["load"] = timer.summary()
+
+    timer = harness.Timer()
+    for _ in range(3):
+        timer.time(legacy_refresh, list(lb.players))
+    result["legacy_refresh"] = timer.summary()
+
+    adds, removes, windows = harness.Timer(), harness.Timer(), harness.Timer()
+    for i in range(REPEATS):
+        name = f"New{i}"
+        index = adds.time(lb.add_player, name, rng.choice(ranks), rng.choice(stars))
+        first = max(0, index - overall.VISIBLE_ROWS // 2)
+        windows.time(lambda: [overall.format_row(p + 1, lb.players[p]) for p in range(first, min(first + overall.VISIBLE_ROWS, len(lb.players)))])
+        removes.time(lb.remove_player, name)
+    result["add_player"] = adds.summary()
+    result["remove_player"] = removes.summary()
+    result["render_window"] = windows.summary()
+
+    for row in rng.sample(rows, count // 100):
+        row["stars"] = rng.choice(stars)
+    timer = harness.Timer()
+    first, _ = timer.time(lb.sync, rows)
+    result["sync_1pct"] = timer.summary()
+    result["sync_first_changed"] = first
+    return result
+
+
+def main(sizes):
+    harness.use_workdir()
+    rng = harness.seeded()
+    harness.emit("desktop", [bench_board(count, rng) for count in sizes])
+
+
+if __name__ == '__main__':
+    main(harness.sizes_from_argv([100000, 1000000]))
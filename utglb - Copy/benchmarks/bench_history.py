@@ -0,0 +1,78 @@
+"""Measure history storage per change and as-of reconstruction latency.
+
+Run from the app directory:
+
+    python benchmarks/bench_history.py [players ...]
+
+Each board is imported, then hit with a seeded stream of rating updates,
+moves and swaps. The history directory is measured on disk and the board
+is reconstructed at random past moments. Results are printed as JSON.
+"""
+import os
+
+import harness
+
+CHANGES = 20000
+SAMPLES = 20
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_board(app, count, rng):
+    import serialization
+    from history import SNAPSHOT_SUFFIX
+
+    lb = app.leaderboards['classic']
+    history = app.histories['classic']
+    client = app.app.test_client()
+    body = serialization.dumps(harness.synthetic_rows('classic', count, rng))
+    client.post('/api/leaderboards/classic/import', data=body, content_type='application/json')
+    before = dir_size(history.directory)
+    snapshots_before = sum(1 for name in os.listdir(history.directory) if name.endswith(SNAPSHOT_SUFFIX))
+
+    names = [f"Player{i}" for i in range(count)]
+    moments = []
+    timer = harness.Timer()
+    for i in range(CHANGES):
+        kind = rng.random()
+        if kind < 0.6:
+            name = rng.choice(names)
+            timer.time(lb.update_player, name, name, harness.random_value('classic', rng), None, '')
+        elif kind < 0.8:
+            timer.time(lb.move_player, rng.choice(names), rng.randint(1, count))
+        else:
+            timer.time(lb.swap_positions, *rng.sample(names, 2))
+        if i % (CHANGES // SAMPLES) == 0:
+            moments.append(history.ts)
+    change_bytes = dir_size(history.directory) - before
+
+    rebuild = harness.Timer()
+    for at in moments:
+        rebuild.time(history.as_of, at)
+    trajectory = harness.Timer()
+    for name in rng.sample(names, 5):
+        trajectory.time(history.trajectory, name)
+    return {
+        "players": count,
+        "changes": CHANGES,
+        "history_bytes": change_bytes,
+        "bytes_per_change": round(change_bytes / CHANGES, 1),
+        "snapshots": sum(1 for name in os.listdir(history.directory) if name.endswith(SNAPSHOT_SUFFIX)) - snapshots_before,
+        "change_with_history": timer.summary(),
+        "as_of": rebuild.summary(),
+        "trajectory_full_history": trajectory.summary(),
+    }
+
+
+def main(sizes):
+    harness.use_workdir()
+    import app
+
+    rng = harness.seeded()
+    harness.emit("history", [bench_board(app, count, rng) for count in sizes])
+
+
+if __name__ == '__main__':
+    main(harness.sizes_from_argv([10000, 100000]))
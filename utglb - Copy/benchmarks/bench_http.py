@@ -0,0 +1,121 @@
+"""Drive the HTTP routes with a concurrent mixed read/write workload.
+
+Run from the app directory:
+
+    python benchmarks/bench_http.py [--players N] [--threads N] [--requests N] [--board classic|ffa]
+
+The board is loaded through the import route, then every thread replays
+its own seeded sequence of requests through a Flask test client. The
+mutation routes other than batch answer with the whole board, as the page
+expects, so their latency grows with board size. Results are printed as
+JSON with latency percentiles per route and overall throughput.
+"""
+import argparse
+import threading
+import time
+
+import harness
+
+# (route, weight); page reads dominate, as they do for viewers.
+MIX = [
+    ('page', 50),
+    ('board', 15),
+    ('export', 5),
+    ('add', 10),
+    ('batch_update', 10),
+    ('swap', 5),
+    ('remove', 5),
+]
+
+
+def plan(board, count, requests, rng, thread):
+    """Build one thread's request sequence up front so timing excludes it."""
+    routes, weights = zip(*MIX)
+    value_key = 'rank' if board == 'classic' else 'stars'
+    added = []
+    steps = []
+    for i in range(requests):
+        route = rng.choices(routes, weights)[0]
+        if route == 'remove' and not added:
+            route = 'add'
+        if route == 'page':
+            offset = rng.randrange(max(count - 50, 1))
+            steps.append((route, 'GET', f'/api/players/{board}?offset={offset}&limit=50', None))
+        elif route == 'board':
+            steps.append((route, 'GET', f'/api/players/{board}', None))
+        elif route == 'export':
+            steps.append((route, 'GET', f'/api/leaderboards/{board}/export', None))
+        elif route == 'add':
+            name = f"T{thread}-{i}"
+            added.append(name)
+            steps.append((route, 'POST', f'/api/players/{board}', {"name": name, value_key: harness.random_value(board, rng)}))
+        elif route == 'batch_update':
+            operations = [{"op": "update", "name": f"Player{rng.randrange(count)}", value_key: harness.random_value(board, rng)} for _ in range(5)]
+            steps.append((route, 'POST', f'/api/leaderboards/{board}/batch', operations))
+        elif route == 'swap':
+            name1, name2 = (f"Player{n}" for n in rng.sample(range(count), 2))
+            steps.append((route, 'POST', f'/api/players/{board}/swap', {"name1": name1, "name2": name2}))
+        else:
+            steps.append((route, 'DELETE', f'/api/players/{board}/{added.pop(rng.randrange(len(added)))}', None))
+    return steps
+
+
+def worker(client, steps, timers, errors, lock):
+    mine = {route: harness.Timer() for route, _ in MIX}
+    failed = 0
+    for route, method, url, body in steps:
+        response = mine[route].time(client.open, url, method=method, json=body)
+        if response.status_code >= 400:
+            failed += 1
+    with lock:
+        for route, timer in mine.items():
+            timers[route].samples.extend(timer.samples)
+        errors.append(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=250, help="requests per thread")
+    parser.add_argument('--board', choices=('classic', 'ffa'), default='classic')
+    args = parser.parse_args()
+
+    harness.use_workdir()
+    import app
+    import serialization
+
+    rng = harness.seeded()
+    setup = app.app.test_client()
+    body = serialization.dumps({"players": harness.synthetic_rows(args.board, args.players, rng)})
+    assert setup.post(f'/api/leaderboards/{args.board}/import', data=body, content_type='application/json').status_code == 200
+
+    plans = [plan(args.board, args.players, args.requests, rng, thread) for thread in range(args.threads)]
+    timers = {route: harness.Timer() for route, _ in MIX}
+    errors = []
+    lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(app.app.test_client(), steps, timers, errors, lock)) for steps in plans]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(steps) for steps in plans)
+    all_samples = [sample for timer in timers.values() for sample in timer.samples]
+    harness.emit("http_mixed", {
+        "board": args.board,
+        "players": args.players,
+        "threads": args.threads,
+        "requests": total,
+        "errors": sum(errors),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "overall": harness.latency_summary(all_samples),
+        "routes": {route: timer.summary() for route, timer in timers.items()},
+    })
+
+
+if __name__ == '__main__':
+    main()
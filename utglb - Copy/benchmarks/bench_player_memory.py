@@ -0,0 +1,97 @@
+"""Compare the memory held by a board of dict players and of player records.
+
+Run from the app directory:
+
+    python benchmarks/bench_player_memory.py [players ...]
+
+Both layouts are built from the same decoded JSON snapshot, the way a board
+is loaded, and measured with tracemalloc once the source rows are freed.
+Results are printed as JSON.
+"""
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+def legacy_rows(board, count):
+    from scoring import current
+
+    # The layout make_player used to build: inputs plus derived fields.
+    rows = []
+    for i in range(count):
+        if board == 'classic':
+            rank = random.choice(list(current.rank_points))
+            points = current.rank_points[rank]
+            rows.append({"name": f"Player{i}", "rank": rank, "rank_points": points,
+                         "rank_percentage": (points / current.max_rank_points) * 100, "roblox_link": f"https://www.roblox.com/users/{i}/profile"})
+        else:
+            stars = random.choice(list(current.star_points))
+            points = current.star_points[stars]
+            rows.append({"name": f"Player{i}", "stars": stars, "star_points": points,
+                         "star_percentage": (points / current.max_star_points) * 100, "roblox_link": f"https://www.roblox.com/users/{i}/profile"})
+    # Round-trip through JSON so every value is its own object, as on load.
+    return json.dumps(rows)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    board = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+    return size, elapsed
+
+
+def run(board, count):
+    from player import PLAYER_TYPES
+    from store import PlayerStore
+
+    snapshot = legacy_rows(board, count)
+    player_type = PLAYER_TYPES[board]
+    points_key = 'rank_points' if board == 'classic' else 'star_points'
+
+    def dict_board():
+        store = PlayerStore(points_key)
+        store.load(json.loads(snapshot))
+        return store
+
+    def record_board():
+        store = PlayerStore(points_key)
+        store.load(list(map(player_type.from_dict, json.loads(snapshot))))
+        return store
+
+    dict_bytes, dict_seconds = measure(dict_board)
+    record_bytes, record_seconds = measure(record_board)
+    return {
+        "board": board,
+        "players": count,
+        "dict_bytes": dict_bytes,
+        "record_bytes": record_bytes,
+        "dict_bytes_per_player": round(dict_bytes / count, 1),
+        "record_bytes_per_player": round(record_bytes / count, 1),
+        "saved": round(1 - record_bytes / dict_bytes, 3),
+        "dict_load_seconds": round(dict_seconds, 3),
+        "record_load_seconds": round(record_seconds, 3),
+    }
+
+
+def main(sizes):
+    random.seed(0)
+    results = [run(board, count) for count in sizes for board in ('classic', 'ffa')]
+    json.dump({"benchmark": "player_memory", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000, 300000])
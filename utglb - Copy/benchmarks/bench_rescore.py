@@ -0,0 +1,76 @@
+"""Measure re-ranking boards after a scoring table change.
+
+Run from the app directory:
+
+    python benchmarks/bench_rescore.py [players ...]
+
+For each size, the ranking pass alone (Scoring.order) is timed with numpy,
+when it is installed, and with the pure Python fallback. Then a whole
+Leaderboard.rescore() is timed: the pass plus reloading the store,
+snapshotting the journal and every listener's rebuild. Inverted tier values
+make every player move. Results are printed as JSON.
+"""
+import harness
+
+REPEATS = 3
+
+
+def players_for(board, count, rng):
+    from player import PLAYER_TYPES
+
+    player_type = PLAYER_TYPES[board]
+    return [player_type.from_dict(row) for row in harness.synthetic_rows(board, count, rng)]
+
+
+def inverted(current):
+    """The current tables with every tier's points reversed."""
+    top_rank = max(current.rank_points.values())
+    top_star = max(current.star_points.values())
+    return {
+        "ranks": {rank: top_rank - points + 1 for rank, points in current.rank_points.items()},
+        "stars": {str(stars): top_star - points + 1.5 for stars, points in current.star_points.items()},
+    }
+
+
+def bench_board(app, board, count, rng):
+    import scoring
+
+    lb = app.leaderboards[board]
+    players = players_for(board, count, rng)
+    tables = scoring.Scoring(dict(scoring.current.to_config(), **inverted(scoring.current)))
+    result = {"board": board, "players": count}
+
+    numpy = scoring.load_numpy()
+    for name, module in (("order_numpy", numpy), ("order_python", None)):
+        if name == "order_numpy" and numpy is None:
+            continue
+        scoring.numpy = module
+        timer = harness.Timer()
+        for _ in range(REPEATS):
+            timer.time(tables.order, players, board)
+        result[name] = timer.summary()
+    scoring.numpy = numpy
+
+    lb.replace_players(players)
+    timer = harness.Timer()
+    previous = scoring.current
+    for i in range(REPEATS):
+        # Alternate tables so each pass moves everyone.
+        scoring.current = tables if i % 2 == 0 else previous
+        timer.time(lb.rescore)
+    scoring.current = previous
+    result["rescore_board"] = timer.summary()
+    lb.clear()
+    return result
+
+
+def main(sizes):
+    harness.use_workdir()
+    import app
+
+    rng = harness.seeded()
+    harness.emit("rescore", [bench_board(app, board, count, rng) for count in sizes for board in ('classic', 'ffa')])
+
+
+if __name__ == '__main__':
+    main(harness.sizes_from_argv([100000, 1000000]))
@@ -0,0 +1,84 @@
+"""Measure player search latency, index build time and index memory.
+
+Run from the app directory:
+
+    python benchmarks/bench_search.py [players ...]
+
+Boards get names built from random syllables and digits, so prefixes and
+trigrams are spread the way real handles are rather than all starting with
+"Player". Queries go through the search route and are grouped by kind:
+type-ahead prefixes of growing length, fragments from the middle of a name,
+and names with one character dropped. Results are printed as JSON.
+"""
+import tracemalloc
+
+import harness
+
+SYLLABLES = ['ka', 'ri', 'zo', 'mu', 'shi', 'ne', 'tor', 'vax', 'el', 'qu', 'dra', 'po', 'lin', 'gar', 'fy', 'ux']
+QUERIES = 200
+
+
+def handle(rng, i):
+    return ''.join(rng.choice(SYLLABLES).title() if rng.random() < 0.3 else rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + str(i)
+
+
+def queries(names, rng):
+    picked = [rng.choice(names) for _ in range(QUERIES)]
+    return {
+        "prefix_1": [name[:1] for name in picked],
+        "prefix_3": [name[:3] for name in picked],
+        "prefix_6": [name[:6] for name in picked],
+        "full_name": picked,
+        "fragment": [name[len(name) // 3:len(name) // 3 + 5] for name in picked],
+        "typo": [name[:len(name) // 2] + name[len(name) // 2 + 1:] for name in picked],
+    }
+
+
+def bench_board(app, count, rng):
+    import serialization
+    from search import NameIndex
+
+    lb = app.leaderboards['classic']
+    client = app.app.test_client()
+    names = [handle(rng, i) for i in range(count)]
+    rows = [{"name": name, "rank": harness.random_value('classic', rng)} for name in names]
+    client.post('/api/leaderboards/classic/import', data=serialization.dumps(rows), content_type='application/json')
+
+    # The route's own index is already built; these extra ones are timed,
+    # then measured, and detached again.
+    build = harness.Timer()
+    for _ in range(3):
+        lb.listeners.remove(build.time(NameIndex, lb).on_change)
+    tracemalloc.start()
+    index = NameIndex(lb)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    lb.listeners.remove(index.on_change)
+
+    results = {"players": count, "index_build_ms": build.summary()["mean_ms"], "index_bytes_per_player": round(index_bytes / count)}
+    hits = 0
+    for kind, batch in queries(names, rng).items():
+        timer = harness.Timer()
+        for query in batch:
+            response = timer.time(client.get, '/api/players/classic/search', query_string={"q": query, "limit": 10})
+            hits += bool(response.json["results"])
+        results[kind] = timer.summary()
+    results["queries_with_results"] = hits
+
+    update = harness.Timer()
+    for name in rng.sample(names, 500):
+        update.time(lb.update_player, name, name + 'x', 'S High', None, '')
+    results["rename_with_index"] = update.summary()
+    return results
+
+
+def main(sizes):
+    harness.use_workdir()
+    import app
+
+    rng = harness.seeded()
+    harness.emit("search", [bench_board(app, count, rng) for count in sizes])
+
+
+if __name__ == '__main__':
+    main(harness.sizes_from_argv([10000, 100000]))
@@ -0,0 +1,79 @@
+"""Compare encode/decode speed and payload size of the response formats.
+
+Run from the app directory:
+
+    python benchmarks/bench_serialization.py [players ...]
+
+Each board is encoded in its API form (what GET /api/players returns) with
+the stdlib encoder and with orjson and msgpack when they are installed.
+Results are printed as JSON.
+"""
+import json
+import os
+import random
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+REPEATS = 5
+
+
+def board(count):
+    from player import ClassicPlayer
+    from scoring import current
+
+    ranks = list(current.rank_points)
+    players = [ClassicPlayer(f"Player{i}", random.choice(ranks), f"https://www.roblox.com/users/{i}/profile") for i in range(count)]
+    return [p.to_dict(i) for i, p in enumerate(players, 1)]
+
+
+def formats():
+    import serialization
+
+    found = {"json": (lambda obj: json.dumps(obj, separators=(',', ':')).encode(), json.loads)}
+    if serialization.orjson is not None:
+        found["orjson"] = (serialization.orjson.dumps, serialization.orjson.loads)
+    if serialization.msgpack is not None:
+        found["msgpack"] = (serialization.msgpack.packb, serialization.msgpack.unpackb)
+    return found
+
+
+def best(fn, arg):
+    times = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn(arg)
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def run(count, encoders):
+    players = board(count)
+    results = []
+    for name, (encode, decode) in encoders.items():
+        encode_seconds, body = best(encode, players)
+        decode_seconds, _ = best(decode, body)
+        results.append({
+            "format": name,
+            "players": count,
+            "bytes": len(body),
+            "encode_seconds": round(encode_seconds, 4),
+            "decode_seconds": round(decode_seconds, 4),
+            "encode_mb_per_second": round(len(body) / encode_seconds / 1e6, 1),
+            "decode_mb_per_second": round(len(body) / decode_seconds / 1e6, 1),
+        })
+    return results
+
+
+def main(sizes):
+    random.seed(0)
+    encoders = formats()
+    results = [result for count in sizes for result in run(count, encoders)]
+    json.dump({"benchmark": "serialization", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 100000])
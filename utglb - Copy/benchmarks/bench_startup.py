@@ -0,0 +1,115 @@
+"""Measure cold start time and the bytes a first page load transfers.
+
+Run from the app directory:
+
+    python benchmarks/bench_startup.py [--players N] [--runs N]
+
+Classic and FFA board files of the given size are written to a temporary
+directory, then fresh processes import the app and serve a first page and
+a first board read. The first process runs before any assets are built and
+links the plain /static/ files; then `flask build-assets` fingerprints and
+compresses them, as a deploy would, and the rest load what it wrote. Boards
+load on first use, so import and the first page do not grow with board
+size; the first board read is where loading happens.
+
+Page-load bytes are for one page plus the assets it links, per
+Accept-Encoding, against the old uncompressed /static/ files, and for a
+repeat visit, where the page revalidates and the assets come from the
+browser cache. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+import harness
+
+
+def serve():
+    started = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+
+    client = app.app.test_client()
+    assert client.get('/').status_code == 200
+    paged = time.perf_counter()
+    assert client.get('/api/players/classic?offset=0&limit=50').status_code == 200
+    loaded = time.perf_counter()
+    ms = lambda seconds: round(seconds * 1000, 1)
+    return {
+        "import_ms": ms(imported - started),
+        "first_page_ms": ms(paged - imported),
+        "first_board_ms": ms(loaded - paged),
+        # ru_maxrss is KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def page_bytes():
+    import app
+    from responses import brotli
+
+    client = app.app.test_client()
+    page = client.get('/', headers={'Accept-Encoding': 'identity'}).data.decode()
+    links = re.findall(r'/assets/[^"]+', page)
+    results = {}
+    for encoding in ['identity', 'gzip'] + (['br'] if brotli is not None else []):
+        headers = {'Accept-Encoding': encoding}
+        response = client.get('/', headers=headers)
+        total = len(response.data) + sum(len(client.get(link, headers=headers).data) for link in links)
+        repeat = client.get('/', headers=dict(headers, **{'If-None-Match': response.headers['ETag']}))
+        results[encoding] = {"first_visit": total, "repeat_visit": len(repeat.data), "repeat_status": repeat.status_code}
+    static = [client.get('/static/' + app.assets.get(link[len('/assets/'):]).name) for link in links]
+    results["legacy_identity"] = {"first_visit": len(page) + sum(len(r.data) for r in static)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--bytes', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve or args.bytes:
+        json.dump(serve() if args.serve else page_bytes(), sys.stdout)
+        return
+
+    workdir = harness.use_workdir()
+    import serialization
+
+    rng = harness.seeded()
+    for board in ('classic', 'ffa'):
+        with open(f'leaderboard_{board}.json', 'wb') as f:
+            f.write(serialization.dumps({"players": harness.synthetic_rows(board, args.players, rng), "seq": 0}))
+    env = dict(os.environ, LEADERBOARD_ASSETS=os.path.join(workdir, 'assets'), PYTHONPATH=harness.APP_DIR)
+
+    def run(flag):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), flag], cwd=workdir, env=env,
+                                check=True, capture_output=True).stdout
+        return json.loads(output)
+
+    unbuilt = run('--serve')
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'build-assets'], cwd=workdir, env=env,
+                   check=True, capture_output=True)
+    build_ms = round((time.perf_counter() - started) * 1000, 1)
+    runs = [unbuilt] + [run('--serve') for _ in range(args.runs)]
+    warm = {key: harness.latency_summary([r[key] / 1000 for r in runs[1:]]) for key in ("import_ms", "first_page_ms", "first_board_ms")}
+    harness.emit("startup", {
+        "players_per_board": args.players,
+        "unbuilt": unbuilt,
+        "build_assets_ms": build_ms,
+        "built": warm,
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+        "page_bytes": run('--bytes'),
+    })
+
+
+if __name__ == '__main__':
+    main()
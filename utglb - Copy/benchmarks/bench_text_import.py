@@ -0,0 +1,102 @@
+"""Benchmark the server-side text import on multi-megabyte pastes.
+
+Run from the app directory:
+
+    python benchmarks/bench_text_import.py [players ...]
+
+Boards are written to a temporary directory, never to the real data files.
+Results are printed as JSON.
+"""
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+CLASSIC_TIERS = [('S Tier', ':STier:'), ('A+ Tier', ':HighTier:'), ('A Tier', ':MidTier:'), ('A- Tier', ':LowTier:'), ('B+ Tier', ':LowTier:')]
+STARS = [5.0, 4.5, 4.0, 3.5, 3.0, 2.5, 2.0, 1.5, 1.0, 0.5]
+
+
+def classic_paste(count):
+    lines = []
+    position = 1
+    per_group = max(count // (len(CLASSIC_TIERS) * 3), 1)
+    for tier, emoji in CLASSIC_TIERS:
+        lines.append(f"# {tier} {emoji}")
+        for sub in ('High', 'Mid', 'Low'):
+            lines.append(f"-# {sub}")
+            for _ in range(per_group):
+                if position > count:
+                    break
+                lines.append(f"## {position} - [Player{position}](https://www.roblox.com/users/{random.randint(1, 10**9)}/profile)")
+                position += 1
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def ffa_paste(count):
+    lines = []
+    position = 1
+    per_group = max(count // len(STARS), 1)
+    for stars in STARS:
+        lines.append(f"# {stars} Stars :star:")
+        for _ in range(per_group):
+            if position > count:
+                break
+            lines.append(f"## {position} - [Player{position}](https://www.roblox.com/users/{random.randint(1, 10**9)}/profile)")
+            position += 1
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    workdir = tempfile.mkdtemp(prefix='lb-bench-')
+    os.chdir(workdir)
+
+    import app
+    from importer import BatchImporter, iter_text_lines
+    from textimport import parse_text
+
+    client = app.app.test_client()
+    results = []
+    for lb_type, make_paste in (('classic', classic_paste), ('ffa', ffa_paste)):
+        lb = app.leaderboards[lb_type]
+        for count in sizes:
+            body = make_paste(count).encode()
+            parse_s, rows = timed(lambda: sum(1 for _ in parse_text(iter_text_lines(io.BytesIO(body)), lb_type)))
+
+            def validate():
+                importer = BatchImporter(lb)
+                importer.run(parse_text(iter_text_lines(io.BytesIO(body)), lb_type))
+                return importer.players()
+            validate_s, players = timed(validate)
+
+            request_s, response = timed(lambda: client.post(f'/api/leaderboards/{lb_type}/import-text', data=body, content_type='text/plain'))
+            results.append({
+                "board": lb_type,
+                "players": count,
+                "paste_bytes": len(body),
+                "parsed_rows": rows,
+                "imported": response.json.get("imported"),
+                "parse_s": round(parse_s, 4),
+                "parse_validate_s": round(validate_s, 4),
+                "http_import_s": round(request_s, 4),
+                "parse_mb_per_s": round(len(body) / parse_s / 1e6, 2),
+            })
+    json.dump({"benchmark": "text_import", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10000, 50000, 200000])
@@ -0,0 +1,103 @@
+"""Shared setup for the benchmark scripts.
+
+Boards are generated from a fixed seed and written to a temporary
+directory, never to the real data files, so runs are reproducible and safe
+to point at a checkout.
+"""
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+SEED = 0
+
+
+def use_workdir():
+    """Run the app against empty board files in a fresh directory."""
+    workdir = tempfile.mkdtemp(prefix='lb-bench-')
+    os.chdir(workdir)
+    return workdir
+
+
+def synthetic_rows(board, count, rng, prefix='Player'):
+    from scoring import current
+
+    values = list(current.rank_points) if board == 'classic' else list(current.star_points)
+    key = 'rank' if board == 'classic' else 'stars'
+    return [{"name": f"{prefix}{i}", key: rng.choice(values), "roblox_link": f"https://www.roblox.com/users/{i}/profile"} for i in range(count)]
+
+
+def random_value(board, rng):
+    from scoring import current
+
+    return rng.choice(list(current.rank_points) if board == 'classic' else list(current.star_points))
+
+
+class Timer:
+    """Collects per-call latencies for one operation."""
+
+    def __init__(self):
+        self.samples = []
+
+    def time(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples.append(time.perf_counter() - started)
+        return result
+
+    def summary(self):
+        return latency_summary(self.samples)
+
+
+def percentile(ordered, q):
+    # Nearest rank, so every reported value is a latency that happened.
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "count": len(ordered),
+        "mean_ms": ms(sum(ordered) / len(ordered)),
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p90_ms": ms(percentile(ordered, 90)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]),
+    }
+
+
+def environment():
+    import serialization
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage": os.environ.get('LEADERBOARD_STORAGE', 'json'),
+        "orjson": serialization.orjson is not None,
+        "msgpack": serialization.msgpack is not None,
+        "seed": SEED,
+    }
+
+
+def emit(name, results):
+    json.dump({"benchmark": name, "environment": environment(), "results": results}, sys.stdout, indent=2)
+    print()
+
+
+def sizes_from_argv(default):
+    return [int(n) for n in sys.argv[1:]] or default
+
+
+def seeded():
+    return random.Random(SEED)
@@ -0,0 +1,186 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from locks import flock
+from metrics import BOARD_EVENTS, RESIDENT_BOARDS
+from serialization import dumps, loads
+
+CATALOG_FILE = os.environ.get('LEADERBOARD_CATALOG', 'boards.json')
+MAX_BOARDS = int(os.environ.get('LEADERBOARD_MAX_BOARDS', '32'))
+MAX_PLAYERS = int(os.environ.get('LEADERBOARD_MAX_PLAYERS', '1000000'))
+
+# Names end up in file names and SQLite keys, so keep them plain.
+BOARD_NAME = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{0,63}')
+# leaderboard_data.json predates per-board files and must not be reused.
+RESERVED_NAMES = {'data'}
+
+
+class BoardNotFound(LookupError):
+    pass
+
+
+class BoardExists(ValueError):
+    pass
+
+
+class BoardRegistry:
+    """Every named board, with only recently used ones held in memory.
+
+    The catalog maps board names to their kind (which scoring they use) and
+    is shared by workers through one small JSON file. Boards are opened on
+    first use and kept in LRU order; once more than max_boards are resident,
+    or together they hold more than max_players, the coldest are flushed and
+    dropped. Pinned boards and boards with open event streams stay put.
+
+    An evicted board that a request is still holding keeps working: it
+    catches up from its journal under the file lock like any other worker
+    would, and its files close once the last reference goes.
+    """
+
+    def __init__(self, builtin, kinds, load, unload=None, busy=None, catalog_file=CATALOG_FILE,
+                 max_boards=MAX_BOARDS, max_players=MAX_PLAYERS):
+        self.builtin = dict(builtin)
+        self.kinds = tuple(kinds)
+        self.catalog_file = catalog_file
+        self.max_boards = max_boards
+        self.max_players = max_players
+        self._load = load
+        self._unload = unload
+        self._busy = busy
+        self._catalog = {}
+        self._catalog_stat = None
+        self._resident = OrderedDict()
+        self._pinned = set()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._read_catalog()
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __contains__(self, name):
+        return self.kind_of(name, None) is not None
+
+    def names(self):
+        self._read_catalog()
+        return sorted({**self._catalog, **self.builtin})
+
+    def kind_of(self, name, default=BoardNotFound):
+        kind = self.builtin.get(name) or self._catalog.get(name)
+        if kind is None and self._read_catalog():
+            # Another worker may have created it since we last looked.
+            kind = self._catalog.get(name)
+        if kind is None:
+            if default is BoardNotFound:
+                raise BoardNotFound(f"Leaderboard not found: {name}")
+            return default
+        return kind
+
+    def get(self, name):
+        with self._lock:
+            board = self._resident.get(name)
+            if board is not None:
+                self._resident.move_to_end(name)
+                return board
+        kind = self.kind_of(name)
+        with self._lock:
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        # One thread loads a cold board; the rest wait for it, not each other.
+        try:
+            with loading:
+                with self._lock:
+                    board = self._resident.get(name)
+                if board is None:
+                    board = self._load(name, kind)
+                    with self._lock:
+                        self._resident[name] = board
+                    BOARD_EVENTS.inc(event='load')
+        finally:
+            with self._lock:
+                self._loading.pop(name, None)
+        self._evict_cold(keep=name)
+        return board
+
+    def peek(self, name):
+        """The board if it is resident, without loading or touching it."""
+        return self._resident.get(name)
+
+    def resident(self):
+        with self._lock:
+            return list(self._resident.values())
+
+    def pin(self, name):
+        self._pinned.add(name)
+
+    def create(self, name, kind):
+        if not isinstance(name, str) or not BOARD_NAME.fullmatch(name) or name in RESERVED_NAMES:
+            raise ValueError("Board names are 1-64 letters, digits, '-' or '_'")
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown leaderboard type: {kind}")
+        if name in self.builtin:
+            raise BoardExists(f"Leaderboard already exists: {name}")
+
+        lock_fd = os.open(self.catalog_file + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            flock(lock_fd, 'LOCK_EX')
+            self._read_catalog()
+            if name in self._catalog:
+                raise BoardExists(f"Leaderboard already exists: {name}")
+            catalog = dict(self._catalog, **{name: kind})
+            tmp_file = self.catalog_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(dumps(catalog))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.catalog_file)
+            self._read_catalog()
+        finally:
+            os.close(lock_fd)
+        return self.get(name)
+
+    def _evict_cold(self, keep):
+        with self._lock:
+            boards = list(self._resident.items())
+        count = len(boards)
+        players = sum(len(board.players) for _, board in boards)
+        for name, board in boards:
+            if count <= self.max_boards and players <= self.max_players:
+                break
+            if name == keep or name in self._pinned or (self._busy is not None and self._busy(board)):
+                continue
+            size = len(board.players)
+            self._evict(name, board)
+            count -= 1
+            players -= size
+        RESIDENT_BOARDS.set(count)
+
+    def _evict(self, name, board):
+        with self._lock:
+            if self._resident.get(name) is not board:
+                return
+            del self._resident[name]
+        with board.writing():
+            board.save_data()
+            if board.journal.pending:
+                # Fold the log into a snapshot so the next load is one read.
+                board.journal.compact(list(board.players), wait=True)
+        if self._unload is not None:
+            self._unload(board)
+        BOARD_EVENTS.inc(event='evict')
+
+    def _read_catalog(self):
+        """Reload the catalog if the file changed; True if it did."""
+        try:
+            stat = os.stat(self.catalog_file)
+        except FileNotFoundError:
+            return False
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if key == self._catalog_stat:
+            return False
+        with open(self.catalog_file, 'rb') as f:
+            self._catalog = loads(f.read())
+        self._catalog_stat = key
+        return True
@@ -0,0 +1,20 @@
+import importlib
+
+import pytest
+
+import scoring
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """The app freshly imported on empty boards in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scoring, 'current', scoring.Scoring(scoring.DEFAULT_CONFIG))
+    monkeypatch.setattr(scoring, '_file_stat', None)
+    import app
+    return importlib.reload(app)
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
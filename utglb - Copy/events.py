@@ -0,0 +1,140 @@
+import threading
+from collections import deque
+
+from serialization import dumps
+
+HISTORY_SIZE = 1000
+KEEPALIVE_SECONDS = 15
+POLL_SECONDS = 1
+RETRY_MS = 2000
+
+
+def changed_names(record):
+    op = record["op"]
+    if op == "add":
+        return [record["player"]["name"]]
+    if op in ("remove", "move"):
+        return [record["name"]]
+    if op == "update":
+        return list(dict.fromkeys((record["name"], record["player"]["name"])))
+    if op == "swap":
+        return list(record["names"])
+    if op == "batch":
+        return list(dict.fromkeys(name for sub_record in record["records"] for name in changed_names(sub_record)))
+    return []
+
+
+def _positioned(board, name):
+    return dict(board.players.get(name), position=board.players.index_of(name) + 1)
+
+
+def delta(board, record):
+    op = record["op"]
+    if op == "remove":
+        return {"op": "remove", "name": record["name"]}
+    if op == "swap":
+        return {"op": "swap", "names": record["names"]}
+    if op not in ("add", "update", "move", "refresh", "batch"):
+        return {"op": "reset"}
+
+    names = record["names"] if op == "refresh" else changed_names(record)
+    if op in ("add", "update", "move"):
+        name = names[-1]
+        # A record replayed from another worker may describe a player that a
+        # later change has already removed; fall through to a refresh then.
+        if name in board.players:
+            data = {"op": op, "player": _positioned(board, name)}
+            if op != "add":
+                data["name"] = record["name"]
+            return data
+        op = "refresh"
+    return {
+        "op": op,
+        "players": [_positioned(board, name) for name in names if name in board.players],
+        "removed": [name for name in names if name not in board.players],
+    }
+
+
+def format_event(event, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{head}event: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+class Broadcaster:
+    """Fan one board's delta events out to every stream subscriber.
+
+    Each event is encoded once into its wire form and kept in a short
+    history. Subscribers block on a shared condition and read the same bytes
+    from that history, so a commit costs one encode however many viewers are
+    connected, and a reconnecting client can resume from the last version it
+    saw.
+    """
+
+    def __init__(self, version=0, history_size=HISTORY_SIZE):
+        self.version = version
+        self.subscribers = 0
+        self._events = deque(maxlen=history_size)
+        self._cond = threading.Condition()
+
+    def attach(self, board):
+        board.listeners.append(self.on_change)
+
+    def on_change(self, board, record):
+        self.publish(record.get("seq", board.version), delta(board, record))
+
+    def publish(self, version, data):
+        data["version"] = version
+        message = format_event('delta', data, version)
+        with self._cond:
+            self._events.append((version, message))
+            self.version = version
+            self._cond.notify_all()
+
+    def stream(self, version=None, poll=None, keepalive=KEEPALIVE_SECONDS):
+        with self._cond:
+            self.subscribers += 1
+            if version is None:
+                version = self.version
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            idle = 0
+            while True:
+                if poll is not None:
+                    # Picks up commits made by other worker processes.
+                    poll()
+                with self._cond:
+                    if self.version == version:
+                        self._cond.wait(POLL_SECONDS if poll is not None else keepalive)
+                    messages = self._since(version)
+                    current = self.version
+                if messages is None:
+                    # Too far behind (or from before a restart) to replay;
+                    # tell the client to refetch and carry on from here.
+                    yield format_event('reset', {"version": current}, current)
+                    version = current
+                elif messages:
+                    yield b''.join(messages)
+                    version = current
+                    idle = 0
+                elif poll is None or idle >= keepalive:
+                    yield b": keepalive\n\n"
+                    idle = 0
+                else:
+                    idle += POLL_SECONDS
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    def _since(self, version):
+        if version == self.version:
+            return []
+        events = self._events
+        if version > self.version or not events or events[0][0] > version + 1:
+            return None
+        messages = []
+        for event_version, message in reversed(events):
+            if event_version <= version:
+                break
+            messages.append(message)
+        messages.reverse()
+        return messages
@@ -0,0 +1,153 @@
+import io
+
+import scoring
+from scoring import split_rank
+
+DEFAULT_MAX_LENGTH = 1900
+# Discord's limit on one message.
+MAX_LENGTH = 2000
+
+# Tiers and ratings come from the scoring tables; these only dress up the
+# ones the bot has emoji for.
+TIER_EMOJI = {
+    'S': ':STier:',
+    'A+': ':HighTier:',
+    'A': ':MidTier:',
+    'A-': ':LowTier:',
+    'B+': ':LowTier:',
+}
+
+STAR_EMOJI = {
+    5.0: ':5_star:',
+    4.5: ':4pt5_star:',
+    4.0: ':4_star:',
+    3.5: ':3pt5_star:',
+    3.0: ':3_star:',
+    2.5: ':2pt5_star:',
+    2.0: ':2_star:',
+    1.5: ':1pt5_star:',
+    1.0: ':1_star:',
+    0.5: ':0pt5_star:',
+}
+
+
+def star_emoji(stars):
+    return STAR_EMOJI.get(stars, '⭐')
+
+
+def rank_emoji(rank):
+    return TIER_EMOJI.get(split_rank(rank)[0], '')
+
+
+def format_stars(stars):
+    return f"{stars:g}"
+
+
+def profile_link(player):
+    link = player.get("roblox_link")
+    return f"[{player['name']}]({link})" if link else player["name"]
+
+
+class MessageWriter:
+    """Pack text blocks into messages no longer than max_length.
+
+    Blocks are kept whole where they fit, the way the old client-side export
+    did; a block longer than a whole message is split between lines instead
+    of producing an oversized message.
+    """
+
+    def __init__(self, max_length=DEFAULT_MAX_LENGTH):
+        self.max_length = max_length
+        self.messages = []
+        self._buffer = io.StringIO()
+        self._length = 0
+
+    def add_block(self, lines):
+        length = sum(map(len, lines))
+        if self._length + length > self.max_length:
+            self.flush()
+        if length <= self.max_length:
+            self._write(lines, length)
+            return
+        for line in lines:
+            if self._length + len(line) > self.max_length:
+                self.flush()
+            self._write((line,), len(line))
+
+    def add_line(self, line):
+        self.add_block((line,))
+
+    def flush(self):
+        text = self._buffer.getvalue().strip()
+        if text:
+            self.messages.append(text)
+        self._buffer = io.StringIO()
+        self._length = 0
+
+    def finish(self):
+        self.flush()
+        return self.messages
+
+    def _write(self, lines, length):
+        self._buffer.writelines(lines)
+        self._length += length
+
+
+def render_classic(players, max_length=DEFAULT_MAX_LENGTH):
+    by_rank = {}
+    for player in players:
+        by_rank.setdefault(player.get("rank"), []).append(player)
+
+    writer = MessageWriter(max_length)
+    for tier, ranks in scoring.current.rank_tiers.items():
+        if not any(rank in by_rank for rank, _ in ranks):
+            continue
+        emoji = TIER_EMOJI.get(tier)
+        lines = [f"# {tier} Tier {emoji}\n" if emoji else f"# {tier} Tier\n"]
+        for rank, sub in ranks:
+            if rank in by_rank:
+                if sub:
+                    lines.append(f"-# {sub}\n")
+                lines.extend(f"## {p['position']} - {profile_link(p)}\n" for p in by_rank[rank])
+        lines.append('\n')
+        writer.add_block(lines)
+    return writer.finish()
+
+
+def render_ffa(players, max_length=DEFAULT_MAX_LENGTH):
+    groups = {}
+    for player in players:
+        groups.setdefault(player.get("stars"), []).append(player)
+
+    writer = MessageWriter(max_length)
+    for stars in sorted(scoring.current.star_points, reverse=True):
+        if stars not in groups:
+            continue
+        lines = [f"# {format_stars(stars)} Stars {star_emoji(stars)}\n"]
+        lines.extend(f"## {p['position']} - {profile_link(p)}\n" for p in groups[stars])
+        lines.append('\n')
+        writer.add_block(lines)
+    return writer.finish()
+
+
+def render_overall(players, max_length=DEFAULT_MAX_LENGTH):
+    writer = MessageWriter(max_length)
+    writer.add_line('# Overall Leaderboard\n\n')
+    for index, player in enumerate(players, 1):
+        if player.get("stars") is None or not player.get("rank"):
+            raise ValueError("The overall format needs players with both a rank and a star rating")
+        writer.add_line(f"## {index} - {profile_link(player)} | {star_emoji(player['stars'])} {format_stars(player['stars'])} Stars / {rank_emoji(player['rank'])} {player['rank']}\n")
+    return writer.finish()
+
+
+RENDERERS = {
+    'classic': render_classic,
+    'ffa': render_ffa,
+    'overall': render_overall,
+}
+
+
+def render(players, export_format, max_length=DEFAULT_MAX_LENGTH):
+    if export_format not in RENDERERS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    return RENDERERS[export_format](players, max_length)
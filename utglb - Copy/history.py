@@ -0,0 +1,495 @@
+import bisect
+import gzip
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from itertools import chain
+
+from serialization import dumps, loads
+from store import PlayerStore
+
+SNAPSHOT_MIN_DELTAS = 1000
+# Snapshot once the deltas since the last one reach 1/SNAPSHOT_RATIO of the board.
+SNAPSHOT_RATIO = 8
+SNAPSHOT_SUFFIX = '.json.gz'
+DELTA_FILE = 'deltas.log'
+# How far back history reaches; older snapshots and deltas are pruned.
+# 0 keeps everything.
+RETENTION_MS = int(float(os.environ.get('LEADERBOARD_HISTORY_DAYS', '90')) * 86400 * 1000)
+
+# Delta fields. Each committed change is one log line,
+#     [ms since the previous line, board version, pid, field, old, new, ...]
+# carrying one (pid, field, old, new) group per field it changed. A name
+# going from None is a new player and from a name to None a removal; index
+# deltas carry only the new position, since every insert shifts everyone
+# below it; a swap names the other player's id as its new value. A snapshot
+# marker's new value is true when the board was replaced wholesale rather
+# than just checkpointed.
+NAME, VALUE, LINK, INDEX, SWAP, SNAPSHOT = 'n', 'v', 'l', 'i', 'w', 's'
+FIELDS = (NAME, VALUE, LINK)
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def parse_time(value):
+    """Milliseconds since the epoch from unix seconds or an ISO 8601 string."""
+    try:
+        return int(float(value) * 1000)
+    except (ValueError, OverflowError):
+        pass
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid time: {value}")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+class HistoricalBoard:
+    """A board as it stood at some past moment; read-only."""
+
+    def __init__(self, players, version, at):
+        self.players = players
+        self.version = version
+        self.at = at
+
+    def get_players(self):
+        return [p.to_dict(i) for i, p in enumerate(self.players, 1)]
+
+    def get_page(self, offset, limit, after=None):
+        players = self.players.after(after, limit) if after is not None else self.players.slice(offset, offset + limit)
+        return [p.to_dict(i) for i, p in enumerate(players, offset + 1)]
+
+
+class _Replay:
+    """Rebuilds a board from a snapshot by applying the delta lines after it."""
+
+    def __init__(self, history, snapshot):
+        self.history = history
+        self.load(snapshot)
+
+    def load(self, snapshot):
+        self.names = dict(zip(snapshot["ids"], snapshot["names"]))
+        self.players = PlayerStore(self.history.points_key)
+        self.players.load(list(map(self.history.player_type, snapshot["names"], snapshot["values"], snapshot["links"])))
+        self.ts = snapshot["ts"]
+        self.seq = snapshot["seq"]
+        self._new = {}
+
+    def apply(self, line, end):
+        self.ts += line[0]
+        self.seq = line[1]
+        player_type = self.history.player_type
+        for i in range(2, len(line), 4):
+            pid, field, old, new = line[i:i + 4]
+            if field == SNAPSHOT:
+                snapshot = self.history.snapshot_at(end) if new else None
+                if snapshot is not None:
+                    self.load(snapshot)
+                return
+            if field == NAME and old is None:
+                self._new[pid] = [new, None, '']
+                continue
+            if pid in self._new:
+                row = self._new[pid]
+                if field == INDEX:
+                    del self._new[pid]
+                    self.names[pid] = row[0]
+                    self.players.insert(player_type(*row), new)
+                else:
+                    row[FIELDS.index(field)] = new
+                continue
+
+            name = self.names[pid]
+            if field == INDEX:
+                self.players.move(name, new)
+            elif field == SWAP:
+                self.players.swap(name, self.names[new])
+            elif field == NAME and new is None:
+                self.players.remove(name)
+                del self.names[pid]
+            else:
+                player = self.players.get(name)
+                row = [name, player[self.history.value_key], player["roblox_link"]]
+                row[FIELDS.index(field)] = new
+                self.players.replace(name, player_type(*row))
+                self.names[pid] = row[0]
+
+    def pid_of(self, name):
+        return next((pid for pid, known in self.names.items() if known == name), None)
+
+    def point(self, pid, name):
+        data = {"time": self.ts / 1000, "version": self.seq, "name": self.names.get(pid, name)}
+        if pid not in self.names:
+            data["removed"] = True
+            return data
+        player = self.players.get(data["name"])
+        data[self.history.value_key] = player[self.history.value_key]
+        data["position"] = self.players.index_of(data["name"]) + 1
+        return data
+
+
+class BoardHistory:
+    """Change history for one board, kept as deltas plus periodic snapshots.
+
+    Every committed change is appended to a delta log as the fields it
+    changed, with players named by a stable id so renames and moves stay
+    small. A compressed full snapshot is written whenever the deltas since
+    the last one reach an eighth of the board, which bounds any
+    reconstruction to one snapshot load and that many deltas; replaying a
+    delta costs a tree move, loading a player far less.
+
+    The listener runs under the board's write lock, so appends are ordered
+    across threads and workers alike; records another worker has already
+    logged are recognised by version and skipped.
+
+    History older than RETENTION_MS is pruned as snapshots are taken: older
+    snapshots are deleted, and once the deltas before the oldest one kept
+    outweigh those after it, the log is rewritten without them. Offsets
+    stay absolute; a rewritten log starts with a {"base": offset} line
+    giving the offset of the line after it.
+    """
+
+    def __init__(self, directory, board):
+        self.directory = directory
+        self.delta_file = os.path.join(directory, DELTA_FILE)
+        self.points_key = board.points_key
+        self.player_type = board.player_type
+        self.value_key = 'rank' if board.leaderboard_type == 'classic' else 'stars'
+        os.makedirs(directory, exist_ok=True)
+        with board.writing():
+            self._open(board)
+        board.listeners.append(self.on_change)
+
+    def on_change(self, board, record):
+        self._sync()
+        seq = record.get("seq", board.version)
+        if seq <= self.seq:
+            return
+        ts = max(now_ms(), self.ts)
+        if record["op"] not in ("add", "remove", "update", "move", "swap", "batch"):
+            self._snapshot(board, ts, seq, replaced=True)
+            return
+
+        deltas = []
+        try:
+            self._deltas(record, deltas)
+        except KeyError:
+            # Our view of the board has drifted (say, a log lost to a
+            # crash); the change is already committed, so resynchronise.
+            self._snapshot(board, ts, seq, replaced=True)
+            return
+        self._append([ts - self.ts, seq] + deltas)
+        self.ts = ts
+        self.seq = seq
+        self.pending += len(deltas) // 4
+        if self.pending >= max(SNAPSHOT_MIN_DELTAS, len(board.players) // SNAPSHOT_RATIO):
+            self._snapshot(board, ts, seq)
+
+    def as_of(self, at):
+        replay, lines = self._replay_from(at, strict=True)
+        for line, end in lines:
+            if replay.ts + line[0] > at:
+                break
+            replay.apply(line, end)
+        return HistoricalBoard(replay.players, replay.seq, replay.ts)
+
+    def trajectory(self, name, since=0, until=None):
+        """The player's rating and position after each change that touched them.
+
+        The first point is the player's state at since (or when history
+        starts, if later); the rest are changes up to until.
+        """
+        until = now_ms() if until is None else until
+        replay, lines = self._replay_from(since, strict=False)
+        # Changes between the snapshot and since (inclusive) only set up the
+        # starting state; the first one after since is kept for the loop.
+        first = []
+        for line, end in lines:
+            if replay.ts + line[0] > since:
+                first.append((line, end))
+                break
+            replay.apply(line, end)
+        pid = replay.pid_of(name)
+        points = []
+        if pid is not None and replay.ts <= until:
+            points.append(dict(replay.point(pid, name), time=max(replay.ts, since) / 1000))
+        for line, end in chain(first, lines):
+            if replay.ts + line[0] > until:
+                break
+            was_on = pid is not None and pid in replay.names
+            replay.apply(line, end)
+            deltas = [line[i:i + 4] for i in range(2, len(line), 4)]
+            replaced = any(d[1] == SNAPSHOT and d[3] for d in deltas)
+            # A replacement touches everyone who was on the board, including
+            # those it dropped, who get a removal point below.
+            touched = pid is not None and (replaced and was_on or any(d[0] == pid or (d[1] == SWAP and d[3] == pid) for d in deltas))
+            if pid is None or pid not in replay.names:
+                # Off the board; follow the name if it comes back.
+                appeared = next((d[0] for d in deltas if d[1] == NAME and d[3] == name), None)
+                if appeared is None and replaced:
+                    appeared = replay.pid_of(name)
+                if appeared is not None and appeared in replay.names:
+                    pid = appeared
+                    touched = True
+            if touched:
+                point = replay.point(pid, points[-1]["name"] if points else name)
+                if not points or {**points[-1], "time": None, "version": None} != {**point, "time": None, "version": None}:
+                    points.append(point)
+        return points
+
+    def snapshot_at(self, offset):
+        for _, snapshot_offset, path in self._snapshots():
+            if snapshot_offset == offset:
+                return self._read_snapshot(path)
+        return None
+
+    def _replay_from(self, at, strict, retry=True):
+        snapshots = self._snapshots()
+        if not snapshots:
+            raise ValueError("No history has been recorded yet")
+        index = bisect.bisect_right([ts for ts, _, _ in snapshots], at) - 1
+        if index < 0:
+            if strict:
+                raise ValueError(f"No history before {snapshots[0][0] / 1000}")
+            index = 0
+        _, offset, path = snapshots[index]
+        try:
+            snapshot = self._read_snapshot(path)
+        except FileNotFoundError:
+            if not retry:
+                raise
+            # Pruned since we listed them.
+            return self._replay_from(at, strict, retry=False)
+        return _Replay(self, snapshot), self._lines(offset)
+
+    def _deltas(self, record, out):
+        op = record["op"]
+        if op == "batch":
+            for sub_record in record["records"]:
+                self._deltas(sub_record, out)
+        elif op == "add":
+            row = self._row(record["player"])
+            pid = self.next_id
+            self.next_id += 1
+            self.ids[row[0]] = pid
+            self.rows[pid] = row
+            for field, value in zip(FIELDS, row):
+                if value or field != LINK:
+                    out += [pid, field, None, value]
+            out += [pid, INDEX, None, record["index"]]
+        elif op == "remove":
+            pid = self.ids.pop(record["name"])
+            out += [pid, NAME, self.rows.pop(pid)[0], None]
+        elif op == "update":
+            pid = self.ids.pop(record["name"])
+            row = self._row(record["player"])
+            for field, old, new in zip(FIELDS, self.rows[pid], row):
+                if old != new:
+                    out += [pid, field, old, new]
+            self.ids[row[0]] = pid
+            self.rows[pid] = row
+            if "index" in record:
+                out += [pid, INDEX, None, record["index"]]
+        elif op == "move":
+            out += [self.ids[record["name"]], INDEX, None, record["index"]]
+        elif op == "swap":
+            name1, name2 = record["names"]
+            out += [self.ids[name1], SWAP, None, self.ids[name2]]
+
+    def _row(self, player):
+        return (player["name"], player[self.value_key], player.get("roblox_link") or '')
+
+    def _open(self, board):
+        self.ids = {}
+        self.rows = {}
+        self.next_id = 0
+        self.ts = 0
+        self.seq = -1
+        self.offset = 0
+        self.pending = 0
+        snapshots = self._snapshots()
+        if snapshots:
+            _, _, path = snapshots[-1]
+            self._load_state(self._read_snapshot(path))
+            self._sync(repair=True)
+        else:
+            self.offset = self._log_end()[0]
+        if self.seq != board.version:
+            # First run, or the board changed while history was not being
+            # kept; start again from what the board holds now.
+            self._snapshot(board, max(now_ms(), self.ts), board.version, replaced=True)
+
+    def _load_state(self, snapshot):
+        self.ids = dict(zip(snapshot["names"], snapshot["ids"]))
+        self.rows = dict(zip(snapshot["ids"], zip(snapshot["names"], snapshot["values"], snapshot["links"])))
+        self.next_id = snapshot["next_id"]
+        self.ts = snapshot["ts"]
+        self.seq = snapshot["seq"]
+        self.offset = snapshot["offset"]
+        self.pending = 0
+
+    def _sync(self, repair=False):
+        """Fold in lines other workers appended since we last wrote."""
+        size, base = self._log_end()
+        if size == self.offset:
+            return
+        if self.offset < base:
+            # Another worker pruned past where we were; its newest snapshot
+            # is past the cut.
+            _, _, path = self._snapshots()[-1]
+            self._load_state(self._read_snapshot(path))
+        if size < self.offset:
+            self.offset = size
+            return
+        for line, end in self._lines(self.offset):
+            self._track(line, end)
+            self.offset = end
+        if repair and self.offset != size:
+            # Drop a line torn by a crash so new appends start cleanly.
+            os.truncate(self.delta_file, os.path.getsize(self.delta_file) - (size - self.offset))
+
+    def _track(self, line, end):
+        self.ts += line[0]
+        self.seq = line[1]
+        for i in range(2, len(line), 4):
+            pid, field, old, new = line[i:i + 4]
+            if field == SNAPSHOT:
+                snapshot = self.snapshot_at(end) if new else None
+                if snapshot is not None:
+                    self._load_state(snapshot)
+                self.pending = 0
+                return
+            self.pending += 1
+            if field == NAME and old is None:
+                self.rows[pid] = (new, None, '')
+                self.ids[new] = pid
+                self.next_id = max(self.next_id, pid + 1)
+            elif field == NAME and new is None:
+                del self.ids[self.rows.pop(pid)[0]]
+            elif field in FIELDS:
+                row = list(self.rows[pid])
+                if field == NAME:
+                    del self.ids[row[0]]
+                    self.ids[new] = pid
+                row[FIELDS.index(field)] = new
+                self.rows[pid] = tuple(row)
+
+    def _snapshot(self, board, ts, seq, replaced=False):
+        # Rows are tuples of strings and numbers, which the garbage collector
+        # stops tracking, so a large board's state costs it nothing to scan.
+        value_key = self.value_key
+        ids = {}
+        rows = {}
+        for player in board.players:
+            name = player.name
+            pid = self.ids.get(name)
+            if pid is None:
+                pid = self.next_id
+                self.next_id += 1
+            ids[name] = pid
+            rows[pid] = (name, getattr(player, value_key), player.roblox_link)
+        self.ids = ids
+        self.rows = rows
+        # Stored by column: a few flat lists of strings and numbers decode
+        # far faster than a list per player.
+        names, values, links = zip(*rows.values()) if rows else ((), (), ())
+        columns = {"ids": list(rows), "names": names, "values": values, "links": links}
+
+        # The marker line tells readers replaying past this point to pick
+        # the board up from the snapshot instead.
+        self._append([ts - self.ts, seq, -1, SNAPSHOT, None, replaced])
+        self.ts = ts
+        self.seq = seq
+        self.pending = 0
+        path = os.path.join(self.directory, f"{ts:013d}-{self.offset:012d}{SNAPSHOT_SUFFIX}")
+        with open(path + '.tmp', 'wb') as f:
+            data = dumps({"ts": ts, "seq": seq, "offset": self.offset, "next_id": self.next_id, **columns})
+            f.write(gzip.compress(data, compresslevel=1))
+        os.replace(path + '.tmp', path)
+        if RETENTION_MS:
+            self._prune(ts - RETENTION_MS)
+
+    def _prune(self, cutoff):
+        # Replays of the retained window start from the newest snapshot at
+        # or before the cutoff, so that one stays.
+        expired = [snapshot for snapshot in self._snapshots() if snapshot[0] <= cutoff]
+        if not expired:
+            return
+        for _, _, path in expired[:-1]:
+            os.remove(path)
+        cut = expired[-1][1]
+        _, base = self._log_end()
+        # Rewriting copies what is kept, so wait until it is the smaller part.
+        if cut - base < self.offset - cut:
+            return
+        f, shift, _ = self._open_log()
+        with f:
+            f.seek(cut - shift)
+            with open(self.delta_file + '.tmp', 'wb') as out:
+                out.write(dumps({"base": cut}) + b'\n')
+                shutil.copyfileobj(f, out)
+        os.replace(self.delta_file + '.tmp', self.delta_file)
+
+    def _append(self, line):
+        data = dumps(line) + b'\n'
+        fd = os.open(self.delta_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while data:
+                written = os.write(fd, data)
+                self.offset += written
+                data = data[written:]
+        finally:
+            os.close(fd)
+
+    def _snapshots(self):
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(SNAPSHOT_SUFFIX):
+                ts, offset = filename[:-len(SNAPSHOT_SUFFIX)].split('-')
+                snapshots.append((int(ts), int(offset), os.path.join(self.directory, filename)))
+        snapshots.sort()
+        return snapshots
+
+    def _read_snapshot(self, path):
+        with open(path, 'rb') as f:
+            return loads(gzip.decompress(f.read()))
+
+    def _open_log(self):
+        """The delta log, the shift from file positions to offsets, and
+        the offset of its first line."""
+        f = open(self.delta_file, 'rb')
+        if f.read(1) != b'{':
+            f.seek(0)
+            return f, 0, 0
+        header = b'{' + f.readline()
+        base = loads(header)["base"]
+        return f, base - len(header), base
+
+    def _log_end(self):
+        """The offset past the last byte of the log, and of its first line."""
+        try:
+            f, shift, base = self._open_log()
+        except FileNotFoundError:
+            return 0, 0
+        with f:
+            return os.fstat(f.fileno()).st_size + shift, base
+
+    def _lines(self, offset):
+        try:
+            f, shift, base = self._open_log()
+        except FileNotFoundError:
+            return
+        with f:
+            if offset < base:
+                raise ValueError("That part of the history has been pruned")
+            f.seek(offset - shift)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                offset += len(raw)
+                yield loads(raw), offset
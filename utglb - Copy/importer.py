@@ -0,0 +1,239 @@
+import codecs
+import csv
+import json
+import re
+from itertools import islice
+from operator import methodcaller
+
+import scoring
+from serialization import loads
+
+BATCH_SIZE = 5000
+CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_REJECTIONS = 100
+
+_LAST = float('inf')
+_PLAYERS_KEY = re.compile(r'"players"\s*:\s*\[')
+
+
+def iter_text_lines(stream, chunk_size=CHUNK_SIZE):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            lines = (pending + text).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + '\n'
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+
+def iter_json_rows(stream, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a JSON array body one at a time.
+
+    Accepts either a bare array or an object with a "players" array, and only
+    ever buffers about one chunk of the body.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    while not eof and not buf.strip():
+        fill()
+    start = buf.lstrip()[:1]
+    if start == '{':
+        match = _PLAYERS_KEY.search(buf)
+        while match is None and not eof:
+            fill()
+            match = _PLAYERS_KEY.search(buf)
+        if match is None:
+            raise ValueError("No players provided")
+        pos = match.end()
+    elif start == '[':
+        pos = buf.index('[') + 1
+    else:
+        raise ValueError("Expected a JSON array of players")
+
+    bulk = True
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Unexpected end of JSON body")
+            fill()
+            bulk = True
+            continue
+        if buf[pos] == ']':
+            return
+        if bulk:
+            # Decode every complete row in the buffer with one C-level call.
+            # A cut that lands inside a string or nested value cannot parse,
+            # so success means it fell on a row boundary.
+            cut = buf.rfind('}', pos) + 1
+            if cut:
+                try:
+                    rows = loads('[' + buf[pos:cut] + ']')
+                except ValueError:
+                    bulk = False
+                else:
+                    pos = cut
+                    yield from rows
+                    continue
+        try:
+            row, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise ValueError(f"Invalid JSON near character {pos}")
+            fill()
+            bulk = True
+            continue
+        pos = end
+        yield row
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(iter_text_lines(stream))
+    try:
+        yield from reader
+    except csv.Error as e:
+        # The reader fails before counting the line it choked on.
+        raise ValueError(f"Invalid CSV on line {reader.line_num + 1}: {e}")
+
+
+def read_rows(stream, mimetype):
+    if mimetype in ('text/csv', 'application/csv'):
+        return iter_csv_rows(stream)
+    return iter_json_rows(stream)
+
+
+class BatchImporter:
+    """Validate and score imported rows a batch at a time.
+
+    Rank and star values are resolved through lookup tables built once per
+    import, so each batch is a handful of column-wise map() passes rather
+    than per-row work.
+    """
+
+    def __init__(self, lb, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rejections = []
+        self.rejected = 0
+        self._seen = set()
+        self._players = []
+        self._keys = []
+
+        self.player_type = lb.player_type
+        tables = scoring.current
+        if lb.leaderboard_type == 'classic':
+            self.field = 'rank'
+            self.label = 'rank'
+            table = tables.rank_points
+            spellings = {rank: rank for rank in table}
+        else:
+            self.field = 'stars'
+            self.label = 'star rating'
+            table = tables.star_points
+            # JSON may carry 2, 2.0 or "2.5"; CSV always carries strings.
+            spellings = {}
+            for stars in table:
+                for spelling in (stars, str(stars), repr(float(stars))):
+                    spellings[spelling] = stars
+                if stars == int(stars):
+                    spellings[str(int(stars))] = stars
+
+        self.canonical = spellings
+        self.points = {k: table[v] for k, v in spellings.items()}
+
+    def run(self, rows):
+        rows = iter(rows)
+        start = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.add_batch(batch, start)
+            start += len(batch)
+        return start
+
+    def add_batch(self, batch, start=0):
+        numbers = range(start + 1, start + 1 + len(batch))
+        if not all(isinstance(row, dict) for row in batch):
+            kept = [(i, row) for i, row in zip(numbers, batch) if isinstance(row, dict)]
+            for i, row in zip(numbers, batch):
+                if not isinstance(row, dict):
+                    self.reject(i, "Row is not an object")
+            numbers = [i for i, _ in kept]
+            batch = [row for _, row in kept]
+
+        names = map(_getter('name'), batch)
+        values = list(map(_getter(self.field), batch))
+        positions = map(_getter('position'), batch)
+        links = map(_getter('roblox_link'), batch)
+        try:
+            points = list(map(self.points.get, values))
+        except TypeError:
+            values = [v if v is None or isinstance(v, (str, int, float)) else repr(v) for v in values]
+            points = list(map(self.points.get, values))
+        canonical = map(self.canonical.get, values, values)
+
+        seen = self._seen
+        players = self._players
+        keys = self._keys
+        field, player_type = self.field, self.player_type
+        for i, name, value, pts, position, link in zip(numbers, names, canonical, points, positions, links):
+            if not name or not isinstance(name, str):
+                self.reject(i, "Missing name")
+                continue
+            if pts is None:
+                if value in (None, ''):
+                    self.reject(i, f"Missing {field}")
+                else:
+                    self.reject(i, f"Invalid {self.label}: {value}")
+                continue
+            name = name.strip()
+            if name in seen:
+                self.reject(i, f"Duplicate player: {name}")
+                continue
+            if position and position.__class__ is not int:
+                try:
+                    position = int(position)
+                except (TypeError, ValueError):
+                    self.reject(i, f"Invalid position: {position}")
+                    continue
+            seen.add(name)
+            players.append(player_type(name, value, link or ''))
+            keys.append((bool(position), position or _LAST, -pts))
+
+    def reject(self, row, error):
+        self.rejected += 1
+        if len(self.rejections) < MAX_REPORTED_REJECTIONS:
+            self.rejections.append({"row": row, "error": error})
+
+    def report(self):
+        return sorted(self.rejections, key=lambda r: r["row"])
+
+    def players(self):
+        order = sorted(range(len(self._players)), key=self._keys.__getitem__)
+        return [self._players[i] for i in order]
+
+
+def _getter(key):
+    return methodcaller('get', key)
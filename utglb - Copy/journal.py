@@ -0,0 +1,285 @@
+import os
+import threading
+from contextlib import contextmanager
+
+from locks import flock
+from player import to_json
+from serialization import dumps, loads
+
+
+class BoardJournal:
+    """Append-only mutation log plus periodic snapshot for one board.
+
+    Each mutation is appended as one compact JSON line. sync() makes appended
+    records durable; callers arriving while an fsync is in flight wait for the
+    next one, so concurrent requests share fsyncs. compact() rotates the log
+    and writes a snapshot in the background.
+
+    Several processes may share one journal. Writers hold locked() while they
+    catch up with tail() and append, and a compaction holds a second lock
+    until its snapshot lands, which load() waits on. Without fcntl the locks
+    are no-ops and only one process may serve a board.
+    """
+
+    # Records read back from the log still have to be applied to the store.
+    replay = True
+
+    def __init__(self, snapshot_file, compact_min=1000):
+        self.snapshot_file = snapshot_file
+        self.log_file = os.path.splitext(snapshot_file)[0] + '.log'
+        self.old_log_file = self.log_file + '.old'
+        self.compact_min = compact_min
+        self.seq = 0
+        self.ordered = True
+        self.pending = 0
+        self._synced = 0
+        self._syncing = False
+        self._fd = None
+        self._inode = None
+        self._offset = 0
+        self._cond = threading.Condition()
+        self._compactor = None
+        self._snapshot_error = None
+        base = os.path.splitext(snapshot_file)[0]
+        self._lock_fd = os.open(base + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        self._compact_lock_fd = os.open(base + '.compact.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock_depth = 0
+
+    @contextmanager
+    def locked(self):
+        # Callers are already serialized within the process, so the depth
+        # count only has to make nested use harmless.
+        if not self._lock_depth:
+            flock(self._lock_fd, 'LOCK_EX')
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if not self._lock_depth:
+                flock(self._lock_fd, 'LOCK_UN')
+
+    def load(self):
+        if self._compactor is not None:
+            self._compactor.join()
+        # Wait out another process's compaction so its snapshot and rotated
+        # log are read as a pair.
+        flock(self._compact_lock_fd, 'LOCK_SH')
+        try:
+            return self._load()
+        finally:
+            flock(self._compact_lock_fd, 'LOCK_UN')
+
+    def _load(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        players = []
+        seq = 0
+        self.ordered = True
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'rb') as f:
+                content = f.read()
+            if content.strip():
+                data = loads(content)
+                if isinstance(data, dict):
+                    players = data.get("players", [])
+                    seq = data.get("seq", 0)
+                else:
+                    # Legacy board files are a bare list whose rows carry
+                    # their own positions.
+                    players = data
+                    self.ordered = False
+
+        records = [r for r in self._read_log(self.old_log_file) if r["seq"] > seq]
+        records += [r for r in self._read_log(self.log_file) if r["seq"] > seq]
+        if os.path.exists(self.old_log_file):
+            # A compaction was interrupted before its snapshot landed; fold
+            # the rotated log back into the live one.
+            self._rewrite_log(records)
+
+        self.seq = records[-1]["seq"] if records else seq
+        self._synced = self.seq
+        self.pending = len(records)
+        self._open()
+        return players, records
+
+    def append(self, record):
+        with self._cond:
+            record["seq"] = self.seq + 1
+            data = dumps(record, default=to_json) + b'\n'
+            written = 0
+            try:
+                while written < len(data):
+                    written += os.write(self._fd, data[written:])
+            except BaseException:
+                # Leave no torn line behind for the next append.
+                os.ftruncate(self._fd, self._offset)
+                raise
+            self.seq += 1
+            self._offset += len(data)
+            self.pending += 1
+            return self.seq
+
+    def changed(self):
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            return True
+        return stat.st_ino != self._inode or stat.st_size != self._offset
+
+    def tail(self):
+        """Return records other processes appended since we last looked.
+
+        Returns None when the log has been rotated underneath us, in which
+        case the caller has to load() again.
+        """
+        try:
+            with open(self.log_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_ino != self._inode:
+                    return None
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        records = []
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            records.append(loads(line))
+        with self._cond:
+            self._offset += end
+            if records:
+                self.seq = records[-1]["seq"]
+                self._synced = max(self._synced, self.seq)
+                self.pending += len(records)
+        return records
+
+    def sync(self):
+        with self._cond:
+            target = self.seq
+            while self._synced < target:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                upto = self.seq
+                synced = False
+                self._cond.release()
+                try:
+                    os.fsync(self._fd)
+                    synced = True
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    if synced:
+                        self._synced = max(self._synced, upto)
+                    self._cond.notify_all()
+
+    def should_compact(self, board_size):
+        return self.pending >= max(self.compact_min, board_size)
+
+    def compact(self, players, wait=False):
+        if self._compactor is not None:
+            self._compactor.join()
+        # Held until the snapshot is written; released by _write_snapshot.
+        flock(self._compact_lock_fd, 'LOCK_EX')
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            os.fsync(self._fd)
+            self._synced = self.seq
+            os.close(self._fd)
+            os.replace(self.log_file, self.old_log_file)
+            self._open()
+            seq = self.seq
+            self.pending = 0
+        self._snapshot_error = None
+        self._compactor = threading.Thread(target=self._write_snapshot, args=(players, seq), daemon=True)
+        self._compactor.start()
+        if wait:
+            self._compactor.join()
+            if self._snapshot_error is not None:
+                raise self._snapshot_error
+
+    def checkpoint(self, players):
+        with self._cond:
+            self.seq += 1
+        try:
+            self.compact(players, wait=True)
+        except BaseException:
+            # The rotated log still holds every earlier record, and load()
+            # folds it back in, so the board on disk is the one before.
+            with self._cond:
+                self.seq -= 1
+            raise
+        return self.seq
+
+    def close(self):
+        if self._lock_fd is None:
+            return
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._fd is not None:
+            self.sync()
+            with self._cond:
+                os.close(self._fd)
+                self._fd = None
+        os.close(self._lock_fd)
+        os.close(self._compact_lock_fd)
+        self._lock_fd = self._compact_lock_fd = None
+
+    def _open(self):
+        self._fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        stat = os.fstat(self._fd)
+        self._inode = stat.st_ino
+        self._offset = stat.st_size
+
+    def _write_snapshot(self, players, seq):
+        try:
+            tmp_file = self.snapshot_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(dumps({"seq": seq, "players": players}, default=to_json))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+            self._remove_old_log()
+        except BaseException as e:
+            self._snapshot_error = e
+            raise
+        finally:
+            flock(self._compact_lock_fd, 'LOCK_UN')
+
+    def _rewrite_log(self, records):
+        tmp_file = self.log_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            for record in records:
+                f.write(dumps(record, default=to_json) + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.log_file)
+        self._remove_old_log()
+
+    def _remove_old_log(self):
+        try:
+            os.remove(self.old_log_file)
+        except FileNotFoundError:
+            pass
+
+    def _read_log(self, path):
+        records = []
+        if not os.path.exists(path):
+            return records
+        good = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    records.append(loads(line))
+                except ValueError:
+                    break
+                good += len(line)
+        if good != os.path.getsize(path):
+            # Drop a record torn by a crash so new appends start on a clean line.
+            os.truncate(path, good)
+        return records
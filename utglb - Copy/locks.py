@@ -0,0 +1,106 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import LOCK_WAIT_SECONDS
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RWLock:
+    """Many readers or one writer.
+
+    Waiting writers hold off new readers so a steady stream of page loads
+    cannot starve a mutation. Both sides are re-entrant for the thread that
+    holds them, and the writer may also read. Time spent waiting is
+    recorded under the lock's name.
+    """
+
+    def __init__(self, name='board'):
+        self.name = name
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, 'depth', 0)
+        if depth or self._writer == me:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+
+        started = time.perf_counter()
+        with self._cond:
+            while self._writer is not None or self._waiting:
+                self._cond.wait()
+            self._readers += 1
+        LOCK_WAIT_SECONDS.observe(time.perf_counter() - started, lock=self.name, mode='read')
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        started = None
+        with self._cond:
+            if self._writer != me:
+                started = time.perf_counter()
+                self._waiting += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting -= 1
+                self._writer = me
+            self._depth += 1
+        if started is not None:
+            LOCK_WAIT_SECONDS.observe(time.perf_counter() - started, lock=self.name, mode='write')
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if not self._depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+def reader(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def writer(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.writing():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def flock(fd, operation):
+    """Lock a file across processes; a no-op where fcntl is missing."""
+    if fcntl is not None:
+        fcntl.flock(fd, getattr(fcntl, operation))
@@ -0,0 +1,212 @@
+import bisect
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+PROFILE_DIR = os.environ.get('LEADERBOARD_PROFILE_DIR')
+PROFILE_RATE = float(os.environ.get('LEADERBOARD_PROFILE_RATE', '0.01'))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels[name] for name in self.labels)
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+            lines.extend(self._lines(key, value) for key, value in items)
+        return '\n'.join(lines)
+
+    def _lines(self, key, value):
+        return f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket counts (the last one is +Inf), sum, count.
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _lines(self, key, entry):
+        counts, total, count = entry
+        lines = []
+        cumulative = 0
+        for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket
+            le = f'le="{_format_number(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_number(float(total))}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return '\n'.join(lines)
+
+
+class Registry:
+    """Metrics for this process, rendered in the Prometheus text format.
+
+    Collectors run just before each render so gauges that are cheap to read
+    but awkward to keep current (board sizes, subscribers) are sampled at
+    scrape time instead of on every change.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        self.collectors.append(fn)
+        return fn
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram('leaderboard_http_request_seconds', "Time to handle a request, up to the first byte for streams.", ('route', 'method', 'status')))
+REQUEST_BYTES = REGISTRY.register(Histogram('leaderboard_http_request_bytes', "Request body sizes.", ('route', 'method'), SIZE_BUCKETS))
+RESPONSE_BYTES = REGISTRY.register(Histogram('leaderboard_http_response_bytes', "Response body sizes as sent, after compression.", ('route', 'method'), SIZE_BUCKETS))
+OPERATION_SECONDS = REGISTRY.register(Histogram('leaderboard_operation_seconds', "Time spent in leaderboard operations, including lock waits.", ('board', 'operation')))
+LOCK_WAIT_SECONDS = REGISTRY.register(Histogram('leaderboard_lock_wait_seconds', "Time spent waiting to acquire a board lock.", ('lock', 'mode')))
+IMPORT_ROWS = REGISTRY.register(Counter('leaderboard_import_rows_total', "Rows seen by imports.", ('board', 'result')))
+CACHE_REQUESTS = REGISTRY.register(Counter('leaderboard_response_cache_requests_total', "Response cache lookups.", ('result',)))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge('leaderboard_response_cache_hit_ratio', "Share of response cache lookups served from cache."))
+BOARD_PLAYERS = REGISTRY.register(Gauge('leaderboard_players', "Players on each board.", ('board',)))
+BOARD_VERSION = REGISTRY.register(Gauge('leaderboard_version', "Current version of each board.", ('board',)))
+STREAM_SUBSCRIBERS = REGISTRY.register(Gauge('leaderboard_event_subscribers', "Open event streams per board.", ('board',)))
+RESIDENT_BOARDS = REGISTRY.register(Gauge('leaderboard_resident_boards', "Boards currently held in memory."))
+BOARD_EVENTS = REGISTRY.register(Counter('leaderboard_board_events_total', "Boards loaded into and evicted from memory.", ('event',)))
+PROFILES_WRITTEN = REGISTRY.register(Counter('leaderboard_profiles_written_total', "Request profiles dumped by the sampling profiler."))
+
+
+def timed(operation):
+    """Record a Leaderboard method's duration under its board's label."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                OPERATION_SECONDS.observe(time.perf_counter() - started, board=self.name, operation=operation)
+        return wrapper
+    return decorate
+
+
+class RequestProfiler:
+    """Profile a random sample of requests and dump each to its own file.
+
+    Off unless LEADERBOARD_PROFILE_DIR is set. Only one request is profiled
+    at a time, since a profiler hooks the whole interpreter; requests that
+    arrive while one is running are simply not sampled. Files load with
+    pstats or snakeviz.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, rate=PROFILE_RATE):
+        self.directory = directory
+        self.rate = rate
+        self._busy = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return bool(self.directory) and self.rate > 0
+
+    def start(self):
+        if not self.enabled or random.random() >= self.rate or not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile, label):
+        profile.disable()
+        try:
+            safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label)
+            path = os.path.join(self.directory, f"{time.time():.6f}-{os.getpid()}-{safe}.prof")
+            profile.dump_stats(path)
+            PROFILES_WRITTEN.inc()
+        finally:
+            self._busy.release()
@@ -1,177 +1,530 @@
+import bisect
+import gzip
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+import urllib.error
+import urllib.request
+from itertools import compress
+from tkinter import ttk, messagebox, filedialog
+
+import scoring
+from serialization import loads
+
+# The web app the viewer loads from and syncs with.
+DEFAULT_URL = os.environ.get('LEADERBOARD_URL', 'http://127.0.0.1:5000')
+SYNC_INTERVAL_MS = 5000
+VISIBLE_ROWS = 25
+# Sync changes applied one at a time before switching to a single merge.
+MERGE_AFTER = 128
+COLUMNS = (
+    ("position", "Rank", 60),
+    ("name", "Name", 200),
+    ("rank", "Rank Tier", 120),
+    ("stars", "Stars", 70),
+    ("rank_percentage", "Rank %", 100),
+    ("star_percentage", "Stars %", 100),
+    ("final_score", "Final Score", 100),
+)
+
+
+def format_row(position, player):
+    return (
+        str(position),
+        player["name"],
+        player["rank"],
+        f"{player['stars']:.1f}",
+        f"{player['rank_percentage']:.2f}",
+        f"{player['star_percentage']:.2f}",
+        f"{player['final_score']:.2f}",
+    )
+
+
+def read_rows(paths):
+    """Rows from board files, joined by name across files.
+
+    Accepts the web app's data files (a snapshot object or a legacy bare
+    list) and saved /api/players responses, so picking the classic and FFA
+    files together yields players with both a rank and a star rating. Only
+    the snapshot is read; use the web app itself for writes not yet
+    compacted into it.
+    """
+    merged = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        if not content.strip():
+            continue
+        data = loads(content)
+        if isinstance(data, dict):
+            data = data.get("players", [])
+        for row in data:
+            merged.setdefault(row["name"], {}).update(row)
+    return list(merged.values())
+
+
+def fetch_rows(base_url, etag=None, timeout=30):
+    """The web app's overall board, or None if it is unchanged since etag."""
+    request = urllib.request.Request(base_url.rstrip('/') + '/api/players/overall',
+                                     headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip'})
+    if etag:
+        request.add_header('If-None-Match', etag)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            content = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                content = gzip.decompress(content)
+            return loads(content), response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
 
 class Leaderboard:
-    RANK_POINTS = {
-       "B+ Low": 1,
-        "B+ Mid": 2,
-        "B+ High": 3,
-        "A- Low": 4,
-        "A- Mid": 5,
-        "A- High": 6,
-        "A Low": 7,
-        "A Mid": 8,
-        "A High": 9,
-        "A+ Low": 10,
-        "A+ Mid": 11,
-        "A+ High": 12,
-        "S Low": 13,
-        "S Mid": 14,
-        "S High": 15,
-    }
-    
-    STAR_POINTS = {
-         0.5: 1.5,
-        1.0: 3.0,
-        1.5: 4.5,
-        2.0: 6.0,
-        2.5: 7.5,
-        3.0: 9.0,
-        3.5: 10.5,
-        4.0: 12.0,
-        4.5: 13.5,
-        5.0: 15.0,
-    }
-    
-    MAX_RANK_POINTS = 15
-    MAX_STAR_POINTS = 15
-    
+    """Players kept in score order as they are added.
+
+    players is always sorted best first, with ties in the order they were
+    added, so adding or removing one is a bisection and a single list
+    insert or delete rather than a re-sort, and any window of rows can be
+    read by position. Each call returns the first position it changed.
+    """
+
     def __init__(self):
         self.players = []
-    
+        # (-final_score, ordinal) for each row of players.
+        self.keys = []
+        # name -> (key, player)
+        self.by_name = {}
+        self.added = 0
+        self.use_scoring()
+
+    def use_scoring(self):
+        # The same tables the web app scores with, scoring.json included.
+        self.scoring = scoring.current
+        self.RANK_POINTS = self.scoring.rank_points
+        self.STAR_POINTS = self.scoring.star_points
+        # Derived fields per (rank, stars), of which there are only a few.
+        self.derived = {}
+
+    def make_player(self, name, rank, stars):
+        derived = self.derived.get((rank, stars))
+        if derived is None:
+            if rank not in self.RANK_POINTS:
+                raise ValueError(f"Invalid rank: {rank}")
+            if stars not in self.STAR_POINTS:
+                raise ValueError(f"Invalid star rating: {stars}")
+
+            rank_points, rank_percentage = self.scoring.rank_scores[rank]
+            _, star_points, star_percentage = self.scoring.star_scores[round(stars * 2)]
+
+            final_score = self.scoring.final_score(rank_percentage, star_percentage)
+
+            derived = self.derived[(rank, stars)] = {
+                "rank_points": rank_points,
+                "star_points": star_points,
+                "rank_percentage": rank_percentage,
+                "star_percentage": star_percentage,
+                "final_score": final_score,
+            }
+        return {"name": name, "rank": rank, "stars": stars, **derived}
+
     def add_player(self, name, rank, stars):
-        if rank not in self.RANK_POINTS:
-            raise ValueError(f"Invalid rank: {rank}")
-        if stars not in self.STAR_POINTS:
-            raise ValueError(f"Invalid star rating: {stars}")
-        
-        rank_points = self.RANK_POINTS[rank]
-        star_points = self.STAR_POINTS[stars]
-        
-        rank_percentage = (rank_points / self.MAX_RANK_POINTS) * 100
-        star_percentage = (star_points / self.MAX_STAR_POINTS) * 100
-        
-        final_score = (rank_percentage + star_percentage) / 2
-        
-        self.players.append({
-            "name": name,
-            "rank": rank,
-            "stars": stars,
-            "rank_points": rank_points,
-            "star_points": star_points,
-            "rank_percentage": rank_percentage,
-            "star_percentage": star_percentage,
-            "final_score": final_score,
-        })
-    
+        """Add a player, replacing one of the same name."""
+        player = self.make_player(name, rank, stars)
+        removed = self.remove_player(name)
+        self.added += 1
+        key = (-player["final_score"], self.added)
+        index = bisect.bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.players.insert(index, player)
+        self.by_name[name] = (key, player)
+        return index if removed is None else min(index, removed)
+
     def remove_player(self, name):
-        self.players = [p for p in self.players if p["name"] != name]
-    
-    def sort_leaderboard(self):
-        self.players.sort(key=lambda p: p["final_score"], reverse=True)
-    
+        entry = self.by_name.pop(name, None)
+        if entry is None:
+            return None
+        index = bisect.bisect_left(self.keys, entry[0])
+        del self.keys[index]
+        del self.players[index]
+        return index
+
+    def clear(self):
+        self.players.clear()
+        self.keys.clear()
+        self.by_name.clear()
+        return 0
+
+    def get(self, name):
+        entry = self.by_name.get(name)
+        return None if entry is None else entry[1]
+
+    def load(self, rows):
+        """Replace every player with rows; returns the number skipped.
+
+        Rows need a name, a rank and a star rating valid under the current
+        tables; ties keep the order of rows.
+        """
+        scoring.refresh()
+        self.use_scoring()
+        players = {}
+        skipped = 0
+        for row in rows:
+            try:
+                player = self.make_player(row["name"], row["rank"], float(row["stars"]))
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+                continue
+            players[player["name"]] = player
+
+        self.clear()
+        for player in players.values():
+            self.added += 1
+            self.keys.append((-player["final_score"], self.added))
+            self.players.append(player)
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.keys = [self.keys[i] for i in order]
+        self.players = [self.players[i] for i in order]
+        self.by_name = {p["name"]: (key, p) for p, key in zip(self.players, self.keys)}
+        return skipped
+
+    def sync(self, rows):
+        """Bring the board in line with rows, touching only players that differ.
+
+        Returns (first changed position or None, rows skipped). A board that
+        is empty or was scored under older tables is reloaded instead.
+        """
+        scoring.refresh()
+        if scoring.current is not self.scoring or not self.players:
+            return 0, self.load(rows)
+
+        wanted = {}
+        skipped = 0
+        for row in rows:
+            try:
+                wanted[row["name"]] = (row["rank"], float(row["stars"]))
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+        by_name = self.by_name
+        removed = [name for name in by_name if name not in wanted]
+        changed = []
+        for name, (rank, stars) in wanted.items():
+            entry = by_name.get(name)
+            if entry is None or entry[1]["rank"] != rank or entry[1]["stars"] != stars:
+                changed.append((name, rank, stars))
+        if len(removed) + len(changed) <= MERGE_AFTER:
+            first = None
+            for name in removed:
+                index = self.remove_player(name)
+                first = index if first is None else min(first, index)
+            for name, rank, stars in changed:
+                try:
+                    index = self.add_player(name, rank, stars)
+                except ValueError:
+                    skipped += 1
+                    continue
+                first = index if first is None else min(first, index)
+            return first, skipped
+
+        # Past a handful of changes, one pass over the lists beats shifting
+        # them once per player: drop every player that changed, then merge
+        # the sorted replacements back in by slices.
+        added = []
+        for name, rank, stars in changed:
+            try:
+                player = self.make_player(name, rank, stars)
+            except ValueError:
+                skipped += 1
+                continue
+            self.added += 1
+            added.append(((-player["final_score"], self.added), player))
+        added.sort(key=lambda entry: entry[0])
+        dropped = [self.by_name.pop(name)[0] for name in removed]
+        dropped += [self.by_name.pop(player["name"])[0] for _, player in added if player["name"] in self.by_name]
+        first = bisect.bisect_left(self.keys, min(dropped)) if dropped else None
+
+        keep = [p["name"] in by_name for p in self.players]
+        kept_keys = list(compress(self.keys, keep))
+        kept_players = list(compress(self.players, keep))
+        keys, players, start = [], [], 0
+        for key, player in added:
+            index = bisect.bisect_left(kept_keys, key, start)
+            keys += kept_keys[start:index]
+            players += kept_players[start:index]
+            keys.append(key)
+            players.append(player)
+            by_name[player["name"]] = (key, player)
+            start = index
+        keys += kept_keys[start:]
+        players += kept_players[start:]
+        self.keys = keys
+        self.players = players
+        if added:
+            index = bisect.bisect_left(keys, added[0][0])
+            first = index if first is None else min(first, index)
+        return first, skipped
+
     def get_formatted_display(self):
-        self.sort_leaderboard()
         if not self.players:
             return "No players on leaderboard yet."
-        
-        output = "\n" + "=" * 100 + "\n"
-        output += f"{'Rank':<6} {'Name':<20} {'Rank Tier':<15} {'Stars':<8} {'Rank %':<12} {'Stars %':<12} {'Final Score':<12}\n"
-        output += "=" * 100 + "\n"
-        
+
+        rule = "=" * 100
+        lines = ["", rule, f"{'Rank':<6} {'Name':<20} {'Rank Tier':<15} {'Stars':<8} {'Rank %':<12} {'Stars %':<12} {'Final Score':<12}", rule]
         for position, player in enumerate(self.players, 1):
-            output += f"{position:<6} {player['name']:<20} {player['rank']:<15} {player['stars']:<8.1f} {player['rank_percentage']:<12.2f} {player['star_percentage']:<12.2f} {player['final_score']:<12.2f}\n"
-        
-        output += "=" * 100 + "\n"
-        return output
+            lines.append(f"{position:<6} {player['name']:<20} {player['rank']:<15} {player['stars']:<8.1f} {player['rank_percentage']:<12.2f} {player['star_percentage']:<12.2f} {player['final_score']:<12.2f}")
+        lines.append(rule)
+        return "\n".join(lines) + "\n"
 
 
 class LeaderboardGUI:
+    """Desktop viewer over a Leaderboard.
+
+    The table is virtual: the Treeview holds only VISIBLE_ROWS items, and
+    scrolling re-points them at a different window of players. Each item
+    is rewritten only when the row it shows has changed, so a change far
+    below the window costs nothing to draw, however large the board.
+    """
+
     def __init__(self, root):
         self.root = root
         self.root.title("Leaderboard System")
         self.root.geometry("900x700")
         self.leaderboard = Leaderboard()
-        
+        self.first = 0
+        self.etag = None
+        self.fetches = queue.Queue()
+        self.fetching = False
+        self.sync_job = None
+
         self.create_widgets()
-    
+
     def create_widgets(self):
         frame = ttk.Frame(self.root, padding="10")
         frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
+
         ttk.Label(frame, text="Leaderboard System", font=("Arial", 16, "bold")).grid(row=0, column=0, columnspan=3, pady=10)
-        
+
         ttk.Label(frame, text="Player Name:").grid(row=1, column=0, sticky=tk.W, pady=5)
         self.name_entry = ttk.Entry(frame, width=20)
         self.name_entry.grid(row=1, column=1, sticky=tk.W, padx=5)
-        
+
         ttk.Label(frame, text="Rank Tier:").grid(row=2, column=0, sticky=tk.W, pady=5)
         self.rank_var = tk.StringVar()
-        self.rank_combo = ttk.Combobox(frame, textvariable=self.rank_var, values=list(self.leaderboard.RANK_POINTS.keys()), width=17)
+        self.rank_combo = ttk.Combobox(frame, textvariable=self.rank_var, width=17)
         self.rank_combo.grid(row=2, column=1, sticky=tk.W, padx=5)
-        
+
         ttk.Label(frame, text="Star Rating:").grid(row=3, column=0, sticky=tk.W, pady=5)
         self.star_var = tk.StringVar()
-        self.star_combo = ttk.Combobox(frame, textvariable=self.star_var, values=[str(s) for s in self.leaderboard.STAR_POINTS.keys()], width=17)
+        self.star_combo = ttk.Combobox(frame, textvariable=self.star_var, width=17)
         self.star_combo.grid(row=3, column=1, sticky=tk.W, padx=5)
-        
+        self.fill_choices()
+
         ttk.Button(frame, text="Add Player", command=self.add_player).grid(row=4, column=1, sticky=tk.W, padx=5, pady=10)
-        
+
         ttk.Label(frame, text="Leaderboard:").grid(row=5, column=0, columnspan=2, sticky=tk.W, pady=(20, 5))
-        
-        self.display_text = scrolledtext.ScrolledText(frame, width=100, height=25, font=("Courier", 9))
-        self.display_text.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
-        self.display_text.config(state=tk.DISABLED)
-        
+
+        table = ttk.Frame(frame)
+        table.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        self.tree = ttk.Treeview(table, columns=[key for key, _, _ in COLUMNS], show="headings", height=VISIBLE_ROWS, selectmode="browse")
+        for key, heading, width in COLUMNS:
+            self.tree.heading(key, text=heading)
+            self.tree.column(key, width=width, anchor=tk.W)
+        self.slots = [self.tree.insert("", tk.END, values=()) for _ in range(VISIBLE_ROWS)]
+        self.shown = [()] * VISIBLE_ROWS
+        self.scrollbar = ttk.Scrollbar(table, orient=tk.VERTICAL, command=self.scroll)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", self.on_wheel)
+        self.tree.bind("<Button-5>", self.on_wheel)
+        self.tree.bind("<Prior>", lambda e: self.scroll("scroll", -1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll("scroll", 1, "pages"))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.status_var).grid(row=7, column=0, columnspan=3, sticky=tk.W)
+
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=7, column=0, columnspan=3, pady=10)
-        
+        button_frame.grid(row=8, column=0, columnspan=3, pady=10)
+
         ttk.Button(button_frame, text="Refresh", command=self.refresh_display).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Remove Player", command=self.remove_player).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Clear All", command=self.clear_all).pack(side=tk.LEFT, padx=5)
-        
+        ttk.Button(button_frame, text="Load File...", command=self.load_file).pack(side=tk.LEFT, padx=5)
+
+        web_frame = ttk.Frame(frame)
+        web_frame.grid(row=9, column=0, columnspan=3, pady=5)
+
+        ttk.Label(web_frame, text="Web App:").pack(side=tk.LEFT, padx=5)
+        self.url_var = tk.StringVar(value=DEFAULT_URL)
+        ttk.Entry(web_frame, textvariable=self.url_var, width=30).pack(side=tk.LEFT, padx=5)
+        ttk.Button(web_frame, text="Load", command=self.load_url).pack(side=tk.LEFT, padx=5)
+        self.sync_var = tk.BooleanVar()
+        ttk.Checkbutton(web_frame, text="Keep in sync", variable=self.sync_var, command=self.toggle_sync).pack(side=tk.LEFT, padx=5)
+
         self.refresh_display()
-    
+
+    def fill_choices(self):
+        self.rank_combo.config(values=list(self.leaderboard.RANK_POINTS.keys()))
+        self.star_combo.config(values=[str(s) for s in self.leaderboard.STAR_POINTS.keys()])
+
     def add_player(self):
         name = self.name_entry.get().strip()
         rank = self.rank_var.get()
         star = self.star_var.get()
-        
+
         if not name or not rank or not star:
             messagebox.showerror("Error", "Please fill in all fields.")
             return
-        
+
         try:
-            self.leaderboard.add_player(name, rank, float(star))
+            index = self.leaderboard.add_player(name, rank, float(star))
             messagebox.showinfo("Success", f"Added {name} to leaderboard!")
             self.name_entry.delete(0, tk.END)
             self.rank_var.set("")
             self.star_var.set("")
-            self.refresh_display()
+            self.refresh_display(index)
         except ValueError as e:
             messagebox.showerror("Error", str(e))
-    
+
     def remove_player(self):
         name = self.name_entry.get().strip()
         if not name:
             messagebox.showerror("Error", "Enter a player name to remove.")
             return
-        
-        self.leaderboard.remove_player(name)
+
+        index = self.leaderboard.remove_player(name)
+        if index is None:
+            messagebox.showerror("Error", f"{name} is not on the leaderboard.")
+            return
         messagebox.showinfo("Success", f"Removed {name} from leaderboard!")
         self.name_entry.delete(0, tk.END)
-        self.refresh_display()
-    
+        self.refresh_display(index)
+
     def clear_all(self):
         if messagebox.askyesno("Confirm", "Remove all players?"):
-            self.leaderboard.players.clear()
+            self.refresh_display(self.leaderboard.clear())
+
+    def refresh_display(self, changed_from=0):
+        """Redraw the visible rows at or below position changed_from."""
+        players = self.leaderboard.players
+        total = len(players)
+        first = max(0, min(self.first, total - VISIBLE_ROWS))
+        if first != self.first:
+            # The board shrank under the window; everything in it moved.
+            self.first, changed_from = first, 0
+        if changed_from is not None and changed_from < self.first + VISIBLE_ROWS:
+            for slot, item in enumerate(self.slots):
+                position = self.first + slot
+                values = format_row(position + 1, players[position]) if position < total else ()
+                if values != self.shown[slot]:
+                    self.tree.item(item, values=values)
+                    self.shown[slot] = values
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + VISIBLE_ROWS) / total))
+            self.status_var.set(f"Showing {self.first + 1}-{min(self.first + VISIBLE_ROWS, total)} of {total} players")
+        else:
+            self.scrollbar.set(0.0, 1.0)
+            self.status_var.set("No players on leaderboard yet.")
+
+    def scroll(self, action, amount, unit=None):
+        total = len(self.leaderboard.players)
+        if action == "moveto":
+            first = int(float(amount) * total)
+        else:
+            first = self.first + int(amount) * (VISIBLE_ROWS if unit == "pages" else 1)
+        first = max(0, min(first, total - VISIBLE_ROWS))
+        if first != self.first:
+            self.first = first
+            self.tree.selection_remove(self.tree.selection())
             self.refresh_display()
-    
-    def refresh_display(self):
-        self.display_text.config(state=tk.NORMAL)
-        self.display_text.delete(1.0, tk.END)
-        self.display_text.insert(tk.END, self.leaderboard.get_formatted_display())
-        self.display_text.config(state=tk.DISABLED)
+        return "break"
+
+    def on_wheel(self, event):
+        up = event.num == 4 or event.delta > 0
+        return self.scroll("scroll", -3 if up else 3, "units")
+
+    def on_select(self, event):
+        selected = self.tree.selection()
+        if not selected:
+            return
+        position = self.first + self.slots.index(selected[0])
+        if position < len(self.leaderboard.players):
+            self.name_entry.delete(0, tk.END)
+            self.name_entry.insert(0, self.leaderboard.players[position]["name"])
+
+    def load_file(self):
+        paths = filedialog.askopenfilenames(title="Load Leaderboard", filetypes=[("JSON files", "*.json"), ("All files", "*")])
+        if not paths:
+            return
+        try:
+            rows = read_rows(paths)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            messagebox.showerror("Error", f"Could not read {', '.join(paths)}: {e}")
+            return
+
+        # A file load is not the web app's board, so the next sync fetches
+        # it whole.
+        self.etag = None
+        skipped = self.leaderboard.load(rows)
+        self.fill_choices()
+        self.first = 0
+        self.refresh_display()
+        if skipped:
+            messagebox.showinfo("Loaded", f"Skipped {skipped} players without both a valid rank and star rating.")
+
+    def load_url(self):
+        self.etag = None
+        self.fetch()
+
+    def toggle_sync(self):
+        if self.sync_job is not None:
+            self.root.after_cancel(self.sync_job)
+            self.sync_job = None
+        if self.sync_var.get():
+            self.fetch()
+
+    def fetch(self):
+        # Large boards take a while to download, so fetch off the Tk thread
+        # and hand the rows back through a queue.
+        if self.fetching:
+            return
+        self.fetching = True
+        url, etag = self.url_var.get().strip(), self.etag
+
+        def work():
+            try:
+                self.fetches.put((url,) + fetch_rows(url, etag))
+            except (OSError, ValueError) as e:
+                self.fetches.put((url, e, None))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.root.after(100, self.fetched)
+
+    def fetched(self):
+        try:
+            url, rows, etag = self.fetches.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.fetched)
+            return
+        self.fetching = False
+
+        if isinstance(rows, Exception):
+            self.sync_var.set(False)
+            messagebox.showerror("Error", f"Could not load {url}: {rows}")
+            return
+        if rows is not None and url == self.url_var.get().strip():
+            self.etag = etag
+            changed_from, skipped = self.leaderboard.sync(rows)
+            self.fill_choices()
+            self.refresh_display(changed_from)
+            if skipped:
+                self.status_var.set(self.status_var.get() + f" ({skipped} skipped)")
+        if self.sync_var.get():
+            self.sync_job = self.root.after(SYNC_INTERVAL_MS, self.toggle_sync)
 
 
 if __name__ == "__main__":
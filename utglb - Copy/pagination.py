@@ -0,0 +1,86 @@
+import base64
+import binascii
+import json
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+DEFAULT_RADIUS = 10
+PAGE_ARGS = ('offset', 'limit', 'cursor', 'around')
+
+
+def is_page_request(args):
+    return any(key in args for key in PAGE_ARGS)
+
+
+def encode_cursor(name, offset):
+    raw = json.dumps([name, offset], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        name, offset = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(name, str) or not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return name, offset
+
+
+def int_arg(args, key, default, low, high=None):
+    value = args.get(key)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be an integer")
+    if value < low or (high is not None and value > high):
+        raise ValueError(f"{key} must be between {low} and {high}" if high is not None else f"{key} must be at least {low}")
+    return value
+
+
+def get_page(lb, args):
+    total = len(lb.players)
+
+    if 'around' in args:
+        name = args['around']
+        radius = int_arg(args, 'radius', DEFAULT_RADIUS, 0, MAX_LIMIT // 2)
+        if name not in lb.players:
+            raise KeyError(name)
+        index = lb.players.index_of(name)
+        offset = max(index - radius, 0)
+        return {
+            "players": lb.get_page(offset, index + radius + 1 - offset),
+            "rank": index + 1,
+            "offset": offset,
+            "total": total,
+            "version": lb.version,
+        }
+
+    limit = int_arg(args, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+    after = None
+    if 'cursor' in args:
+        # Read on from the last player seen without ranking it; positions
+        # continue from the offset the cursor carries, which clients keep
+        # current from the change feed. Fall back to the raw offset if that
+        # player has since left the board.
+        name, offset = decode_cursor(args['cursor'])
+        if name in lb.players:
+            after = name
+    else:
+        offset = int_arg(args, 'offset', 0, 0)
+
+    # One row over the limit tells whether there is a next page.
+    players = lb.get_page(offset, limit + 1, after)
+    more = len(players) > limit
+    del players[limit:]
+    return {
+        "players": players,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_cursor": encode_cursor(players[-1]["name"], offset + limit) if more else None,
+        "version": lb.version,
+    }
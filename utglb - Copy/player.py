@@ -0,0 +1,127 @@
+import sys
+from collections.abc import Mapping
+
+import scoring
+
+
+class _Player(Mapping):
+    """Read-only mapping view over a compact player record.
+
+    Only the inputs are stored; points and percentages are looked up from
+    the current scoring tables when read, so a board holds no per-player
+    float objects, rank strings are interned, and new tables apply to every
+    player at once. Code that treats players as dicts keeps working.
+    to_dict() gives the API form and to_record() the stored form, which
+    carries only the inputs.
+    """
+
+    __slots__ = ()
+    KEYS = ()
+
+    def __getitem__(self, key):
+        if key in self.KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ClassicPlayer(_Player):
+    __slots__ = ('name', 'rank', 'roblox_link')
+    KEYS = ('name', 'rank', 'rank_points', 'rank_percentage', 'roblox_link')
+
+    def __init__(self, name, rank, roblox_link=''):
+        self.name = name
+        self.rank = sys.intern(rank)
+        self.roblox_link = roblox_link
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["rank"], data.get("roblox_link") or '')
+
+    @property
+    def rank_points(self):
+        return scoring.current.rank_scores[self.rank][0]
+
+    @property
+    def rank_percentage(self):
+        return scoring.current.rank_scores[self.rank][1]
+
+    def to_dict(self, position=None):
+        points, percentage = scoring.current.rank_scores[self.rank]
+        data = {
+            "name": self.name,
+            "rank": self.rank,
+            "rank_points": points,
+            "rank_percentage": percentage,
+            "roblox_link": self.roblox_link,
+        }
+        if position is not None:
+            data["position"] = position
+        return data
+
+    def to_record(self):
+        return {"name": self.name, "rank": self.rank, "roblox_link": self.roblox_link}
+
+
+class FFAPlayer(_Player):
+    __slots__ = ('name', 'half_stars', 'roblox_link')
+    KEYS = ('name', 'stars', 'star_points', 'star_percentage', 'roblox_link')
+
+    def __init__(self, name, stars, roblox_link=''):
+        self.name = name
+        # Ratings move in half stars; a small int is shared, a float is not.
+        self.half_stars = round(stars * 2)
+        self.roblox_link = roblox_link
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], float(data["stars"]), data.get("roblox_link") or '')
+
+    @property
+    def stars(self):
+        return self.half_stars / 2
+
+    @property
+    def star_points(self):
+        return scoring.current.star_scores[self.half_stars][1]
+
+    @property
+    def star_percentage(self):
+        return scoring.current.star_scores[self.half_stars][2]
+
+    def to_dict(self, position=None):
+        stars, points, percentage = scoring.current.star_scores[self.half_stars]
+        data = {
+            "name": self.name,
+            "stars": stars,
+            "star_points": points,
+            "star_percentage": percentage,
+            "roblox_link": self.roblox_link,
+        }
+        if position is not None:
+            data["position"] = position
+        return data
+
+    def to_record(self):
+        return {"name": self.name, "stars": self.half_stars / 2, "roblox_link": self.roblox_link}
+
+
+PLAYER_TYPES = {
+    'classic': ClassicPlayer,
+    'ffa': FFAPlayer,
+}
+
+
+def to_json(obj):
+    """json.dumps default= hook that stores player records compactly."""
+    if isinstance(obj, _Player):
+        return obj.to_record()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+from metrics import CACHE_REQUESTS
+from serialization import ENCODERS, JSON_MIMETYPE, dumps, encode, loads
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_ENTRIES = int(os.environ.get('LEADERBOARD_RESPONSE_CACHE', 256))
+
+
+class CachedBody:
+    def __init__(self, version, body, mimetype):
+        self.version = version
+        self.mimetype = mimetype
+        self.digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self._bodies = {'identity': body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        body = self._bodies.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._bodies.get(encoding)
+                if body is None:
+                    identity = self._bodies['identity']
+                    if encoding == 'br':
+                        body = brotli.compress(identity, quality=5)
+                    else:
+                        body = gzip.compress(identity, compresslevel=6)
+                    self._bodies[encoding] = body
+        return body
+
+    def etag(self, encoding):
+        return self.digest if encoding == 'identity' else f"{self.digest}-{encoding}"
+
+
+class ResponseCache:
+    """Encoded response bodies keyed by name, valid for one board version.
+
+    Keys name the board second, after the kind of response. Versions only
+    move forward, so building an entry drops the board's entries for older
+    versions, and past max_entries the least recently used go too; query
+    parameters in keys cannot grow the cache without bound.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, version, build, mimetype='application/json'):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(result='hit')
+                return entry
+            self.misses += 1
+        CACHE_REQUESTS.inc(result='miss')
+        entry = CachedBody(version, build(), mimetype)
+        with self._lock:
+            for other in [k for k, e in self._entries.items() if k[1] == key[1] and e.version < version]:
+                del self._entries[other]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def evict(self, board):
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == board]:
+                del self._entries[key]
+
+    def get_encoded(self, key, version, build, mimetype=JSON_MIMETYPE):
+        return self.get(key + (mimetype,), version, lambda: encode(build(), mimetype), mimetype)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider on the fast encoder, with msgpack on request.
+
+    jsonify() and request.json go through serialization, so every route gets
+    orjson when it is installed. A client whose Accept header prefers
+    msgpack gets the same response body packed instead.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        mimetype = negotiate_format()
+        response = self._app.response_class(encode(obj, mimetype, self.default), mimetype=mimetype)
+        response.vary.add('Accept')
+        return response
+
+
+def negotiate_format():
+    return request.accept_mimetypes.best_match(ENCODERS, default=JSON_MIMETYPE)
+
+
+def negotiate_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def send_cached(entry, min_compress_size=1024, cache_control='no-cache'):
+    encoding = negotiate_encoding()
+    if len(entry.encoded('identity')) < min_compress_size:
+        encoding = 'identity'
+    etag = entry.etag(encoding)
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(entry.encoded(encoding), mimetype=entry.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept')
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,256 @@
+import math
+import os
+
+from locks import flock
+from serialization import dumps, loads
+
+# Only bulk re-ranking uses numpy, so it is imported then rather than
+# adding to every worker's start-up; see load_numpy().
+numpy = None
+_numpy_loaded = False
+
+SCORING_FILE = os.environ.get('LEADERBOARD_SCORING', 'scoring.json')
+# Fields that map names to values, updated entry by entry.
+MERGED_FIELDS = ('ranks', 'stars', 'weights')
+# Ratings index a dense table, so bound how large one may be.
+MAX_STARS = 100
+
+DEFAULT_CONFIG = {
+    "version": 1,
+    # Bumped only when tier or rating points change, which is when boards
+    # have to be re-ranked; weights alone leave every board's order alone.
+    "points_version": 1,
+    "ranks": {
+        "B+ Low": 1,
+        "B+ Mid": 2,
+        "B+ High": 3,
+        "A- Low": 4,
+        "A- Mid": 5,
+        "A- High": 6,
+        "A Low": 7,
+        "A Mid": 8,
+        "A High": 9,
+        "A+ Low": 10,
+        "A+ Mid": 11,
+        "A+ High": 12,
+        "S Low": 13,
+        "S Mid": 14,
+        "S High": 15,
+    },
+    # JSON object keys are strings, so star ratings are spelled as such.
+    "stars": {
+        "0.5": 1.5,
+        "1.0": 3.0,
+        "1.5": 4.5,
+        "2.0": 6.0,
+        "2.5": 7.5,
+        "3.0": 9.0,
+        "3.5": 10.5,
+        "4.0": 12.0,
+        "4.5": 13.5,
+        "5.0": 15.0,
+    },
+    "max_rank_points": 15,
+    "max_star_points": 15,
+    # Overall score is the weighted mean of the rank and star percentages.
+    "weights": {"rank": 0.5, "stars": 0.5},
+}
+
+
+def load_numpy():
+    global numpy, _numpy_loaded
+    if not _numpy_loaded:
+        _numpy_loaded = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+
+def _number(value, what):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"{what} must be a non-negative number")
+    return value
+
+
+def split_rank(rank):
+    """Split "A+ High" into its tier and sub-tier; "Legend" has no sub-tier."""
+    tier, _, sub = rank.rpartition(' ')
+    return (tier, sub) if tier else (sub, '')
+
+
+class Scoring:
+    """One version of the tier tables and weights, compiled for lookups.
+
+    Players store only their rank tier or half-star rating, so everything
+    derived from them is read from here: rank tiers through a dict, star
+    ratings by indexing a list with the half-star count, and for bulk work
+    both as dense per-id point arrays. Instances are immutable; a new
+    configuration is a new instance swapped in whole.
+    """
+
+    def __init__(self, config):
+        if not isinstance(config, dict):
+            raise ValueError("Scoring config must be an object")
+        self.version = config.get("version", 1)
+        self.points_version = config.get("points_version", self.version)
+        ranks = config.get("ranks")
+        stars = config.get("stars")
+        if not isinstance(ranks, dict) or not ranks:
+            raise ValueError("ranks must map each tier to its points")
+        if not isinstance(stars, dict) or not stars:
+            raise ValueError("stars must map each rating to its points")
+
+        self.rank_points = {str(rank): _number(points, f"Points for {rank}") for rank, points in ranks.items()}
+        self.star_points = {}
+        for rating, points in stars.items():
+            try:
+                value = float(rating)
+            except ValueError:
+                raise ValueError(f"Invalid star rating: {rating}")
+            if not 0 < value <= MAX_STARS or value * 2 != int(value * 2):
+                raise ValueError(f"Star ratings must be positive multiples of 0.5, not {rating}")
+            self.star_points[value] = _number(points, f"Points for {rating} stars")
+        self.star_points = dict(sorted(self.star_points.items()))
+
+        self.max_rank_points = _number(config.get("max_rank_points", max(self.rank_points.values())), "max_rank_points")
+        self.max_star_points = _number(config.get("max_star_points", max(self.star_points.values())), "max_star_points")
+        if not self.max_rank_points or not self.max_star_points:
+            raise ValueError("Maximum points must be above zero")
+        weights = config.get("weights", {})
+        if not isinstance(weights, dict):
+            raise ValueError("weights must be an object")
+        self.rank_weight = _number(weights.get("rank", 0.5), "The rank weight")
+        self.star_weight = _number(weights.get("stars", 0.5), "The star weight")
+        if not self.rank_weight + self.star_weight:
+            raise ValueError("At least one weight must be above zero")
+
+        # (points, percentage) per tier, and per half-star count
+        # (stars, points, percentage), so reading a derived field is one
+        # lookup.
+        self.rank_scores = {rank: (points, (points / self.max_rank_points) * 100) for rank, points in self.rank_points.items()}
+        self.star_scores = [None] * (round(max(self.star_points) * 2) + 1)
+        for value, points in self.star_points.items():
+            self.star_scores[round(value * 2)] = (value, points, (points / self.max_star_points) * 100)
+        # Tiers best first, each with its (rank, sub-tier) pairs best first,
+        # for exports and pasted text, which group ranks under tier headings.
+        self.rank_tiers = {}
+        for rank in sorted(self.rank_points, key=self.rank_points.get, reverse=True):
+            tier, sub = split_rank(rank)
+            self.rank_tiers.setdefault(tier, []).append((rank, sub))
+        self.rank_ids = {rank: i for i, rank in enumerate(self.rank_points)}
+        self.rank_point_table = list(self.rank_points.values())
+        self.star_point_table = [score[1] if score is not None else 0 for score in self.star_scores]
+
+    def final_score(self, rank_percentage, star_percentage):
+        return (self.rank_weight * rank_percentage + self.star_weight * star_percentage) / (self.rank_weight + self.star_weight)
+
+    def tier_points(self, leaderboard_type):
+        """Points per rank tier or star rating, keyed as in the config."""
+        if leaderboard_type == 'classic':
+            return dict(self.rank_points)
+        return {str(value): points for value, points in self.star_points.items()}
+
+    def to_config(self):
+        return {
+            "version": self.version,
+            "points_version": self.points_version,
+            "ranks": self.tier_points('classic'),
+            "stars": self.tier_points('ffa'),
+            "max_rank_points": self.max_rank_points,
+            "max_star_points": self.max_star_points,
+            "weights": {"rank": self.rank_weight, "stars": self.star_weight},
+        }
+
+    def check_replaces(self, previous):
+        # Stored players keep their tier or rating, so each one in use under
+        # the old tables must still mean something under the new ones.
+        for rank in previous.rank_points:
+            if rank not in self.rank_points:
+                raise ValueError(f"Rank tier {rank} cannot be removed")
+        for value in previous.star_points:
+            if value not in self.star_points:
+                raise ValueError(f"Star rating {value} cannot be removed")
+
+    def order(self, players, leaderboard_type):
+        """Indices of players sorted by points, highest first.
+
+        Each player becomes a small int id in one pass, then points are
+        gathered from the dense table and argsorted together (with numpy,
+        if installed). Ties keep their current order, so a rescore moves
+        only players whose points changed relative to their neighbours.
+        """
+        if leaderboard_type == 'classic':
+            rank_ids = self.rank_ids
+            ids = [rank_ids[p.rank] for p in players]
+            table = self.rank_point_table
+        else:
+            ids = [p.half_stars for p in players]
+            table = self.star_point_table
+        numpy = load_numpy()
+        if numpy is not None:
+            points = numpy.asarray(table, dtype=float)[numpy.asarray(ids, dtype=numpy.intp)]
+            return numpy.argsort(-points, kind='stable').tolist()
+        points = list(map(table.__getitem__, ids))
+        return sorted(range(len(points)), key=points.__getitem__, reverse=True)
+
+
+current = Scoring(DEFAULT_CONFIG)
+_file_stat = None
+
+
+def refresh(path=SCORING_FILE):
+    """Pick up tables saved by another worker; True if they changed."""
+    global current, _file_stat
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    if key == _file_stat:
+        return False
+    with open(path, 'rb') as f:
+        scoring = Scoring(loads(f.read()))
+    _file_stat = key
+    changed = scoring.version != current.version
+    current = scoring
+    return changed
+
+
+def update(config, path=SCORING_FILE):
+    """Validate and save config as the next version, and switch to it."""
+    global current
+    if not isinstance(config, dict):
+        raise ValueError("Scoring config must be an object")
+    lock_fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        flock(lock_fd, 'LOCK_EX')
+        refresh(path)
+        # Fields left out keep their current values, down to single tiers
+        # and weights.
+        merged = current.to_config()
+        for key, value in config.items():
+            if key in MERGED_FIELDS and isinstance(value, dict):
+                value = dict(merged[key], **value)
+            merged[key] = value
+        merged["version"] = current.version + 1
+        merged["points_version"] = current.points_version
+        scoring = Scoring(merged)
+        scoring.check_replaces(current)
+        if scoring.rank_points != current.rank_points or scoring.star_points != current.star_points:
+            scoring.points_version += 1
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(dumps(scoring.to_config()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+        current = scoring
+        refresh(path)
+    finally:
+        os.close(lock_fd)
+    return scoring
+
+
+refresh()
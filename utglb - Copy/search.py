@@ -0,0 +1,135 @@
+import bisect
+import heapq
+import math
+from itertools import islice
+
+from events import changed_names
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+GRAM = 3
+# A fuzzy match has to contain at least this share of the query's trigrams.
+MIN_SHARED = 0.5
+# Fragments common to most names are only scored over this many candidates.
+MAX_CANDIDATES = 5000
+
+
+def fold(name):
+    return name.casefold()
+
+
+def grams(folded):
+    return {folded[i:i + GRAM] for i in range(len(folded) - GRAM + 1)}
+
+
+class NameIndex:
+    """Prefix and trigram index over one board's player names.
+
+    Case-folded names are kept in one sorted list, which is a trie laid flat:
+    every prefix is a contiguous run found by bisection, so a type-ahead
+    query costs O(log n + limit) however large the board. Queries that are
+    not a prefix fall back to trigram postings and match names sharing most
+    of the query's trigrams.
+
+    Like the overall view, the index listens to its board and touches only
+    the names a change involved; listeners run under the board's write lock,
+    so searches made under its read lock see the index and the board agree.
+    """
+
+    def __init__(self, board):
+        self.keys = []
+        self.postings = {}
+        with board.lock.write():
+            self.rebuild(board)
+            board.listeners.append(self.on_change)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rebuild(self, board):
+        keys = sorted((fold(p["name"]), p["name"]) for p in board.players)
+        postings = {}
+        for folded, name in keys:
+            for gram in grams(folded):
+                names = postings.get(gram)
+                if names is None:
+                    names = postings[gram] = set()
+                names.add(name)
+        self.keys = keys
+        self.postings = postings
+
+    def on_change(self, board, record):
+        op = record["op"]
+        if op in ("swap", "move"):
+            return
+        if op == "refresh":
+            names = record["names"]
+        elif op in ("add", "remove", "update", "batch"):
+            names = changed_names(record)
+        else:
+            self.rebuild(board)
+            return
+        for name in names:
+            if name in board.players:
+                self.add(name)
+            else:
+                self.discard(name)
+
+    def add(self, name):
+        key = (fold(name), name)
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            return
+        self.keys.insert(index, key)
+        for gram in grams(key[0]):
+            self.postings.setdefault(gram, set()).add(name)
+
+    def discard(self, name):
+        key = (fold(name), name)
+        index = bisect.bisect_left(self.keys, key)
+        if index == len(self.keys) or self.keys[index] != key:
+            return
+        del self.keys[index]
+        for gram in grams(key[0]):
+            names = self.postings[gram]
+            names.discard(name)
+            if not names:
+                del self.postings[gram]
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Up to limit (name, match, score) tuples, best first.
+
+        Prefix matches come first in case-folded order, which puts an exact
+        match at the top; fuzzy matches follow by the share of the query's
+        trigrams they contain, shorter names first.
+        """
+        folded = fold(query)
+        start = bisect.bisect_left(self.keys, (folded,))
+        matches = []
+        for key, name in self.keys[start:start + limit]:
+            if not key.startswith(folded):
+                break
+            matches.append((name, "prefix", 1.0))
+        if len(matches) == limit or len(folded) < GRAM:
+            return matches
+
+        query_grams = grams(folded)
+        need = max(1, math.ceil(len(query_grams) * MIN_SHARED))
+        # Any name sharing `need` trigrams holds one of the rarest
+        # len - need + 1 of them, so only their postings are candidates.
+        rarest = sorted(query_grams, key=lambda gram: len(self.postings.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(query_grams) - need + 1]:
+            candidates.update(self.postings.get(gram, ()))
+        found = {name for name, _, _ in matches}
+        postings = [self.postings[gram] for gram in query_grams if gram in self.postings]
+        scored = []
+        for name in islice(candidates, MAX_CANDIDATES):
+            if name in found:
+                continue
+            shared = sum(name in names for names in postings)
+            if shared >= need:
+                scored.append((-shared / len(query_grams), len(name), name))
+        for score, _, name in heapq.nsmallest(limit - len(matches), scored):
+            matches.append((name, "fuzzy", round(-score, 3)))
+        return matches
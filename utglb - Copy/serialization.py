@@ -0,0 +1,45 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def dumps(obj, default=None):
+    """Encode obj as compact JSON bytes with the fastest encoder available."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default)
+    return json.dumps(obj, separators=(',', ':'), check_circular=False, default=default).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def packb(obj, default=None):
+    return msgpack.packb(obj, default=default)
+
+
+def unpackb(data):
+    return msgpack.unpackb(data)
+
+
+# Response formats by mimetype, in order of preference.
+ENCODERS = {JSON_MIMETYPE: dumps}
+if msgpack is not None:
+    ENCODERS[MSGPACK_MIMETYPE] = packb
+
+
+def encode(obj, mimetype=JSON_MIMETYPE, default=None):
+    return ENCODERS[mimetype](obj, default=default)
@@ -0,0 +1,355 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from player import to_json
+from serialization import dumps, loads
+
+CHANGE_HISTORY = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    board TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    points REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (board, name)
+);
+CREATE INDEX IF NOT EXISTS players_position ON players (board, position);
+CREATE INDEX IF NOT EXISTS players_points ON players (board, points);
+CREATE TABLE IF NOT EXISTS boards (
+    board TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    board TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (board, seq)
+);
+"""
+
+# Positions are sparse: only their order matters. Rows are laid out GAP
+# apart, a new row takes the midpoint of its neighbours, and when two
+# neighbours meet the rows after them are spread out again (see _spread).
+GAP = 1 << 32
+SPREAD_WINDOW = 32
+
+# Statements are module constants so each connection's statement cache
+# prepares them once and reuses them.
+COUNT = "SELECT COUNT(*) FROM players WHERE board = ?"
+GET = "SELECT data FROM players WHERE board = ? AND name = ?"
+POSITION = "SELECT position FROM players WHERE board = ? AND name = ?"
+COUNT_BEFORE = "SELECT COUNT(*) FROM players WHERE board = ? AND position < ?"
+POSITION_AT = "SELECT position FROM players WHERE board = ? ORDER BY position LIMIT 1 OFFSET ?"
+AT = "SELECT data FROM players WHERE board = ? ORDER BY position LIMIT 1 OFFSET ?"
+RANGE = "SELECT data FROM players WHERE board = ? ORDER BY position LIMIT ? OFFSET ?"
+RANGE_AFTER = ("SELECT data FROM players WHERE board = ? AND position > "
+               "(SELECT position FROM players WHERE board = ? AND name = ?) ORDER BY position LIMIT ?")
+FIRST_BELOW = "SELECT MIN(position) FROM players WHERE board = ? AND points < ?"
+LAST_BEFORE = "SELECT MAX(position) FROM players WHERE board = ? AND position < ?"
+LAST = "SELECT MAX(position) FROM players WHERE board = ?"
+AFTER = "SELECT name, position FROM players WHERE board = ? AND position > ? ORDER BY position LIMIT ?"
+SET_POSITION = "UPDATE players SET position = ? WHERE board = ? AND name = ?"
+INSERT = "INSERT INTO players (board, name, position, points, data) VALUES (?, ?, ?, ?, ?)"
+DELETE = "DELETE FROM players WHERE board = ? AND name = ?"
+UPDATE = "UPDATE players SET name = ?, points = ?, data = ? WHERE board = ? AND name = ?"
+SWAP = "UPDATE players SET position = CASE name WHEN ? THEN ? ELSE ? END WHERE board = ? AND name IN (?, ?)"
+CLEAR = "DELETE FROM players WHERE board = ?"
+CLEAR_CHANGES = "DELETE FROM changes WHERE board = ?"
+VERSION = "SELECT version FROM boards WHERE board = ?"
+SET_VERSION = "INSERT INTO boards (board, version) VALUES (?, ?) ON CONFLICT (board) DO UPDATE SET version = excluded.version"
+ADD_CHANGE = "INSERT INTO changes (board, seq, record) VALUES (?, ?, ?)"
+PRUNE_CHANGES = "DELETE FROM changes WHERE board = ? AND seq <= ?"
+CHANGES = "SELECT seq, record FROM changes WHERE board = ? AND seq > ? ORDER BY seq"
+
+
+class SQLiteDatabase:
+    """One SQLite file in WAL mode, with a connection per thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SQLitePlayerStore:
+    """PlayerStore over one board's rows in SQLite.
+
+    Positions are sparse sort keys, so inserting, removing or moving a player
+    writes its own row and only now and then spreads out a few neighbours.
+    Ranks are indexed COUNTs of the rows before a position. after() reads
+    on from a player's position through the index, so paging by cursor
+    costs the same at any depth; slice() has to skip rows with OFFSET.
+    """
+
+    def __init__(self, database, board, points_key, player_type):
+        self.database = database
+        self.board = board
+        self.points_key = points_key
+        self.player_type = player_type
+
+    def __len__(self):
+        return self._one(COUNT, (self.board,))
+
+    def __contains__(self, name):
+        return self._one(POSITION, (self.board, name)) is not None
+
+    def __iter__(self):
+        return iter(self.slice(0, len(self)))
+
+    def get(self, name):
+        data = self._one(GET, (self.board, name))
+        return self._decode(data) if data is not None else None
+
+    def index_of(self, name):
+        return self._one(COUNT_BEFORE, (self.board, self._position(name)))
+
+    def at(self, index):
+        data = self._one(AT, (self.board, index)) if index >= 0 else None
+        if data is None:
+            raise IndexError(index)
+        return self._decode(data)
+
+    def slice(self, start, stop):
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        rows = self._conn().execute(RANGE, (self.board, stop - start, start))
+        return [self._decode(data) for data, in rows]
+
+    def after(self, name, count):
+        if name not in self:
+            raise KeyError(name)
+        rows = self._conn().execute(RANGE_AFTER, (self.board, self.board, name, count))
+        return [self._decode(data) for data, in rows]
+
+    def points_index(self, points):
+        position = self._one(FIRST_BELOW, (self.board, points))
+        return self._one(COUNT_BEFORE, (self.board, position)) if position is not None else len(self)
+
+    def insert(self, player, index=None):
+        name = player["name"]
+        if name in self:
+            raise KeyError(name)
+        points = player.get(self.points_key, 0)
+        if index is None:
+            before = self._one(FIRST_BELOW, (self.board, points))
+            index = self._one(COUNT_BEFORE, (self.board, before)) if before is not None else len(self)
+        else:
+            index = min(max(index, 0), len(self))
+            before = self._one(POSITION_AT, (self.board, index))
+        position = self._position_before(before)
+        self._conn().execute(INSERT, (self.board, name, position, points, dumps(player, default=to_json).decode()))
+        return index
+
+    def remove(self, name):
+        player = self.get(name)
+        if player is None:
+            raise KeyError(name)
+        self._conn().execute(DELETE, (self.board, name))
+        return player
+
+    def move(self, name, index=None):
+        player = self.remove(name)
+        return self.insert(player, index)
+
+    def replace(self, name, player):
+        if name not in self:
+            raise KeyError(name)
+        new_name = player["name"]
+        if new_name != name and new_name in self:
+            raise KeyError(new_name)
+        self._conn().execute(UPDATE, (new_name, player.get(self.points_key, 0), dumps(player, default=to_json).decode(), self.board, name))
+
+    def swap(self, name1, name2):
+        position1 = self._position(name1)
+        position2 = self._position(name2)
+        self._conn().execute(SWAP, (name1, position2, position1, self.board, name1, name2))
+
+    def load(self, players):
+        seen = set()
+        loaded = []
+        for player in players:
+            if player["name"] not in seen:
+                seen.add(player["name"])
+                loaded.append(player)
+        conn = self._conn()
+        conn.execute(CLEAR, (self.board,))
+        conn.executemany(INSERT, (
+            (self.board, p["name"], i * GAP, p.get(self.points_key, 0), dumps(p, default=to_json).decode())
+            for i, p in enumerate(loaded, 1)
+        ))
+        return loaded
+
+    def clear(self):
+        self._conn().execute(CLEAR, (self.board,))
+
+    def _position(self, name):
+        position = self._one(POSITION, (self.board, name))
+        if position is None:
+            raise KeyError(name)
+        return position
+
+    def _position_before(self, before):
+        """A free position just ahead of before, or at the end for None."""
+        if before is None:
+            return (self._one(LAST, (self.board,)) or 0) + GAP
+        after = self._one(LAST_BEFORE, (self.board, before))
+        if after is None:
+            return before - GAP
+        if before - after < 2:
+            before = self._spread(after)
+        return (after + before) // 2
+
+    def _spread(self, after):
+        """Renumber the rows after a position so a new one fits right after it.
+
+        The window of rows grows until they can be spaced at least two apart
+        below the next row, or reaches the end of the board, where they go
+        GAP apart. Returns the new position of the first row.
+        """
+        conn = self._conn()
+        window = SPREAD_WINDOW
+        while True:
+            rows = conn.execute(AFTER, (self.board, after, window + 1)).fetchall()
+            if len(rows) <= window:
+                step = GAP
+            else:
+                step = (rows[-1][1] - after) // len(rows)
+                rows = rows[:-1]
+                if step < 2:
+                    window *= 2
+                    continue
+            conn.executemany(SET_POSITION, ((after + step * i, self.board, name) for i, (name, _) in enumerate(rows, 1)))
+            return after + step
+
+    def _conn(self):
+        return self.database.connection()
+
+    def _decode(self, data):
+        return self.player_type.from_dict(loads(data))
+
+    def _one(self, sql, params):
+        row = self._conn().execute(sql, params).fetchone()
+        return row[0] if row is not None else None
+
+
+class SQLiteJournal:
+    """Board version and change feed kept next to the rows in SQLite.
+
+    The store already holds the board, so unlike BoardJournal nothing has to
+    be replayed into it; records are kept only so other workers can tell
+    their listeners what changed. locked() is a write transaction.
+    """
+
+    replay = False
+    ordered = True
+
+    def __init__(self, database, board):
+        self.database = database
+        self.board = board
+        self.seq = 0
+        self.pending = 0
+        self._depth = 0
+        self._seq_at_begin = 0
+
+    @contextmanager
+    def locked(self):
+        conn = self.database.connection()
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        self._seq_at_begin = self.seq
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self.seq = self._seq_at_begin
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+
+    def load(self):
+        self.seq = self._version()
+        return [], []
+
+    def append(self, record):
+        self.seq += 1
+        record["seq"] = self.seq
+        conn = self.database.connection()
+        conn.execute(SET_VERSION, (self.board, self.seq))
+        conn.execute(ADD_CHANGE, (self.board, self.seq, dumps(record, default=to_json).decode()))
+        conn.execute(PRUNE_CHANGES, (self.board, self.seq - CHANGE_HISTORY))
+        return self.seq
+
+    def sync(self):
+        pass
+
+    def should_compact(self, board_size):
+        return False
+
+    def compact(self, players, wait=False):
+        pass
+
+    def checkpoint(self, players):
+        return self.append({"op": "replace"})
+
+    def changed(self):
+        return self._version() != self.seq
+
+    def tail(self):
+        records = [loads(record) for _, record in self.database.connection().execute(CHANGES, (self.board, self.seq))]
+        if not records or records[0]["seq"] != self.seq + 1:
+            return None
+        self.seq = records[-1]["seq"]
+        return records
+
+    def close(self):
+        # The connection is shared by every board on this thread.
+        pass
+
+    def _version(self):
+        row = self.database.connection().execute(VERSION, (self.board,)).fetchone()
+        return row[0] if row is not None else 0
+
+
+def migrate(database, leaderboards):
+    """Copy boards into the database in one transaction, keeping versions."""
+    conn = database.connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for lb in leaderboards:
+            store = SQLitePlayerStore(database, lb.name, lb.points_key, lb.player_type)
+            store.load(list(lb.players))
+            conn.execute(SET_VERSION, (lb.name, lb.version))
+            conn.execute(CLEAR_CHANGES, (lb.name,))
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
@@ -4,7 +4,8 @@ let currentLeaderboardType = document.body.getAttribute('data-lb-type') || 'clas
 function getLeaderboardType() {
     return window.location.pathname === '/' ? 'classic' : 
            window.location.pathname === '/ffa' ? 'ffa' : 
-           window.location.pathname === '/classic' ? 'classic' : 'classic';
+           window.location.pathname === '/classic' ? 'classic' : 
+           window.location.pathname === '/overall' ? 'overall' : 'classic';
 }
 
 currentLeaderboardType = getLeaderboardType();
@@ -16,6 +17,7 @@ function updateFormFields() {
     
     document.getElementById('classicHeader').style.display = lb === 'classic' ? 'table-row' : 'none';
     document.getElementById('ffaHeader').style.display = lb === 'ffa' ? 'table-row' : 'none';
+    document.getElementById('overallHeader').style.display = lb === 'overall' ? 'table-row' : 'none';
 }
 
 function openModal() {
@@ -107,7 +109,7 @@ function addPlayer(event) {
             if (data.success) {
                 document.getElementById('playerForm').reset();
                 closeModal();
-                loadPlayers();
+                refreshAfterChange();
                 editingPlayer = null;
             } else {
                 alert('Error: ' + data.error);
@@ -127,7 +129,7 @@ function addPlayer(event) {
             if (data.success) {
                 document.getElementById('playerForm').reset();
                 closeModal();
-                loadPlayers();
+                refreshAfterChange();
             } else {
                 alert('Error: ' + data.error);
             }
@@ -143,7 +145,7 @@ function deletePlayer(name) {
         })
         .then(response => response.json())
         .then(data => {
-            loadPlayers();
+            refreshAfterChange();
         })
         .catch(error => console.error('Error:', error));
     }
@@ -156,7 +158,7 @@ function deleteAll() {
         })
         .then(response => response.json())
         .then(data => {
-            loadPlayers();
+            refreshAfterChange();
         })
         .catch(error => console.error('Error:', error));
     }
@@ -167,25 +169,16 @@ let editingRowName = null;
 
 function toggleEditDropdown(playerName) {
     const lb = currentLeaderboardType;
-    const tbody = document.getElementById('playerRows');
     
     if (editingRowName === playerName) {
-        const editRow = document.getElementById(`edit-${playerName}`);
-        if (editRow) editRow.remove();
-        editingRowName = null;
+        closeEditRow();
         return;
     }
+    closeEditRow();
     
-    if (editingRowName) {
-        const oldEditRow = document.getElementById(`edit-${editingRowName}`);
-        if (oldEditRow) oldEditRow.remove();
-    }
-    
-    const playerRow = Array.from(tbody.querySelectorAll('tr')).find(r => r.dataset.playerName === playerName);
+    const playerRow = windowRows.find(r => r.player.name === playerName);
     if (!playerRow) return;
-    
-    const player = playerRow.dataset.playerData ? JSON.parse(playerRow.dataset.playerData) : null;
-    if (!player) return;
+    const player = playerRow.player;
     
     const editRow = document.createElement('tr');
     editRow.id = `edit-${playerName}`;
@@ -255,6 +248,7 @@ function toggleEditDropdown(playerName) {
     
     editRow.innerHTML = editContent;
     playerRow.insertAdjacentElement('afterend', editRow);
+    editRowElement = editRow;
     editingRowName = playerName;
 }
 
@@ -303,7 +297,7 @@ function saveInlineEdit(playerName) {
     .then(response => response.json())
     .then(data => {
         if (data.success) {
-            loadPlayers();
+            refreshAfterChange();
             editingRowName = null;
         } else {
             alert('Error: ' + data.error);
@@ -339,381 +333,353 @@ function handleDrop(event, targetIndex) {
     draggedRowIndex = null;
 }
 
+let pendingMoves = [];
+
 function updatePlayerPosition(fromIndex, toIndex) {
+    if (fromIndex < 0 || fromIndex >= players.length || toIndex < 0 || toIndex >= players.length) return;
+    
+    // Drops made in quick succession go to the server as one batch.
+    if (!pendingMoves.length) setTimeout(sendPendingMoves, 250);
+    pendingMoves.push({
+        op: 'swap',
+        name1: players[fromIndex].name,
+        name2: players[toIndex].name
+    });
+}
+
+function sendPendingMoves() {
     const lb = currentLeaderboardType;
-    const tbody = document.getElementById('playerRows');
-    const rows = Array.from(tbody.querySelectorAll('tr'));
-    
-    if (fromIndex < 0 || fromIndex >= rows.length || toIndex < 0 || toIndex >= rows.length) return;
-    
-    const player1 = rows[fromIndex].dataset.playerName;
-    const player2 = rows[toIndex].dataset.playerName;
+    const operations = pendingMoves;
+    pendingMoves = [];
     
-    fetch(`/api/players/${lb}/swap`, {
+    fetch(`/api/leaderboards/${lb}/batch`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({
-            name1: player1,
-            name2: player2
-        })
+        body: JSON.stringify({ operations: operations })
     })
     .then(response => response.json())
     .then(data => {
         if (data.success) {
+            refreshAfterChange();
+        } else {
+            alert('Error: ' + data.error);
             loadPlayers();
         }
     })
     .catch(error => console.error('Error:', error));
 }
 
+const PAGE_SIZE = 100;
+// Only this many rows are in the DOM; they are rebound to other players as
+// the page scrolls, with spacer rows standing in for the rest.
+const WINDOW_SIZE = 80;
+const WINDOW_MARGIN = 20;
+let players = [];
+let nextCursor = null;
+let loadingPage = false;
+let pageObserver = null;
+let boardVersion = 0;
+let eventSource = null;
+let windowRows = [];
+let windowStart = 0;
+let rowHeight = 0;
+let topSpacer = null;
+let bottomSpacer = null;
+let editRowElement = null;
+let windowFrame = null;
+
 function loadPlayers() {
+    nextCursor = null;
+    loadPage(true);
+}
+
+function loadPage(reset) {
     const lb = currentLeaderboardType;
-    fetch(`/api/players/${lb}`)
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (!reset && nextCursor) {
+        params.set('cursor', nextCursor);
+    }
+    
+    loadingPage = true;
+    fetch(`/api/players/${lb}?${params}`, { cache: 'no-cache' })
     .then(response => response.json())
-    .then(players => {
-        const tbody = document.getElementById('playerRows');
-        tbody.innerHTML = '';
-        
-        if (players.length === 0) {
-            tbody.innerHTML = '<tr><td colspan="8" class="empty-state">No players yet. Add one to get started!</td></tr>';
-            return;
+    .then(page => {
+        if (reset) {
+            players = [];
+            closeEditRow();
+            boardVersion = page.version;
+            connectEvents();
         }
         
-        players.forEach((player, index) => {
-            const row = document.createElement('tr');
-            row.dataset.playerName = player.name;
-            row.dataset.playerData = JSON.stringify(player);
-            
-            row.draggable = true;
-                row.addEventListener('dragstart', (e) => handleDragStart(e, index));
-                row.addEventListener('dragover', handleDragOver);
-                row.addEventListener('dragleave', handleDragLeave);
-                row.addEventListener('drop', (e) => handleDrop(e, index));
-                row.addEventListener('dragend', () => row.classList.remove('dragging'));
-            
-            const robloxLink = player.roblox_link ? `<a href="${player.roblox_link}" target="_blank" class="roblox-link">🎮 Profile</a>` : '<span class="no-link">—</span>';
-            
-            if (lb === 'classic') {
-                row.innerHTML = `
-                    <td>#${player.position || index + 1}</td>
-                    <td style="cursor: grab;" class="drag-handle">☰ ${player.name}</td>
-                    <td><span class="rank-badge">${player.rank}</span></td>
-                    <td><span class="points">${player.rank_points}</span></td>
-                    <td>${robloxLink}</td>
-                    <td>
-                        <div class="actions">
-                            <button class="action-btn edit-btn" onclick="toggleEditDropdown('${player.name.replace(/'/g, "\\'")}')">✏️</button>
-                            <button class="action-btn delete-btn" onclick="deletePlayer('${player.name.replace(/'/g, "\\'")}')">🗑️</button>
-                        </div>
-                    </td>
-                `;
-            } else if (lb === 'ffa') {
-                row.innerHTML = `
-                    <td>#${player.position || index + 1}</td>
-                    <td style="cursor: grab;" class="drag-handle">☰ ${player.name}</td>
-                    <td><span class="star-rating"><span class="star">⭐</span> ${player.stars}</span></td>
-                    <td><span class="points">${player.star_points.toFixed(1)}</span></td>
-                    <td>${robloxLink}</td>
-                    <td>
-                        <div class="actions">
-                            <button class="action-btn edit-btn" onclick="toggleEditDropdown('${player.name.replace(/'/g, "\\'")}')">✏️</button>
-                            <button class="action-btn delete-btn" onclick="deletePlayer('${player.name.replace(/'/g, "\\'")}')">🗑️</button>
-                        </div>
-                    </td>
-                `;
-            }
-            
-            tbody.appendChild(row);
+        page.players.forEach(player => {
+            // Rows ahead may have moved under deltas since the cursor was
+            // issued; number on from the rows we hold.
+            player.position = players.length + 1;
+            players.push(player);
         });
+        nextCursor = page.next_cursor;
+        renderWindow(true);
     })
-    .catch(error => console.error('Error:', error));
+    .catch(error => console.error('Error:', error))
+    .finally(() => {
+        loadingPage = false;
+        watchPageSentinel();
+    });
 }
 
-function exportLeaderboard() {
-    const lb = currentLeaderboardType;
-    const tbody = document.getElementById('playerRows');
-    const players = Array.from(tbody.querySelectorAll('tr')).map(row => JSON.parse(row.dataset.playerData));
-    
-    let exportMessages = [];
-    
-    if (lb === 'classic') {
-        exportMessages = generateClassicExportMulti(players);
-    } else if (lb === 'ffa') {
-        exportMessages = generateFFAExportMulti(players);
-    }
-    
-    const exportText = exportMessages.join('\n\n---\n\n');
-    document.getElementById('exportText').value = exportText;
-    document.getElementById('exportMessageCount').textContent = exportMessages.length > 1 ? `(${exportMessages.length} messages)` : '';
-    document.getElementById('exportModal').style.display = 'block';
-}
-
-function generateClassicExport(players) {
-    const tierMap = {
-        'S High': { tier: 'S Tier', emoji: ':STier:', sub: 'High' },
-        'S Mid': { tier: 'S Tier', emoji: ':STier:', sub: 'Mid' },
-        'S Low': { tier: 'S Tier', emoji: ':STier:', sub: 'Low' },
-        'A+ High': { tier: 'A+ Tier', emoji: ':HighTier:', sub: 'High' },
-        'A+ Mid': { tier: 'A+ Tier', emoji: ':HighTier:', sub: 'Mid' },
-        'A+ Low': { tier: 'A+ Tier', emoji: ':HighTier:', sub: 'Low' },
-        'A High': { tier: 'A Tier', emoji: ':MidTier:', sub: 'High' },
-        'A Mid': { tier: 'A Tier', emoji: ':MidTier:', sub: 'Mid' },
-        'A Low': { tier: 'A Tier', emoji: ':MidTier:', sub: 'Low' },
-        'A- High': { tier: 'A- Tier', emoji: ':LowTier:', sub: 'High' },
-        'A- Mid': { tier: 'A- Tier', emoji: ':LowTier:', sub: 'Mid' },
-        'A- Low': { tier: 'A- Tier', emoji: ':LowTier:', sub: 'Low' },
-        'B+ High': { tier: 'B+ Tier', emoji: ':LowTier:', sub: 'High' },
-        'B+ Mid': { tier: 'B+ Tier', emoji: ':LowTier:', sub: 'Mid' },
-        'B+ Low': { tier: 'B+ Tier', emoji: ':LowTier:', sub: 'Low' },
-    };
-    
-    const tiers = {};
-    players.forEach((player, index) => {
-        const tierInfo = tierMap[player.rank];
-        if (tierInfo) {
-            const tierKey = tierInfo.tier;
-            if (!tiers[tierKey]) {
-                tiers[tierKey] = { emoji: tierInfo.emoji, subs: { High: [], Mid: [], Low: [] } };
+function watchPageSentinel() {
+    const sentinel = document.getElementById('pageSentinel');
+    if (!pageObserver) {
+        pageObserver = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting) && nextCursor && !loadingPage) {
+                loadPage(false);
             }
-            tiers[tierKey].subs[tierInfo.sub].push({ ...player, position: player.position || index + 1 });
-        }
-    });
-    
-    let text = '';
-    const tierOrder = ['S Tier', 'A+ Tier', 'A Tier', 'A- Tier', 'B+ Tier'];
-    
-    tierOrder.forEach(tierName => {
-        if (tiers[tierName]) {
-            const tier = tiers[tierName];
-            text += `# ${tierName} ${tier.emoji}\n`;
-            
-            ['High', 'Mid', 'Low'].forEach(sub => {
-                if (tier.subs[sub].length > 0) {
-                    text += `-# ${sub}\n`;
-                    tier.subs[sub].forEach(player => {
-                        const profileLink = player.roblox_link ? `[${player.name}](${player.roblox_link})` : player.name;
-                        text += `## ${player.position} - ${profileLink}\n`;
-                    });
-                }
-            });
-            
-            text += '\n';
-        }
-    });
-    
-    return text;
-}
-
-function getStarEmoji(stars) {
-    const starEmojiMap = {
-        5.0: ':5_star:',
-        4.5: ':4pt5_star:',
-        4.0: ':4_star:',
-        3.5: ':3pt5_star:',
-        3.0: ':3_star:',
-        2.5: ':2pt5_star:',
-        2.0: ':2_star:',
-        1.5: ':1pt5_star:',
-        1.0: ':1_star:',
-        0.5: ':0pt5_star:'
-    };
-    return starEmojiMap[stars] || '⭐';
-}
-
-function getRankEmoji(rank) {
-    if (rank.startsWith('S')) {
-        return ':STier:';
-    } else if (rank.startsWith('A+')) {
-        return ':HighTier:';
-    } else if (rank.startsWith('A ')) {
-        return ':MidTier:';
-    } else if (rank.startsWith('A-')) {
-        return ':LowTier:';
-    } else if (rank.startsWith('B+')) {
-        return ':LowTier:';
+        }, { rootMargin: '600px' });
+        pageObserver.observe(sentinel);
+    } else if (nextCursor) {
+        // Re-arm the observer so a sentinel that is still on screen after a
+        // short page triggers the next fetch.
+        pageObserver.unobserve(sentinel);
+        pageObserver.observe(sentinel);
     }
-    return '';
 }
 
-function generateFFAExport(players) {
-    const starGroups = {};
-    players.forEach((player, index) => {
-        const stars = player.stars;
-        if (!starGroups[stars]) {
-            starGroups[stars] = [];
-        }
-        starGroups[stars].push({ ...player, position: player.position || index + 1 });
-    });
+function connectEvents() {
+    if (eventSource || !window.EventSource) return;
     
-    let text = '';
-    const starOrder = [5.0, 4.5, 4.0, 3.5, 3.0, 2.5, 2.0, 1.5, 1.0, 0.5];
-    
-    starOrder.forEach(stars => {
-        if (starGroups[stars]) {
-            const starEmoji = getStarEmoji(stars);
-            text += `# ${stars} Stars ${starEmoji}\n`;
-            starGroups[stars].forEach(player => {
-                const profileLink = player.roblox_link ? `[${player.name}](${player.roblox_link})` : player.name;
-                text += `## ${player.position} - ${profileLink}\n`;
-            });
-            text += '\n';
-        }
+    const lb = currentLeaderboardType;
+    eventSource = new EventSource(`/api/leaderboards/${lb}/events?since=${boardVersion}`);
+    eventSource.addEventListener('delta', event => applyDelta(JSON.parse(event.data)));
+    eventSource.addEventListener('reset', event => {
+        if (JSON.parse(event.data).version !== boardVersion) loadPlayers();
     });
-    
-    return text;
 }
 
-function generateOverallExport(players) {
-    let text = '# Overall Leaderboard\n\n';
-    players.forEach((player, index) => {
-        const profileLink = player.roblox_link ? `[${player.name}](${player.roblox_link})` : player.name;
-        const starEmoji = getStarEmoji(player.stars);
-        const rankEmoji = getRankEmoji(player.rank);
-        text += `## ${index + 1} - ${profileLink} | ${starEmoji} ${player.stars} Stars / ${rankEmoji} ${player.rank}\n`;
-    });
-    return text;
+function refreshAfterChange() {
+    // With a live stream the change arrives as a delta; only reload without one.
+    if (!eventSource || eventSource.readyState !== EventSource.OPEN) {
+        loadPlayers();
+    }
 }
 
-function generateOverallExportMulti(players) {
-    const messages = [];
-    let currentMessage = '# Overall Leaderboard\n\n';
-    const maxLength = 1900;
+function applyDelta(delta) {
+    if (delta.version <= boardVersion) return;
+    if (delta.version !== boardVersion + 1) {
+        loadPlayers();
+        return;
+    }
+    boardVersion = delta.version;
+    
+    let first = players.length;
+    const remove = name => {
+        const index = playerIndex(name);
+        if (index < 0) return;
+        if (editingRowName === name) closeEditRow();
+        players.splice(index, 1);
+        first = Math.min(first, index);
+    };
+    const place = player => {
+        const index = player.position - 1;
+        // Players past the loaded prefix arrive with the next page instead.
+        if (index > players.length || (index === players.length && nextCursor)) return;
+        players.splice(index, 0, player);
+        first = Math.min(first, index);
+    };
     
-    players.forEach((player, index) => {
-        const profileLink = player.roblox_link ? `[${player.name}](${player.roblox_link})` : player.name;
-        const starEmoji = getStarEmoji(player.stars);
-        const rankEmoji = getRankEmoji(player.rank);
-        const playerLine = `## ${index + 1} - ${profileLink} | ${starEmoji} ${player.stars} Stars / ${rankEmoji} ${player.rank}\n`;
-        
-        if ((currentMessage + playerLine).length > maxLength) {
-            messages.push(currentMessage.trim());
-            currentMessage = playerLine;
-        } else {
-            currentMessage += playerLine;
+    if (delta.op === 'add') {
+        place(delta.player);
+    } else if (delta.op === 'update' || delta.op === 'move') {
+        remove(delta.name);
+        place(delta.player);
+    } else if (delta.op === 'remove') {
+        remove(delta.name);
+    } else if (delta.op === 'swap') {
+        const index1 = playerIndex(delta.names[0]);
+        const index2 = playerIndex(delta.names[1]);
+        if (index1 < 0 || index2 < 0) {
+            loadPlayers();
+            return;
         }
-    });
-    
-    if (currentMessage.trim()) {
-        messages.push(currentMessage.trim());
+        closeEditRow();
+        [players[index1], players[index2]] = [players[index2], players[index1]];
+        first = Math.min(index1, index2);
+    } else if (delta.op === 'refresh' || delta.op === 'batch') {
+        delta.removed.forEach(remove);
+        delta.players.forEach(player => remove(player.name));
+        delta.players.sort((a, b) => a.position - b.position).forEach(place);
+    } else {
+        loadPlayers();
+        return;
     }
-    
-    return messages;
+    renumberFrom(first);
+    renderWindow(true);
 }
 
-function generateFFAExportMulti(players) {
-    const starGroups = {};
-    players.forEach((player, index) => {
-        const stars = player.stars;
-        if (!starGroups[stars]) {
-            starGroups[stars] = [];
-        }
-        starGroups[stars].push({ ...player, position: player.position || index + 1 });
-    });
-    
-    const messages = [];
-    let currentMessage = '';
-    const maxLength = 1900;
-    const starOrder = [5.0, 4.5, 4.0, 3.5, 3.0, 2.5, 2.0, 1.5, 1.0, 0.5];
-    
-    starOrder.forEach(stars => {
-        if (starGroups[stars]) {
-            const starEmoji = getStarEmoji(stars);
-            let starText = `# ${stars} Stars ${starEmoji}\n`;
-            starGroups[stars].forEach(player => {
-                const profileLink = player.roblox_link ? `[${player.name}](${player.roblox_link})` : player.name;
-                starText += `## ${player.position} - ${profileLink}\n`;
-            });
-            starText += '\n';
-            
-            if ((currentMessage + starText).length > maxLength) {
-                if (currentMessage.trim()) {
-                    messages.push(currentMessage.trim());
-                }
-                currentMessage = starText;
-            } else {
-                currentMessage += starText;
-            }
-        }
-    });
+function playerIndex(name) {
+    return players.findIndex(player => player.name === name);
+}
+
+function renumberFrom(first) {
+    // Everything ahead of the first change kept its place.
+    for (let i = first; i < players.length; i++) {
+        players[i].position = i + 1;
+    }
+}
+
+function closeEditRow() {
+    if (editRowElement) {
+        editRowElement.remove();
+        editRowElement = null;
+    }
+    editingRowName = null;
+}
+
+function scheduleWindow() {
+    if (windowFrame === null) {
+        windowFrame = requestAnimationFrame(() => {
+            windowFrame = null;
+            renderWindow(false);
+        });
+    }
+}
+
+function renderWindow(changed) {
+    const tbody = document.getElementById('playerRows');
+    if (!players.length) {
+        windowRows = [];
+        topSpacer = bottomSpacer = null;
+        tbody.innerHTML = nextCursor ? '' : '<tr><td colspan="8" class="empty-state">No players yet. Add one to get started!</td></tr>';
+        return;
+    }
+    if (!topSpacer || topSpacer.parentNode !== tbody) {
+        tbody.innerHTML = '';
+        windowRows = [];
+        topSpacer = spacerRow();
+        bottomSpacer = spacerRow();
+        tbody.append(topSpacer, bottomSpacer);
+        changed = true;
+    }
     
-    if (currentMessage.trim()) {
-        messages.push(currentMessage.trim());
+    const top = topSpacer.getBoundingClientRect().top + window.scrollY;
+    const firstVisible = rowHeight ? Math.floor((window.scrollY - top) / rowHeight) : 0;
+    const start = Math.max(0, Math.min(firstVisible - WINDOW_MARGIN, players.length - WINDOW_SIZE));
+    if (!changed && start === windowStart) return;
+    windowStart = start;
+    
+    const count = Math.min(WINDOW_SIZE, players.length - start);
+    while (windowRows.length < count) {
+        const row = createPlayerRow();
+        bottomSpacer.before(row);
+        windowRows.push(row);
     }
+    windowRows.splice(count).forEach(row => row.remove());
+    windowRows.forEach((row, i) => bindPlayerRow(row, players[start + i], start + i));
     
-    return messages;
-}
-
-function generateClassicExportMulti(players) {
-    const tierMap = {
-        'S High': { tier: 'S Tier', emoji: ':STier:', sub: 'High' },
-        'S Mid': { tier: 'S Tier', emoji: ':STier:', sub: 'Mid' },
-        'S Low': { tier: 'S Tier', emoji: ':STier:', sub: 'Low' },
-        'A+ High': { tier: 'A+ Tier', emoji: ':HighTier:', sub: 'High' },
-        'A+ Mid': { tier: 'A+ Tier', emoji: ':HighTier:', sub: 'Mid' },
-        'A+ Low': { tier: 'A+ Tier', emoji: ':HighTier:', sub: 'Low' },
-        'A High': { tier: 'A Tier', emoji: ':MidTier:', sub: 'High' },
-        'A Mid': { tier: 'A Tier', emoji: ':MidTier:', sub: 'Mid' },
-        'A Low': { tier: 'A Tier', emoji: ':MidTier:', sub: 'Low' },
-        'A- High': { tier: 'A- Tier', emoji: ':LowTier:', sub: 'High' },
-        'A- Mid': { tier: 'A- Tier', emoji: ':LowTier:', sub: 'Mid' },
-        'A- Low': { tier: 'A- Tier', emoji: ':LowTier:', sub: 'Low' },
-        'B+ High': { tier: 'B+ Tier', emoji: ':LowTier:', sub: 'High' },
-        'B+ Mid': { tier: 'B+ Tier', emoji: ':LowTier:', sub: 'Mid' },
-        'B+ Low': { tier: 'B+ Tier', emoji: ':LowTier:', sub: 'Low' },
-    };
+    if (!rowHeight) rowHeight = windowRows[0].getBoundingClientRect().height;
+    topSpacer.firstChild.style.height = `${start * rowHeight}px`;
+    bottomSpacer.firstChild.style.height = `${(players.length - start - count) * rowHeight}px`;
     
-    const tiers = {};
-    players.forEach((player, index) => {
-        const tierInfo = tierMap[player.rank];
-        if (tierInfo) {
-            const tierKey = tierInfo.tier;
-            if (!tiers[tierKey]) {
-                tiers[tierKey] = { emoji: tierInfo.emoji, subs: { High: [], Mid: [], Low: [] } };
-            }
-            tiers[tierKey].subs[tierInfo.sub].push({ ...player, position: player.position || index + 1 });
+    if (editRowElement) {
+        const row = windowRows.find(row => row.player.name === editingRowName);
+        if (row) {
+            if (row.nextSibling !== editRowElement) row.after(editRowElement);
+        } else {
+            editRowElement.remove();
         }
-    });
+    }
+}
+
+function spacerRow() {
+    const row = document.createElement('tr');
+    row.className = 'spacer-row';
+    row.innerHTML = '<td colspan="8" style="padding: 0; border: 0;"></td>';
+    return row;
+}
+
+function createPlayerRow() {
+    const row = document.createElement('tr');
+    if (currentLeaderboardType === 'overall') return row;
     
-    const messages = [];
-    let currentMessage = '';
-    const maxLength = 1900;
-    const tierOrder = ['S Tier', 'A+ Tier', 'A Tier', 'A- Tier', 'B+ Tier'];
-    
-    tierOrder.forEach(tierName => {
-        if (tiers[tierName]) {
-            const tier = tiers[tierName];
-            let tierText = `# ${tierName} ${tier.emoji}\n`;
-            
-            ['High', 'Mid', 'Low'].forEach(sub => {
-                if (tier.subs[sub].length > 0) {
-                    tierText += `-# ${sub}\n`;
-                    tier.subs[sub].forEach(player => {
-                        const profileLink = player.roblox_link ? `[${player.name}](${player.roblox_link})` : player.name;
-                        tierText += `## ${player.position} - ${profileLink}\n`;
-                    });
-                }
-            });
-            
-            tierText += '\n';
-            
-            if ((currentMessage + tierText).length > maxLength) {
-                if (currentMessage.trim()) {
-                    messages.push(currentMessage.trim());
-                }
-                currentMessage = tierText;
-            } else {
-                currentMessage += tierText;
-            }
-        }
-    });
+    row.draggable = true;
+    // Rows are rebound as the page scrolls, so read the index when the drag happens.
+    row.addEventListener('dragstart', (e) => handleDragStart(e, row.index));
+    row.addEventListener('dragover', handleDragOver);
+    row.addEventListener('dragleave', handleDragLeave);
+    row.addEventListener('drop', (e) => handleDrop(e, row.index));
+    row.addEventListener('dragend', () => row.classList.remove('dragging'));
+    return row;
+}
+
+function bindPlayerRow(row, player, index) {
+    row.index = index;
+    if (row.player !== player) {
+        row.player = player;
+        row.dataset.playerName = player.name;
+        row.innerHTML = playerCells(player);
+    } else if (row.cells[0].textContent !== `#${player.position}`) {
+        row.cells[0].textContent = `#${player.position}`;
+    }
+}
+
+function playerCells(player) {
+    const lb = currentLeaderboardType;
+    const robloxLink = player.roblox_link ? `<a href="${player.roblox_link}" target="_blank" class="roblox-link">🎮 Profile</a>` : '<span class="no-link">—</span>';
+    
+    if (lb === 'overall') {
+        return `
+            <td>#${player.position}</td>
+            <td>${player.name}</td>
+            <td><span class="rank-badge">${player.rank}</span></td>
+            <td><span class="star-rating"><span class="star">⭐</span> ${player.stars}</span></td>
+            <td><span class="points">${player.final_score.toFixed(2)}</span></td>
+            <td>${robloxLink}</td>
+        `;
+    }
     
-    if (currentMessage.trim()) {
-        messages.push(currentMessage.trim());
+    const actions = `
+            <td>
+                <div class="actions">
+                    <button class="action-btn edit-btn" onclick="toggleEditDropdown('${player.name.replace(/'/g, "\\'")}')">✏️</button>
+                    <button class="action-btn delete-btn" onclick="deletePlayer('${player.name.replace(/'/g, "\\'")}')">🗑️</button>
+                </div>
+            </td>
+        `;
+    if (lb === 'classic') {
+        return `
+            <td>#${player.position}</td>
+            <td style="cursor: grab;" class="drag-handle">☰ ${player.name}</td>
+            <td><span class="rank-badge">${player.rank}</span></td>
+            <td><span class="points">${player.rank_points}</span></td>
+            <td>${robloxLink}</td>${actions}`;
     }
+    return `
+            <td>#${player.position}</td>
+            <td style="cursor: grab;" class="drag-handle">☰ ${player.name}</td>
+            <td><span class="star-rating"><span class="star">⭐</span> ${player.stars}</span></td>
+            <td><span class="points">${player.star_points.toFixed(1)}</span></td>
+            <td>${robloxLink}</td>${actions}`;
+}
+
+function exportLeaderboard() {
+    const lb = currentLeaderboardType;
     
-    return messages;
+    fetch(`/api/leaderboards/${lb}/export?format=${lb}`, { cache: 'no-cache' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success === false) {
+            alert('Error: ' + data.error);
+            return;
+        }
+        
+        const exportMessages = data.messages;
+        const exportText = exportMessages.join('\n\n---\n\n');
+        document.getElementById('exportText').value = exportText;
+        document.getElementById('exportMessageCount').textContent = exportMessages.length > 1 ? `(${exportMessages.length} messages)` : '';
+        document.getElementById('exportModal').style.display = 'block';
+    })
+    .catch(error => console.error('Error:', error));
 }
 
 function closeExportModal() {
@@ -730,116 +696,6 @@ function closeImportModal() {
     document.getElementById('importModal').style.display = 'none';
 }
 
-function parseImportText(text, leaderboardType) {
-    const lines = text.split('\n');
-    const players = [];
-    
-    if (leaderboardType === 'classic') {
-        let currentTier = '';
-        let currentSub = '';
-        
-        const tierMap = {
-            'S Tier': 'S',
-            'A+ Tier': 'A+',
-            'A Tier': 'A',
-            'A- Tier': 'A-',
-            'B+ Tier': 'B+'
-        };
-        
-        for (let i = 0; i < lines.length; i++) {
-            const line = lines[i].trim();
-            
-            if (line.includes('Tier')) {
-                for (const [key, val] of Object.entries(tierMap)) {
-                    if (line.includes(key)) {
-                        currentTier = val;
-                        break;
-                    }
-                }
-            } else if (line.startsWith('-# ')) {
-                currentSub = line.substring(3).trim();
-            } else if (line.startsWith('## ')) {
-                let match = line.match(/##\s*(\d+)\s*-\s*\[(.+?)\]\((.+?)\)/);
-                let position, name, robloxLink;
-                
-                if (match) {
-                    position = parseInt(match[1]);
-                    name = match[2];
-                    robloxLink = match[3];
-                } else {
-                    match = line.match(/##\s*(\d+)\s*-\s*:[^:]*:\s*(.+)/);
-                    if (match) {
-                        position = parseInt(match[1]);
-                        const rest = match[2];
-                        const nameMatch = rest.match(/\[(.+?)\]\((.+?)\)|(.+)/);
-                        
-                        if (nameMatch && nameMatch[1]) {
-                            name = nameMatch[1];
-                            robloxLink = nameMatch[2];
-                        } else if (nameMatch && nameMatch[3]) {
-                            name = nameMatch[3];
-                            robloxLink = '';
-                        }
-                    }
-                }
-                
-                if (name) {
-                    let rank = '';
-                    if (currentTier && currentSub) {
-                        rank = `${currentTier} ${currentSub}`;
-                    } else if (currentSub) {
-                        rank = currentSub;
-                    } else if (currentTier) {
-                        rank = currentTier;
-                    }
-                    
-                    if (rank) {
-                        players.push({
-                            name: name.trim(),
-                            position: position,
-                            rank: rank,
-                            roblox_link: robloxLink || ''
-                        });
-                    }
-                }
-            }
-        }
-    } else if (leaderboardType === 'ffa') {
-        let currentStars = null;
-        
-        for (let i = 0; i < lines.length; i++) {
-            const line = lines[i].trim();
-            
-            if (line.startsWith('# ') && !line.startsWith('## ')) {
-                const starsMatch = line.match(/(\d+\.?\d*)\s*Stars/);
-                if (starsMatch) {
-                    currentStars = parseFloat(starsMatch[1]);
-                }
-            } else if (line.startsWith('## ')) {
-                let match = line.match(/##\s*(\d+)\s*-\s*\[(.+?)\]\((.+?)\)/);
-                let position, name, robloxLink;
-                
-                if (match) {
-                    position = parseInt(match[1]);
-                    name = match[2];
-                    robloxLink = match[3];
-                    
-                    if (name && position && currentStars !== null) {
-                        players.push({
-                            name: name.trim(),
-                            position: position,
-                            stars: currentStars,
-                            roblox_link: robloxLink || ''
-                        });
-                    }
-                }
-            }
-        }
-    }
-    
-    return players;
-}
-
 function submitImport() {
     const leaderboardType = document.getElementById('importTarget').value;
     const importText = document.getElementById('importText').value;
@@ -849,29 +705,23 @@ function submitImport() {
         return;
     }
     
-    const players = parseImportText(importText, leaderboardType);
-    
-    if (players.length === 0) {
-        alert('Could not parse any players from the provided text');
-        return;
-    }
-    
-    const confirmMessage = `Are you sure you want to import ${players.length} players into the ${leaderboardType.toUpperCase()} leaderboard? This will replace all existing data.`;
+    const confirmMessage = `Are you sure you want to import this leaderboard into the ${leaderboardType.toUpperCase()} leaderboard? This will replace all existing data.`;
     
     if (confirm(confirmMessage)) {
-        fetch(`/api/leaderboards/${leaderboardType}/import`, {
+        fetch(`/api/leaderboards/${leaderboardType}/import-text`, {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'text/plain; charset=utf-8'
             },
-            body: JSON.stringify({ players: players })
+            body: importText
         })
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                alert('Leaderboard imported successfully!');
+                const skipped = data.rejected ? `\n${data.rejected} rows were skipped.` : '';
+                alert(`Imported ${data.imported} players successfully!${skipped}`);
                 closeImportModal();
-                loadPlayers();
+                refreshAfterChange();
             } else {
                 alert('Error: ' + data.error);
             }
@@ -902,4 +752,6 @@ document.addEventListener('DOMContentLoaded', function() {
     currentLeaderboardType = getLeaderboardType();
     updateFormFields();
     loadPlayers();
+    window.addEventListener('scroll', scheduleWindow, { passive: true });
+    window.addEventListener('resize', scheduleWindow);
 });
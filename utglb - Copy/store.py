@@ -0,0 +1,237 @@
+import random
+
+
+class _Node:
+    __slots__ = ('player', 'priority', 'size', 'left', 'right', 'parent')
+
+    def __init__(self, player, priority=0.0):
+        self.player = player
+        self.priority = priority
+        self.size = 1
+        self.left = None
+        self.right = None
+        self.parent = None
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _pull(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _pull(left)
+        return left
+    right.left = _merge(left, right.left)
+    _pull(right)
+    return right
+
+
+def _split(node, count):
+    if node is None:
+        return None, None
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        _pull(node)
+        return left, node
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    _pull(node)
+    return node, right
+
+
+def _build(nodes, lo, hi, depth, levels):
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    node = nodes[mid]
+    # Priorities fall by level so the balanced shape is also a valid heap.
+    node.priority = 1.0 - (depth + random.random()) / levels
+    node.left = _build(nodes, lo, mid, depth + 1, levels)
+    node.right = _build(nodes, mid + 1, hi, depth + 1, levels)
+    node.size = hi - lo
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+    return node
+
+
+def _rank(node):
+    index = _size(node.left)
+    while node.parent is not None:
+        if node is node.parent.right:
+            index += _size(node.parent.left) + 1
+        node = node.parent
+    return index
+
+
+def _successor(node):
+    if node.right is not None:
+        node = node.right
+        while node.left is not None:
+            node = node.left
+        return node
+    while node.parent is not None and node is node.parent.right:
+        node = node.parent
+    return node.parent
+
+
+class PlayerStore:
+    """Ordered player records with a name index.
+
+    Order is kept in an implicit treap, so a player's position is its rank in
+    the tree and never has to be renumbered. Lookups by name go through a dict
+    of tree nodes; inserting, removing, moving and ranking a player are all
+    O(log n).
+    """
+
+    def __init__(self, points_key):
+        self.points_key = points_key
+        self._root = None
+        self._index = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self.slice(0, len(self)))
+
+    def get(self, name):
+        node = self._index.get(name)
+        return node.player if node is not None else None
+
+    def index_of(self, name):
+        return _rank(self._index[name])
+
+    def at(self, index):
+        node = self._root
+        while node is not None:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.player
+            else:
+                index -= left + 1
+                node = node.right
+        raise IndexError(index)
+
+    def slice(self, start, stop):
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        players = []
+        if start >= stop:
+            return players
+        node = self._root
+        index = start
+        while True:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                break
+            else:
+                index -= left + 1
+                node = node.right
+        for _ in range(stop - start):
+            players.append(node.player)
+            node = _successor(node)
+        return players
+
+    def after(self, name, count):
+        """Up to count players following name, without ranking it."""
+        node = _successor(self._index[name])
+        players = []
+        while node is not None and len(players) < count:
+            players.append(node.player)
+            node = _successor(node)
+        return players
+
+    def points_index(self, points):
+        node = self._root
+        index = 0
+        while node is not None:
+            if node.player.get(self.points_key, 0) < points:
+                node = node.left
+            else:
+                index += _size(node.left) + 1
+                node = node.right
+        return index
+
+    def insert(self, player, index=None):
+        name = player["name"]
+        if name in self._index:
+            raise KeyError(name)
+        if index is None:
+            index = self.points_index(player.get(self.points_key, 0))
+        index = min(max(index, 0), len(self))
+        node = _Node(player, random.random())
+        self._index[name] = node
+        left, right = _split(self._root, index)
+        self._set_root(_merge(_merge(left, node), right))
+        return index
+
+    def remove(self, name):
+        node = self._index.pop(name)
+        left, rest = _split(self._root, _rank(node))
+        _, right = _split(rest, 1)
+        self._set_root(_merge(left, right))
+        return node.player
+
+    def move(self, name, index=None):
+        player = self.remove(name)
+        return self.insert(player, index)
+
+    def replace(self, name, player):
+        node = self._index[name]
+        new_name = player["name"]
+        if new_name != name:
+            if new_name in self._index:
+                raise KeyError(new_name)
+            del self._index[name]
+            self._index[new_name] = node
+        node.player = player
+
+    def swap(self, name1, name2):
+        node1 = self._index[name1]
+        node2 = self._index[name2]
+        node1.player, node2.player = node2.player, node1.player
+        self._index[name1] = node2
+        self._index[name2] = node1
+
+    def load(self, players):
+        index = {}
+        loaded = []
+        for player in players:
+            name = player["name"]
+            if name not in index:
+                index[name] = _Node(player)
+                loaded.append(player)
+        nodes = list(index.values())
+        self._index = index
+        self._set_root(_build(nodes, 0, len(nodes), 0, len(nodes).bit_length() + 1))
+        return loaded
+
+    def clear(self):
+        self._root = None
+        self._index = {}
+
+    def _set_root(self, root):
+        self._root = root
+        if root is not None:
+            root.parent = None
@@ -0,0 +1,19 @@
+from assets import AssetBundle
+
+
+def test_app_loads_only_what_a_build_wrote(tmp_path):
+    static, dist = tmp_path / 'static', tmp_path / 'static' / 'dist'
+    static.mkdir()
+    (static / 'script.js').write_text('console.log(1);\n' * 100)
+
+    bundle = AssetBundle(str(static), str(dist)).load()
+    assert bundle.url('script.js') == '/static/script.js'
+    assert not dist.exists()
+
+    built = AssetBundle(str(static), str(dist)).build()
+    bundle = AssetBundle(str(static), str(dist)).load()
+    url = bundle.url('script.js')
+    assert url == built.url('script.js') and url.startswith('/assets/script.')
+    asset = bundle.get(url[len('/assets/'):])
+    assert asset.encoded('gzip') == built.by_name['script.js'].encoded('gzip')
+    assert bundle.url('missing.css') == '/static/missing.css'
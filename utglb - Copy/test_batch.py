@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.fixture
+def board(client):
+    rows = [{"name": name, "rank": "A Mid", "position": i} for i, name in enumerate("abcd", 1)]
+    client.post('/api/leaderboards/classic/import', json=rows)
+    return client
+
+
+def state(client):
+    players = client.get('/api/players/classic?offset=0').json
+    return [(p["name"], p["rank"]) for p in players["players"]], players["version"]
+
+
+def batch(client, *operations):
+    return client.post('/api/leaderboards/classic/batch', json={"operations": list(operations)})
+
+
+def test_batch_applies_in_order_as_one_version(board):
+    _, version = state(board)
+    response = batch(board,
+                     {"op": "add", "name": "e", "rank": "S High"},
+                     {"op": "update", "name": "b", "new_name": "bb", "rank": "A Mid"},
+                     {"op": "move", "name": "d", "position": 2},
+                     {"op": "swap", "name1": "a", "name2": "c"},
+                     {"op": "remove", "name": "bb"})
+    assert response.status_code == 200
+    data = response.json
+    assert data["version"] == version + 1
+    assert data["removed"] == ["b", "bb"]
+    assert [(p["position"], p["name"]) for p in data["players"]] == [(1, "e"), (2, "d"), (3, "c"), (4, "a")]
+    assert state(board) == ([("e", "S High"), ("d", "A Mid"), ("c", "A Mid"), ("a", "A Mid")], version + 1)
+
+
+def test_failed_batch_changes_nothing(board):
+    before = state(board)
+    response = batch(board,
+                     {"op": "add", "name": "e", "rank": "S High"},
+                     {"op": "move", "name": "a", "position": 4},
+                     {"op": "update", "name": "b", "new_name": "c", "rank": "S High"})
+    assert response.status_code == 400
+    assert response.json["error"] == "Operation 3: Player already exists: c"
+    assert state(board) == before
+
+    for operations, error in (
+        ([{"op": "remove", "name": "a"}, {"op": "swap", "name1": "a", "name2": "b"}], "Operation 2: One or both players not found"),
+        ([{"op": "add", "name": "x"}], "Operation 1: Missing field: rank"),
+        ([{"op": "explode"}], "Operation 1: Unknown operation: explode"),
+    ):
+        response = batch(board, *operations)
+        assert (response.status_code, response.json["error"]) == (400, error)
+        assert state(board) == before
+
+
+def test_bad_batch_bodies(board):
+    assert board.post('/api/leaderboards/classic/batch', json={"operations": []}).status_code == 400
+    assert board.post('/api/leaderboards/classic/batch', json=["swap"]).status_code == 400
+
+
+def test_single_row_edits_return_only_what_changed(board):
+    _, version = state(board)
+    data = board.post('/api/players/classic/swap', json={"name1": "a", "name2": "c"}).json
+    assert [(p["position"], p["name"]) for p in data["players"]] == [(1, "c"), (3, "a")]
+    assert (data["removed"], data["version"]) == ([], version + 1)
+
+    data = board.put('/api/players/classic/b', json={"new_name": "bb", "rank": "A Mid"}).json
+    assert ([p["name"] for p in data["players"]], data["removed"]) == (["bb"], ["b"])
+    data = board.post('/api/players/classic', json={"name": "e", "rank": "S High"}).json
+    assert [(p["position"], p["name"]) for p in data["players"]] == [(1, "e")]
+    data = board.delete('/api/players/classic/e').json
+    assert (data["players"], data["removed"], data["version"]) == ([], ["e"], version + 4)
+    assert board.delete('/api/players/classic/delete-all').json["players"] == []
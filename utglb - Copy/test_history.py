@@ -0,0 +1,65 @@
+import pytest
+
+import history
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A clock for history that the test moves by hand."""
+    clock = {"ms": 1000}
+    monkeypatch.setattr(history, 'now_ms', lambda: clock["ms"])
+    return clock
+
+
+def test_trajectory_since_and_until(client, clock):
+    ranks = ["B+ Low", "A Low", "S Low", "A High", "S High", "B+ High"]
+    assert client.post('/api/players/classic', json={"name": "a", "rank": "B+ Mid"}).status_code == 200
+    for i, rank in enumerate(ranks, 2):
+        clock["ms"] = i * 1000
+        assert client.put('/api/players/classic/a', json={"new_name": "a", "rank": rank}).status_code == 200
+
+    points = client.get('/api/leaderboards/classic/history/a').json["points"]
+    assert [p["rank"] for p in points] == ["B+ Mid"] + ranks
+
+    # Changes before since only set up the first point, which is the state
+    # at since; until cuts off the changes after it.
+    points = client.get('/api/leaderboards/classic/history/a', query_string={"since": 4.5, "until": 6.5}).json["points"]
+    assert [(p["time"], p["rank"]) for p in points] == [(4.5, "S Low"), (5.0, "A High"), (6.0, "S High")]
+
+    points = client.get('/api/leaderboards/classic/history/a', query_string={"since": 5}).json["points"]
+    assert [(p["time"], p["rank"]) for p in points] == [(5.0, "A High"), (6.0, "S High"), (7.0, "B+ High")]
+
+
+def test_trajectory_ends_when_a_replace_drops_the_player(client, clock):
+    client.post('/api/players/classic', json={"name": "a", "rank": "S High"})
+    client.post('/api/players/classic', json={"name": "b", "rank": "A Low"})
+    clock["ms"] = 2000
+    client.post('/api/leaderboards/classic/import', json=[{"name": "b", "rank": "A Low"}])
+    clock["ms"] = 3000
+    client.delete('/api/players/classic/delete-all')
+
+    points = client.get('/api/leaderboards/classic/history/a').json["points"]
+    assert [(p["time"], p.get("removed", False)) for p in points] == [(1.0, False), (2.0, True)]
+    points = client.get('/api/leaderboards/classic/history/b').json["points"]
+    assert [(p["time"], p.get("position"), p.get("removed", False)) for p in points] == [(1.0, 2, False), (2.0, 1, False), (3.0, None, True)]
+
+
+def test_old_history_is_pruned(client, clock, monkeypatch, app_module):
+    monkeypatch.setattr(history, 'RETENTION_MS', 10000)
+    monkeypatch.setattr(history, 'SNAPSHOT_MIN_DELTAS', 5)
+    client.post('/api/players/classic', json={"name": "a", "rank": "S High"})
+    ranks = ["A Low", "S Low"]
+    for second in range(2, 60):
+        clock["ms"] = second * 1000
+        client.put('/api/players/classic/a', json={"rank": ranks[second % 2]})
+
+    board_history = app_module.histories['classic']
+    snapshots = [ts for ts, _, _ in board_history._snapshots()]
+    # Only the newest snapshot at or before the cutoff is kept behind it.
+    assert snapshots[0] <= snapshots[-1] - 10000 < snapshots[1]
+    assert board_history._log_end()[1] > 0
+
+    points = client.get('/api/leaderboards/classic/history/a', query_string={"since": 50}).json["points"]
+    assert [(p["time"], p["rank"]) for p in points] == [(s, ranks[s % 2]) for s in range(50, 60)]
+    assert client.get('/api/leaderboards/classic/history', query_string={"at": 1}).status_code == 400
+    assert client.get('/api/leaderboards/classic/history', query_string={"at": 51}).json["players"][0]["rank"] == "S Low"
@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+
+from importer import iter_csv_rows, iter_json_rows
+
+
+def rows_of(body, chunk_size=16):
+    return list(iter_json_rows(io.BytesIO(body.encode()), chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_json_rows_across_chunks(chunk_size):
+    rows = [{"name": f"p{i}", "rank": "S High", "note": "a } b ] c"} for i in range(50)]
+    assert rows_of(json.dumps(rows), chunk_size) == rows
+    assert rows_of(json.dumps({"seq": 3, "players": rows}), chunk_size) == rows
+
+
+def test_json_rows_reject_bad_bodies():
+    for body in ('', '"players"', '{"board": []}', '[{"name": "a"}', '[{"name": }]'):
+        with pytest.raises(ValueError):
+            rows_of(body)
+
+
+def test_csv_rows():
+    body = 'name,rank,roblox_link\na,S High,\n"b, jr",A Low,http://x\n'
+    rows = list(iter_csv_rows(io.BytesIO(body.encode())))
+    assert [(r["name"], r["rank"]) for r in rows] == [("a", "S High"), ("b, jr", "A Low")]
+
+
+def test_bad_csv_is_a_400_with_its_line(client):
+    body = 'name,rank\na,S High\nb,"A\nLow"\nc\rd,A Low\n'
+    response = client.post('/api/leaderboards/classic/import', data=body, content_type='text/csv')
+    assert response.status_code == 400
+    assert response.json["error"].startswith("Invalid CSV on line 5:")
+
+
+def test_import_validates_and_orders(client):
+    rows = [
+        {"name": "low", "rank": "B+ Low"},
+        {"name": "high", "rank": "S High"},
+        {"name": "high", "rank": "A Low"},
+        {"name": "", "rank": "S High"},
+        {"name": "bad", "rank": "Z"},
+        {"name": "none"},
+        "not a row",
+    ]
+    response = client.post('/api/leaderboards/classic/import', json=rows)
+    assert response.status_code == 200
+    assert response.json["imported"] == 2
+    assert response.json["rejections"] == [
+        {"row": 3, "error": "Duplicate player: high"},
+        {"row": 4, "error": "Missing name"},
+        {"row": 5, "error": "Invalid rank: Z"},
+        {"row": 6, "error": "Missing rank"},
+        {"row": 7, "error": "Row is not an object"},
+    ]
+    players = client.get('/api/players/classic').json
+    assert [p["name"] for p in players] == ["high", "low"]
+
+    # Rows that carry positions keep them over points.
+    rows = [{"name": "b", "rank": "S High", "position": "2"}, {"name": "a", "rank": "B+ Low", "position": 1}]
+    client.post('/api/leaderboards/classic/import', json=rows)
+    assert [p["name"] for p in client.get('/api/players/classic').json] == ["a", "b"]
+
+
+def test_import_csv_stars(client):
+    body = 'name,stars\na,2\nb,4.5\nc,2.0\nd,7\n'
+    response = client.post('/api/leaderboards/ffa/import', data=body, content_type='text/csv')
+    assert response.json["imported"] == 3
+    assert response.json["rejections"] == [{"row": 4, "error": "Invalid star rating: 7"}]
+    players = client.get('/api/players/ffa').json
+    assert [(p["name"], p["stars"]) for p in players] == [("b", 4.5), ("a", 2.0), ("c", 2.0)]
+
+
+def test_import_with_nothing_valid_keeps_the_board(client):
+    client.post('/api/players/classic', json={"name": "kept", "rank": "S High"})
+    assert client.post('/api/leaderboards/classic/import', json=[]).status_code == 400
+    assert client.post('/api/leaderboards/classic/import', json=[{"name": "x"}]).status_code == 400
+    assert [p["name"] for p in client.get('/api/players/classic').json] == ["kept"]
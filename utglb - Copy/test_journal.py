@@ -0,0 +1,157 @@
+import os
+
+import pytest
+
+from journal import BoardJournal
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    return str(tmp_path / 'leaderboard_classic.json')
+
+
+def open_journal(snapshot_file):
+    journal = BoardJournal(snapshot_file, compact_min=10)
+    return journal, journal.load()
+
+
+def add(name):
+    return {"op": "add", "player": {"name": name}, "index": 0}
+
+
+def test_load_replays_records_after_the_snapshot(snapshot_file):
+    journal, (players, records) = open_journal(snapshot_file)
+    assert (players, records, journal.seq) == ([], [], 0)
+    for name in "abc":
+        journal.append(add(name))
+    journal.sync()
+    journal.close()
+
+    journal, (players, records) = open_journal(snapshot_file)
+    assert [r["player"]["name"] for r in records] == ["a", "b", "c"]
+    assert [r["seq"] for r in records] == [1, 2, 3]
+    assert journal.seq == 3
+
+    journal.compact([{"name": "c"}, {"name": "b"}, {"name": "a"}], wait=True)
+    journal.append(add("d"))
+    journal.sync()
+    journal.close()
+
+    journal, (players, records) = open_journal(snapshot_file)
+    assert [p["name"] for p in players] == ["c", "b", "a"]
+    assert [(r["seq"], r["player"]["name"]) for r in records] == [(4, "d")]
+    assert not os.path.exists(journal.old_log_file)
+    journal.close()
+
+
+def test_should_compact_counts_pending_records(snapshot_file):
+    journal, _ = open_journal(snapshot_file)
+    for name in "abcdefghij":
+        assert not journal.should_compact(3)
+        journal.append(add(name))
+    assert journal.should_compact(3)
+    assert not journal.should_compact(11)
+    journal.compact([], wait=True)
+    assert journal.pending == 0
+    journal.close()
+
+
+def test_torn_record_is_dropped(snapshot_file):
+    journal, _ = open_journal(snapshot_file)
+    journal.append(add("a"))
+    journal.sync()
+    journal.close()
+    with open(journal.log_file, 'ab') as f:
+        f.write(b'{"op": "add", "pla')
+
+    journal, (_, records) = open_journal(snapshot_file)
+    assert [r["seq"] for r in records] == [1]
+    journal.append(add("b"))
+    journal.sync()
+    journal.close()
+
+    journal, (_, records) = open_journal(snapshot_file)
+    assert [r["player"]["name"] for r in records] == ["a", "b"]
+    journal.close()
+
+
+def test_interrupted_compaction_is_folded_back(snapshot_file):
+    journal, _ = open_journal(snapshot_file)
+    journal.append(add("a"))
+    journal.sync()
+    journal.close()
+    # The log was rotated but the snapshot never landed.
+    os.replace(journal.log_file, journal.old_log_file)
+    journal, _ = open_journal(snapshot_file)
+    journal.append(add("b"))
+    journal.sync()
+    journal.close()
+
+    journal, (players, records) = open_journal(snapshot_file)
+    assert players == []
+    assert [r["player"]["name"] for r in records] == ["a", "b"]
+    assert not os.path.exists(journal.old_log_file)
+    journal.close()
+
+
+def test_tail_sees_other_writers(snapshot_file):
+    writer, _ = open_journal(snapshot_file)
+    reader, _ = open_journal(snapshot_file)
+    assert not reader.changed()
+
+    with writer.locked():
+        writer.append(add("a"))
+        writer.append(add("b"))
+    assert reader.changed()
+    assert [r["seq"] for r in reader.tail()] == [1, 2]
+    assert reader.seq == 2 and not reader.changed()
+
+    writer.checkpoint([{"name": "b"}])
+    assert reader.tail() is None
+    players, records = reader.load()
+    assert (players, records, reader.seq) == ([{"name": "b"}], [], 3)
+    writer.close()
+    reader.close()
+
+
+def test_failed_write_leaves_no_record(snapshot_file, monkeypatch):
+    journal, _ = open_journal(snapshot_file)
+    journal.append(add("a"))
+    write = os.write
+
+    def torn_write(fd, data):
+        write(fd, data[:5])
+        raise OSError("disk full")
+    monkeypatch.setattr(os, 'write', torn_write)
+    with pytest.raises(OSError):
+        journal.append(add("b"))
+    monkeypatch.setattr(os, 'write', write)
+    assert journal.seq == 1
+    journal.append(add("c"))
+    journal.sync()
+    journal.close()
+
+    journal, (_, records) = open_journal(snapshot_file)
+    assert [(r["seq"], r["player"]["name"]) for r in records] == [(1, "a"), (2, "c")]
+    journal.close()
+
+
+def test_board_is_unchanged_when_the_log_write_fails(client, app_module, monkeypatch):
+    client.post('/api/players/classic', json={"name": "a", "rank": "S High"})
+    lb = app_module.leaderboards['classic']
+    seen = []
+    lb.listeners.append(seen.append)
+    before = client.get('/api/players/classic?offset=0').json
+
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(lb.journal, 'append', fail)
+    monkeypatch.setattr(lb.journal, 'checkpoint', fail)
+    app_module.app.config['PROPAGATE_EXCEPTIONS'] = False
+    assert client.post('/api/players/classic', json={"name": "b", "rank": "S High"}).status_code == 500
+    assert client.delete('/api/players/classic/a').status_code == 500
+    assert client.post('/api/leaderboards/classic/batch', json={"operations": [
+        {"op": "add", "name": "c", "rank": "A Mid"}, {"op": "remove", "name": "a"}]}).status_code == 500
+    assert client.delete('/api/players/classic/delete-all').status_code == 500
+    assert client.get('/api/players/classic?offset=0').json == before
+    assert seen == []
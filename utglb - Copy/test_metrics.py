@@ -0,0 +1,28 @@
+import pytest
+
+
+def request_count(client, route, status):
+    series = f'leaderboard_http_request_seconds_count{{route="{route}",method="POST",status="{status}"}}'
+    for line in client.get('/metrics').text.splitlines():
+        if line.startswith(series):
+            return int(float(line.split()[-1]))
+    return 0
+
+
+def test_failed_requests_are_counted_as_500s(client, app_module, monkeypatch):
+    route = '/api/players/<lb_type>'
+    ok, failed = request_count(client, route, 200), request_count(client, route, 500)
+    client.post('/api/players/classic', json={"name": "a", "rank": "S High"})
+
+    def fail(record):
+        raise OSError("disk full")
+    monkeypatch.setattr(app_module.leaderboards['classic'].journal, 'append', fail)
+    # As under debug, the error escapes the app and no response is made.
+    app_module.app.config['PROPAGATE_EXCEPTIONS'] = True
+    with pytest.raises(OSError):
+        client.post('/api/players/classic', json={"name": "b", "rank": "S High"})
+    app_module.app.config['PROPAGATE_EXCEPTIONS'] = False
+    assert client.post('/api/players/classic', json={"name": "c", "rank": "S High"}).status_code == 500
+
+    assert request_count(client, route, 200) == ok + 1
+    assert request_count(client, route, 500) == failed + 2
@@ -0,0 +1,23 @@
+import importlib
+
+
+def overall(client):
+    page = client.get('/api/players/overall?offset=0').json
+    return [(p["name"], p["final_score"]) for p in page["players"]], page["version"]
+
+
+def test_version_follows_the_source_boards(client, app_module):
+    client.post('/api/players/classic', json={"name": "a", "rank": "S High"})
+    client.post('/api/players/ffa', json={"name": "a", "stars": 2.5})
+    client.post('/api/players/ffa', json={"name": "b", "stars": 5})
+    players, version = overall(client)
+    assert players == [("a", 75.0)]
+
+    client.post('/api/players/classic', json={"name": "b", "rank": "B+ Low"})
+    players, newer = overall(client)
+    assert [name for name, _ in players] == ["a", "b"]
+    assert newer > version
+
+    # A fresh worker reading the same boards reports the same version.
+    other = importlib.reload(app_module).app.test_client()
+    assert overall(other) == (players, newer)
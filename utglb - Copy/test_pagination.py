@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def board(client):
+    rows = [{"name": f"p{i}", "rank": "S High", "position": i} for i in range(1, 26)]
+    assert client.post('/api/leaderboards/classic/import', json=rows).status_code == 200
+    return client
+
+
+def names(page):
+    return [p["name"] for p in page["players"]]
+
+
+def page(client, **args):
+    response = client.get('/api/players/classic', query_string=args)
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def test_offset_and_limit(board):
+    first = page(board, offset=0, limit=10)
+    assert names(first) == [f"p{i}" for i in range(1, 11)]
+    assert [p["position"] for p in first["players"]] == list(range(1, 11))
+    assert first["total"] == 25
+
+    last = page(board, offset=20, limit=10)
+    assert names(last) == [f"p{i}" for i in range(21, 26)]
+    assert last["next_cursor"] is None
+    assert page(board, offset=30)["players"] == []
+
+
+def test_cursor_resumes_after_the_last_player_seen(board):
+    first = page(board, limit=10)
+    # Two players land ahead of the cursor between requests.
+    for name in ("x", "y"):
+        board.post('/api/players/classic', json={"name": name, "rank": "S High"})
+        board.put(f'/api/players/classic/{name}', json={"new_name": name, "rank": "S High", "position": 1})
+
+    second = page(board, limit=10, cursor=first["next_cursor"])
+    assert names(second) == [f"p{i}" for i in range(11, 21)]
+    # Positions go on from the cursor; the moves ahead reach clients as deltas.
+    assert second["offset"] == 10
+    assert second["players"][0]["position"] == 11
+
+    # The last player seen has left; resume at the offset it was at.
+    board.delete('/api/players/classic/p20')
+    third = page(board, limit=10, cursor=second["next_cursor"])
+    assert names(third)[0] == "p19"
+    assert third["next_cursor"] is None
+
+
+def test_around_a_player(board):
+    around = page(board, around="p3", radius=4)
+    assert around["rank"] == 3
+    assert around["offset"] == 0
+    assert names(around) == [f"p{i}" for i in range(1, 8)]
+
+    around = page(board, around="p20", radius=2)
+    assert names(around) == ["p18", "p19", "p20", "p21", "p22"]
+
+
+def test_bad_arguments(board):
+    assert board.get('/api/players/classic?around=nobody').status_code == 404
+    assert board.get('/api/players/classic?cursor=not-a-cursor').status_code == 400
+    assert board.get('/api/players/classic?limit=0').status_code == 400
+    assert board.get('/api/players/classic?offset=-1').status_code == 400
@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.fixture
+def boards(client):
+    rows = [{"name": name, "rank": rank} for name, rank in (("hi", "S High"), ("mid", "A Mid"), ("lo", "B+ Low"), ("also", "A Mid"))]
+    client.post('/api/leaderboards/classic/import', json=rows)
+    client.post('/api/leaderboards/ffa/import', json=[{"name": "hi", "stars": 4.5}, {"name": "lo", "stars": 2}])
+    # Hand-placed order that points alone would not give.
+    client.post('/api/players/classic/swap', json={"name1": "lo", "name2": "hi"})
+    client.put('/api/players/ffa/lo', json={"stars": 2, "position": 1})
+    return client
+
+
+def order(client, board):
+    return [p["name"] for p in client.get(f'/api/players/{board}').json]
+
+
+def put_scoring(client, config):
+    response = client.put('/api/scoring', json=config)
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def test_weights_leave_board_order_alone(boards):
+    classic, ffa = order(boards, 'classic'), order(boards, 'ffa')
+    versions = [boards.get(f'/api/players/{b}?offset=0').json["version"] for b in ('classic', 'ffa')]
+    overall = boards.get('/api/players/overall').json
+
+    data = put_scoring(boards, {"weights": {"rank": 0.7}})
+    assert (data["rescored"], data["pending"]) == ({}, [])
+    assert (order(boards, 'classic'), order(boards, 'ffa')) == (classic, ffa)
+    assert [boards.get(f'/api/players/{b}?offset=0').json["version"] for b in ('classic', 'ffa')] == versions
+    assert [p["final_score"] for p in boards.get('/api/players/overall').json] != [p["final_score"] for p in overall]
+
+
+def test_changed_points_move_only_their_tier(boards):
+    assert order(boards, 'classic') == ["lo", "mid", "also", "hi"]
+    data = put_scoring(boards, {"ranks": {"A Mid": 20}})
+    assert data["scoring"]["ranks"]["A Mid"] == 20
+    assert data["scoring"]["ranks"]["S High"] == 15
+    assert "classic" in data["rescored"]
+    # The A Mid players go to the top in the order they had; lo stays
+    # ahead of hi.
+    assert order(boards, 'classic') == ["mid", "also", "lo", "hi"]
+    assert order(boards, 'ffa') == ["lo", "hi"]
+
+
+def test_cold_boards_catch_up_when_used(boards, app_module):
+    app_module.leaderboards._evict('classic', app_module.leaderboards['classic'])
+    data = put_scoring(boards, {"ranks": {"B+ Low": 16}})
+    assert "classic" in data["pending"]
+    assert order(boards, 'classic') == ["lo", "mid", "also", "hi"]
+    put_scoring(boards, {"ranks": {"A Mid": 0}})
+    assert order(boards, 'classic') == ["lo", "hi", "mid", "also"]
+
+
+def test_new_tiers_export_and_parse_back(boards):
+    put_scoring(boards, {"ranks": {"SS": 30, "S+ High": 20}, "stars": {"6.0": 18}})
+    boards.post('/api/players/classic', json={"name": "top", "rank": "SS"})
+    boards.post('/api/players/classic', json={"name": "next", "rank": "S+ High"})
+    boards.post('/api/players/ffa', json={"name": "six", "stars": 6})
+
+    for board in ('classic', 'ffa'):
+        before = boards.get(f'/api/players/{board}').json
+        messages = boards.get(f'/api/leaderboards/{board}/export').json["messages"]
+        assert all(p["name"] in "\n".join(messages) for p in before)
+        response = boards.post(f'/api/leaderboards/{board}/import-text', data="\n".join(messages))
+        assert response.json["rejected"] == 0
+        assert boards.get(f'/api/players/{board}').json == before
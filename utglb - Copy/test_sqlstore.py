@@ -0,0 +1,62 @@
+import importlib
+import random
+import sqlite3
+
+import pytest
+
+import sqlstore
+from player import ClassicPlayer
+from scoring import current
+from sqlstore import SQLiteDatabase, SQLitePlayerStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """An empty board with gaps small enough that inserts keep spreading."""
+    monkeypatch.setattr(sqlstore, 'GAP', 4)
+    return SQLitePlayerStore(SQLiteDatabase(':memory:'), 'classic', 'rank_points', ClassicPlayer)
+
+
+def test_sparse_positions_keep_order(store):
+    rng = random.Random(0)
+    ranks = list(current.rank_points)
+    expected = [f"p{i}" for i in range(50)]
+    store.load([ClassicPlayer(name, rng.choice(ranks)) for name in expected])
+
+    for i in range(500):
+        index = rng.randrange(len(expected) + 1)
+        if rng.random() < 0.3:
+            name = expected.pop(rng.randrange(len(expected)))
+            store.move(name, index)
+        else:
+            name = f"n{i}"
+            assert store.insert(ClassicPlayer(name, rng.choice(ranks)), index) == index
+        expected.insert(index, name)
+        if rng.random() < 0.2:
+            store.remove(expected.pop(rng.randrange(len(expected))))
+
+    assert [p["name"] for p in store] == expected
+    assert [p["name"] for p in store.slice(10, 20)] == expected[10:20]
+    assert [p["name"] for p in store.after(expected[9], 10)] == expected[10:20]
+    assert [p["name"] for p in store.after(expected[-2], 10)] == expected[-1:]
+    assert store.at(len(expected) - 1)["name"] == expected[-1]
+    assert all(store.index_of(name) == i for i, name in enumerate(expected))
+    with pytest.raises(IndexError):
+        store.at(len(expected))
+
+
+def test_points_column_follows_rescoring(tmp_path, monkeypatch, app_module):
+    monkeypatch.setenv('LEADERBOARD_STORAGE', 'sqlite')
+    app = importlib.reload(app_module)
+    client = app.app.test_client()
+    rows = [{"name": name, "rank": rank} for name, rank in (("hi", "S High"), ("mid", "A Mid"), ("lo", "B+ Low"))]
+    client.post('/api/leaderboards/classic/import', json=rows)
+    assert client.put('/api/scoring', json={"ranks": {"A Mid": 20}}).status_code == 200
+    assert [p["name"] for p in client.get('/api/players/classic').json] == ["mid", "hi", "lo"]
+
+    def points():
+        conn = sqlite3.connect(str(tmp_path / 'leaderboard.db'))
+        return dict(conn.execute("SELECT name, points FROM players WHERE board = 'classic'"))
+    assert points()["mid"] == 20
+    client.post('/api/leaderboards/classic/rescore')
+    assert points() == {p["name"]: p["rank_points"] for p in client.get('/api/players/classic').json}
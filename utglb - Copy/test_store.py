@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from store import PlayerStore
+
+
+def player(name, points):
+    return {"name": name, "points": points}
+
+
+def test_positions_match_a_list():
+    rng = random.Random(0)
+    store = PlayerStore('points')
+    expected = []
+    for i in range(2000):
+        op = rng.random()
+        if op < 0.4 or not expected:
+            p = player(f"p{i}", rng.randrange(10))
+            index = rng.randrange(len(expected) + 1)
+            assert store.insert(p, index) == index
+            expected.insert(index, p)
+        elif op < 0.6:
+            p = expected.pop(rng.randrange(len(expected)))
+            assert store.remove(p["name"]) is p
+        elif op < 0.8:
+            p = expected.pop(rng.randrange(len(expected)))
+            index = rng.randrange(len(expected) + 1)
+            assert store.move(p["name"], index) == index
+            expected.insert(index, p)
+        else:
+            i, j = rng.randrange(len(expected)), rng.randrange(len(expected))
+            store.swap(expected[i]["name"], expected[j]["name"])
+            expected[i], expected[j] = expected[j], expected[i]
+
+    assert len(store) == len(expected)
+    assert list(store) == expected
+    assert store.slice(5, 25) == expected[5:25]
+    assert store.slice(len(expected) - 3, len(expected) + 10) == expected[-3:]
+    assert store.after(expected[4]["name"], 20) == expected[5:25]
+    assert store.after(expected[-3]["name"], 10) == expected[-2:]
+    for index, p in enumerate(expected):
+        assert store.index_of(p["name"]) == index
+        assert store.at(index) is p
+    with pytest.raises(IndexError):
+        store.at(len(expected))
+
+
+def test_insert_by_points_goes_after_ties():
+    store = PlayerStore('points')
+    store.load([player("a", 9), player("b", 5), player("c", 5), player("d", 1)])
+    assert store.points_index(5) == 3
+    assert store.insert(player("e", 5)) == 3
+    assert store.insert(player("f", 10)) == 0
+    assert store.insert(player("g", 0)) == 6
+    assert [p["name"] for p in store] == ["f", "a", "b", "c", "e", "d", "g"]
+
+
+def test_load_drops_duplicates_and_replace_renames():
+    store = PlayerStore('points')
+    loaded = store.load([player("a", 3), player("b", 2), player("a", 1)])
+    assert [p["points"] for p in loaded] == [3, 2]
+
+    store.replace("a", player("z", 4))
+    assert "a" not in store and store.get("z")["points"] == 4
+    assert store.index_of("z") == 0
+    with pytest.raises(KeyError):
+        store.replace("b", player("z", 0))
+    with pytest.raises(KeyError):
+        store.insert(player("b", 0))
@@ -0,0 +1,57 @@
+from export import render
+from textimport import parse_text
+
+CLASSIC_TEXT = """
+# S Tier :STier:
+-# High
+## 1 - [alpha](https://roblox.com/a)
+-# Low
+## 2 - :crown: beta
+# A- Tier :LowTier:
+-# Mid
+## 3 - :x: [gamma](https://roblox.com/g)
+## not an entry
+"""
+
+FFA_TEXT = """
+# 4.5 Stars :4pt5_star:
+## 1 - [alpha](https://roblox.com/a)
+# 2 Stars :2_star:
+## 2 - [beta](https://roblox.com/b)
+## 0 - [skipped](https://roblox.com/s)
+"""
+
+
+def test_parse_classic():
+    assert list(parse_text(CLASSIC_TEXT.splitlines(), 'classic')) == [
+        {"name": "alpha", "position": 1, "rank": "S High", "roblox_link": "https://roblox.com/a"},
+        {"name": "beta", "position": 2, "rank": "S Low", "roblox_link": ""},
+        {"name": "gamma", "position": 3, "rank": "A- Mid", "roblox_link": "https://roblox.com/g"},
+    ]
+
+
+def test_parse_ffa():
+    assert list(parse_text(FFA_TEXT.splitlines(), 'ffa')) == [
+        {"name": "alpha", "position": 1, "stars": 4.5, "roblox_link": "https://roblox.com/a"},
+        {"name": "beta", "position": 2, "stars": 2.0, "roblox_link": "https://roblox.com/b"},
+    ]
+
+
+def test_export_parses_back():
+    players = [
+        {"name": "a", "position": 1, "rank": "S Mid", "stars": 5.0, "roblox_link": "https://roblox.com/a"},
+        {"name": "b", "position": 2, "rank": "A+ High", "stars": 3.5, "roblox_link": "https://roblox.com/b"},
+        {"name": "c", "position": 3, "rank": "B+ Low", "stars": 0.5, "roblox_link": "https://roblox.com/c"},
+    ]
+    for board, key in (('classic', 'rank'), ('ffa', 'stars')):
+        lines = '\n'.join(render(players, board)).splitlines()
+        assert [(p["name"], p[key]) for p in parse_text(lines, board)] == [(p["name"], p[key]) for p in players]
+
+
+def test_import_text(client):
+    response = client.post('/api/leaderboards/classic/import-text', data=CLASSIC_TEXT)
+    assert response.json["imported"] == 3
+    players = client.get('/api/players/classic').json
+    assert [(p["name"], p["rank"], p["position"]) for p in players] == [("alpha", "S High", 1), ("beta", "S Low", 2), ("gamma", "A- Mid", 3)]
+
+    assert client.post('/api/leaderboards/classic/import-text', data="nothing here").status_code == 400
@@ -0,0 +1,95 @@
+import re
+
+import scoring
+
+LINKED_ENTRY = re.compile(r'##\s*(\d+)\s*-\s*\[(.+?)\]\((.+?)\)')
+EMOJI_ENTRY = re.compile(r'##\s*(\d+)\s*-\s*:[^:]*:\s*(.+)')
+# Players without a profile link are exported by name alone.
+PLAIN_ENTRY = re.compile(r'##\s*(\d+)\s*-\s*(.+)')
+LINKED_NAME = re.compile(r'\[(.+?)\]\((.+?)\)')
+STARS_HEADING = re.compile(r'(\d+\.?\d*)\s*Stars')
+TIER_HEADING = re.compile(r'#\s*(.+?)\s+Tier\b')
+
+
+def parse_classic(lines):
+    # Tiers are whatever the scoring tables define, as export writes them.
+    tiers = scoring.current.rank_tiers
+    tier = ''
+    sub = ''
+    for line in lines:
+        line = line.strip()
+        if line.startswith('# '):
+            match = TIER_HEADING.match(line)
+            if match:
+                # A tier the tables don't know still starts a new section,
+                # so its entries are rejected rather than filed elsewhere.
+                tier = match.group(1) if match.group(1) in tiers else ''
+                sub = ''
+        elif line.startswith('-# '):
+            sub = line[3:].strip()
+        elif line.startswith('## '):
+            name = None
+            link = ''
+            match = LINKED_ENTRY.search(line)
+            if match:
+                position, name, link = match.groups()
+            else:
+                match = EMOJI_ENTRY.search(line)
+                if match:
+                    position, rest = match.groups()
+                    linked = LINKED_NAME.match(rest)
+                    if linked:
+                        name, link = linked.groups()
+                    else:
+                        name = rest
+                else:
+                    match = PLAIN_ENTRY.search(line)
+                    if match:
+                        position, name = match.groups()
+
+            if name:
+                rank = f"{tier} {sub}" if tier and sub else sub or tier
+                if rank:
+                    yield {
+                        "name": name.strip(),
+                        "position": int(position),
+                        "rank": rank,
+                        "roblox_link": link or '',
+                    }
+
+
+def parse_ffa(lines):
+    stars = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith('# '):
+            match = STARS_HEADING.search(line)
+            if match:
+                stars = float(match.group(1))
+        elif line.startswith('## '):
+            match = LINKED_ENTRY.search(line)
+            if match:
+                position, name, link = match.groups()
+            else:
+                match = PLAIN_ENTRY.search(line)
+                if match:
+                    position, name = match.groups()
+                    link = ''
+            if match and stars is not None:
+                if int(position):
+                    yield {
+                        "name": name.strip(),
+                        "position": int(position),
+                        "stars": stars,
+                        "roblox_link": link or '',
+                    }
+
+
+PARSERS = {
+    'classic': parse_classic,
+    'ffa': parse_ffa,
+}
+
+
+def parse_text(lines, leaderboard_type):
+    return PARSERS[leaderboard_type](lines)
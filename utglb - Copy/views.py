@@ -0,0 +1,113 @@
+import scoring
+from events import changed_names
+from locks import RWLock, reader
+from store import PlayerStore
+
+
+class OverallView:
+    """Overall board materialized from the classic and FFA boards.
+
+    Players on both boards are joined by name and scored the same way as the
+    desktop tool: the weighted mean of their rank and star percentages, with
+    weights from the scoring tables. The view
+    listens to both source boards and re-scores only the players a mutation
+    touched, so ranks stay current without recomputing the whole board.
+    """
+
+    leaderboard_type = 'overall'
+    name = 'overall'
+    read_only = True
+
+    def __init__(self, classic, ffa):
+        self.classic = classic
+        self.ffa = ffa
+        self.players = PlayerStore('final_score')
+        self.listeners = []
+        self.lock = RWLock('overall')
+        self.rebuild(classic)
+        classic.listeners.append(self.on_change)
+        ffa.listeners.append(self.on_change)
+
+    def combine(self, name):
+        classic_player = self.classic.players.get(name)
+        ffa_player = self.ffa.players.get(name)
+        if classic_player is None or ffa_player is None:
+            return None
+        rank_percentage = classic_player.rank_percentage
+        star_percentage = ffa_player.star_percentage
+        return {
+            "name": name,
+            "rank": classic_player.rank,
+            "stars": ffa_player.stars,
+            "rank_points": classic_player.rank_points,
+            "star_points": ffa_player.star_points,
+            "rank_percentage": rank_percentage,
+            "star_percentage": star_percentage,
+            "final_score": scoring.current.final_score(rank_percentage, star_percentage),
+            "roblox_link": classic_player.roblox_link or ffa_player.roblox_link,
+        }
+
+    def rebuild(self, source):
+        # Only the board that changed is locked by the caller, so walk its
+        # tree and look the other side up by name.
+        self.scoring_version = scoring.current.version
+        combined = [p for p in map(self.combine, (p["name"] for p in source.players)) if p is not None]
+        combined.sort(key=lambda p: -p["final_score"])
+        self.players.load(combined)
+        self._changed({"op": "replace"})
+
+    def refresh(self, name):
+        if name in self.players:
+            self.players.remove(name)
+        player = self.combine(name)
+        if player is not None:
+            self.players.insert(player)
+
+    def on_change(self, board, record):
+        op = record["op"]
+        if op in ("swap", "move"):
+            return
+
+        with self.lock.write():
+            if op == "replace":
+                self.rebuild(board)
+                return
+            names = changed_names(record)
+            for name in names:
+                self.refresh(name)
+            self._changed({"op": "refresh", "names": names})
+
+    @property
+    def version(self):
+        # Built from what every worker reads the same way, the source boards'
+        # journal versions and the scoring tables, so ETags, cursors and
+        # event ids agree across workers. Each part only grows.
+        return self.classic.version + self.ffa.version + self.scoring_version
+
+    def catch_up(self):
+        self.classic.catch_up()
+        self.ffa.catch_up()
+
+    def ensure_scored(self):
+        # Players re-placed on a source board are refreshed as it notifies
+        # the view; new weights change every final score, so rebuild then.
+        changed = self.classic.ensure_scored()
+        changed = self.ffa.ensure_scored() or changed
+        if self.scoring_version != scoring.current.version:
+            with self.classic.lock.read(), self.lock.write():
+                self.rebuild(self.classic)
+            changed = True
+        return changed
+
+    @reader
+    def get_players(self):
+        return [dict(p, position=i) for i, p in enumerate(self.players, 1)]
+
+    @reader
+    def get_page(self, offset, limit, after=None):
+        players = self.players.after(after, limit) if after is not None else self.players.slice(offset, offset + limit)
+        return [dict(p, position=i) for i, p in enumerate(players, offset + 1)]
+
+    def _changed(self, record):
+        for listener in self.listeners:
+            listener(self, record)